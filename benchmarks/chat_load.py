@@ -0,0 +1,239 @@
+"""Load generator: many concurrent SSE clients holding multi-turn conversations with ``POST /chat``.
+
+Each virtual client repeatedly picks a script (a list of user turns) and
+plays it turn by turn on one ``thread_id``, reading every response stream to
+the end. With ``--thread-reuse``, that share of conversations continues an
+earlier, idle thread instead of starting a new one, so thread state grows
+as it does in production.
+
+Per turn it records the time to the first SSE frame, the gaps between
+frames and the total duration, and classifies failures (HTTP status, error
+frame, stream cut before ``[DONE]``, client exception). Results, optionally
+with every sample, are written as JSON so runs can be compared.
+
+Against a running server:
+
+    python -m benchmarks.chat_load --url http://localhost:8000 --clients 50 --duration 60 --output load.json
+
+Offline, against the swarm app with the scripted model and the stub MCP host
+(the scripts may only use the queries of ``benchmarks.scenarios``):
+
+    python -m benchmarks.chat_load --offline --clients 20 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.stats import distribution
+
+DEFAULT_SCRIPTS = {
+    "portfolio": [SCENARIOS["assets on all chains"].query],
+    "check then send": [SCENARIOS["assets on all chains"].query, SCENARIOS["send 0.1 USDT"].query],
+    "lookups": [SCENARIOS["ethereum height"].query, SCENARIOS["swap quote"].query,
+                SCENARIOS["ethereum height"].query],
+}
+
+
+class TurnResult:
+    __slots__ = ("script", "thread_reused", "status", "first_frame", "gaps", "duration", "frames")
+
+    def __init__(self, script: str, thread_reused: bool):
+        self.script = script
+        self.thread_reused = thread_reused
+        self.status = "ok"
+        self.first_frame: Optional[float] = None
+        self.gaps: List[float] = []
+        self.duration = 0.0
+        self.frames = 0
+
+    def as_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+async def play_turn(http: httpx.AsyncClient, url: str, text: str, thread_id: str, result: TurnResult):
+    body = {"messages": [{"role": "user", "content": text}], "thread_id": thread_id}
+    start = time.perf_counter()
+    last, buffer, done = None, b"", False
+    try:
+        async with http.stream("POST", f"{url}/chat", json=body) as response:
+            if response.status_code != 200:
+                result.status = f"http_{response.status_code}"
+                return
+            async for chunk in response.aiter_bytes():
+                now = time.perf_counter()
+                buffer += chunk
+                *frames, buffer = buffer.split(b"\n\n")
+                for frame in frames:
+                    if result.first_frame is None:
+                        result.first_frame = now - start
+                    else:
+                        result.gaps.append(now - last)
+                    last = now
+                    result.frames += 1
+                    if frame == b"data: [DONE]":
+                        done = True
+                    elif frame.startswith(b'data: {"error":'):
+                        result.status = "error_frame"
+        if result.status == "ok" and not done:
+            result.status = "incomplete_stream"
+    except Exception as e:
+        result.status = f"exception_{type(e).__name__}"
+    finally:
+        result.duration = time.perf_counter() - start
+
+
+class LoadRun:
+    def __init__(self, url: str, scripts: Dict[str, List[str]], args):
+        self.url = url
+        self.scripts = scripts
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.idle_threads: List[str] = []
+        self.results: List[TurnResult] = []
+        self.conversations = 0
+
+    def _more(self, deadline: float) -> bool:
+        if self.args.conversations and self.conversations >= self.args.conversations:
+            return False
+        return time.monotonic() < deadline
+
+    async def client(self, http: httpx.AsyncClient, deadline: float):
+        while self._more(deadline):
+            self.conversations += 1
+            name = self.rng.choice(list(self.scripts))
+            reused = bool(self.idle_threads) and self.rng.random() < self.args.thread_reuse
+            thread_id = self.idle_threads.pop(self.rng.randrange(len(self.idle_threads))) if reused \
+                else f"load-{uuid.uuid4()}"
+            for text in self.scripts[name]:
+                result = TurnResult(name, reused)
+                await play_turn(http, self.url, text, thread_id, result)
+                self.results.append(result)
+                if result.status != "ok":
+                    break
+                if self.args.think_time_ms:
+                    await asyncio.sleep(self.args.think_time_ms / 1000)
+            # Only idle threads are reused, so a client never waits on another's lock.
+            self.idle_threads.append(thread_id)
+
+    async def run(self) -> float:
+        limits = httpx.Limits(max_connections=self.args.clients, max_keepalive_connections=self.args.clients)
+        async with httpx.AsyncClient(timeout=self.args.timeout, limits=limits) as http:
+            start = time.perf_counter()
+            deadline = time.monotonic() + self.args.duration
+            await asyncio.gather(*(self.client(http, deadline) for _ in range(self.args.clients)))
+            return time.perf_counter() - start
+
+
+def summarize_turns(results: List[TurnResult], elapsed: float) -> dict:
+    ok = [r for r in results if r.status == "ok"]
+    statuses = Counter(r.status for r in results)
+    return {
+        "turns": len(results),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "errors": {status: n for status, n in statuses.items() if status != "ok"},
+        "throughput_turns_per_s": round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+        "time_to_first_frame": distribution([r.first_frame for r in ok]),
+        "frame_interarrival": distribution([gap for r in ok for gap in r.gaps]),
+        "duration": distribution([r.duration for r in ok]),
+        "frames_per_turn": round(sum(r.frames for r in ok) / len(ok), 1) if ok else 0.0,
+    }
+
+
+def report(summary: dict, label: str = "all"):
+    ttff, gaps, duration = summary["time_to_first_frame"], summary["frame_interarrival"], summary["duration"]
+    print(f"{label:<16} turns={summary['turns']:<6} errors={summary['error_rate']:.2%} "
+          f"{summary['throughput_turns_per_s']:.1f} turns/s")
+    for name, dist in (("first frame", ttff), ("inter-arrival", gaps), ("duration", duration)):
+        print(f"{'':<16} {name:<14} p50={dist['p50_ms']:8.1f}ms p90={dist['p90_ms']:8.1f}ms "
+              f"p95={dist['p95_ms']:8.1f}ms p99={dist['p99_ms']:8.1f}ms max={dist['max_ms']:8.1f}ms")
+    if summary["errors"]:
+        print(f"{'':<16} errors: {summary['errors']}")
+
+
+async def run_load(url: str, scripts: Dict[str, List[str]], args) -> dict:
+    load = LoadRun(url, scripts, args)
+    elapsed = await load.run()
+    summary = {
+        "elapsed_s": round(elapsed, 2),
+        "conversations": load.conversations,
+        **summarize_turns(load.results, elapsed),
+        "by_script": {name: summarize_turns([r for r in load.results if r.script == name], elapsed)
+                      for name in scripts},
+        "reused_threads": summarize_turns([r for r in load.results if r.thread_reused], elapsed),
+    }
+    report(summary)
+    for name in scripts:
+        report(summary["by_script"][name], name)
+    if args.raw:
+        summary["samples"] = [r.as_dict() for r in load.results]
+    return summary
+
+
+async def run_offline(scripts: Dict[str, List[str]], args, mcp_url: str) -> dict:
+    from benchmarks.offline_suite import swarm_server
+
+    async with swarm_server(mcp_url, args.llm_latency_ms / 1000) as url:
+        return await run_load(url, scripts, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running swarm server")
+    target.add_argument("--offline", action="store_true", help="serve the swarm app with the scripted model")
+    parser.add_argument("--clients", type=int, default=10, help="concurrent SSE clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to start new conversations for")
+    parser.add_argument("--conversations", type=int, default=0, help="stop after this many conversations")
+    parser.add_argument("--scripts", help='JSON file of {"name": ["turn 1", "turn 2", ...]}')
+    parser.add_argument("--thread-reuse", type=float, default=0.0,
+                        help="share of conversations that continue an earlier thread")
+    parser.add_argument("--think-time-ms", type=float, default=0.0, help="pause between the turns of a script")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--raw", action="store_true", help="include every turn's samples in the output")
+    parser.add_argument("--output", help="write the configuration and results as JSON to this file")
+    offline = parser.add_argument_group("offline setup")
+    offline.add_argument("--profile", default="fast", help="stub MCP tool latency profile")
+    offline.add_argument("--llm-latency-ms", type=float, default=0.0, help="scripted model latency per call")
+    offline.add_argument("--tool-cache", action="store_true", help="keep the MCP tool result cache on")
+    args = parser.parse_args()
+
+    scripts = DEFAULT_SCRIPTS
+    if args.scripts:
+        with open(args.scripts) as f:
+            scripts = json.load(f)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.url:
+        summary = asyncio.run(run_load(args.url.rstrip("/"), scripts, args))
+    else:
+        from benchmarks.stub_mcp_server import running_stub_server
+
+        queries = {s.query for s in SCENARIOS.values()}
+        unknown = [text for turns in scripts.values() for text in turns if text not in queries]
+        if unknown:
+            parser.error(f"the scripted model only knows the benchmark scenarios' queries, not {unknown[0]!r}")
+        if not args.tool_cache:
+            os.environ["MCP_TOOL_CACHE_TTLS"] = "{}"
+        with running_stub_server(args.profile) as mcp_url:
+            summary = asyncio.run(run_offline(scripts, args, mcp_url))
+
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k != "output"}
+        with open(args.output, "w") as f:
+            json.dump({"config": config, "scripts": scripts, "results": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Offline stand-ins for the chat models, shared by the benchmarks."""
+import asyncio
+import json
+import math
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+# Called with the model input and the names of the tools bound to the model.
+Responder = Callable[[List[BaseMessage], List[str]], AIMessage]
+
+
+def schema_tokens(schemas: List[dict]) -> int:
+    """Approximate tokens of tool schemas as sent to the model (about 4 characters per token)."""
+    return math.ceil(len(json.dumps(schemas, separators=(",", ":"))) / 4) if schemas else 0
+
+
+def tool_then_answer(tool_name: str, args: dict, answer: str = "Done.") -> Responder:
+    """Call ``tool_name`` once per user turn, then answer after its result arrives."""
+
+    def respond(messages: List[BaseMessage], tools: List[str]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=answer)
+        turn = sum(isinstance(m, HumanMessage) for m in messages)
+        return AIMessage(content="", tool_calls=[{"name": tool_name, "args": args, "id": f"call_{turn}"}])
+
+    return respond
+
+
+class ScriptedChatModel(BaseChatModel):
+    """A chat model whose replies come from ``respond`` and whose latency grows with its input.
+
+    Every call records the approximate number of input tokens it received in
+    ``input_tokens``, and those of the tool schemas bound to it in
+    ``tool_tokens``, so benchmarks can report prompt sizes per call. Copies
+    made by ``bind_tools`` share both lists.
+    """
+
+    respond: Any
+    base_latency: float = 0.0
+    latency_per_1k_tokens: float = 0.0
+    tool_schemas: List[dict] = Field(default_factory=list)
+    input_tokens: List[int] = Field(default_factory=list)
+    tool_tokens: List[int] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> dict:
+        # Part of the response cache key, like the tools ChatOpenAI sends.
+        return {"tool_schemas": self.tool_schemas}
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tool_schemas": [convert_to_openai_tool(t) for t in tools]})
+
+    def _reply(self, messages: List[BaseMessage]) -> Tuple[AIMessage, float]:
+        tokens = count_tokens_approximately(messages)
+        self.input_tokens.append(tokens)
+        self.tool_tokens.append(schema_tokens(self.tool_schemas))
+        message = self.respond(messages, [schema["function"]["name"] for schema in self.tool_schemas])
+        message.usage_metadata = {"input_tokens": tokens, "output_tokens": count_tokens_approximately([message]),
+                                  "total_tokens": tokens + count_tokens_approximately([message])}
+        return message, self.base_latency + self.latency_per_1k_tokens * tokens / 1000
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, latency = self._reply(messages)
+        if latency:
+            time.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, latency = self._reply(messages)
+        if latency:
+            await asyncio.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class ScriptedAdkModel(BaseLlm):
+    """An ADK model for the A2A host agent whose replies come from ``respond``.
+
+    ``respond`` gets the request's contents and returns the reply's content.
+    """
+
+    model: str = "scripted"
+    respond: Any
+    base_latency: float = 0.0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        content: types.Content = self.respond(llm_request.contents)
+        if self.base_latency:
+            await asyncio.sleep(self.base_latency)
+        yield LlmResponse(content=content)
+
+
+def large_json(records: int, seed: Optional[int] = 0) -> str:
+    """A tool result of roughly ``records`` * 120 bytes, like an asset listing."""
+    return json.dumps([
+        {"token": f"TOKEN{(seed + i) % 97}", "chain": "ethereum", "balance": f"{(i * 7919 + seed) % 100000}.{i:04d}",
+         "usd_value": f"{(i * 104729 + seed) % 1000000 / 100:.2f}", "contract": f"0x{(seed + i) * 2654435761:040x}"[:42]}
+        for i in range(records)
+    ])
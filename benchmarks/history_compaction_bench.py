@@ -0,0 +1,93 @@
+"""Benchmark: prompt size and turn latency over a long scripted swarm session.
+
+Plays a 50-turn conversation with the analysis agent, where every turn calls
+an asset-listing tool that returns a few KB of JSON, once without history
+compaction and once with it. The scripted model's latency grows with its
+input size, standing in for prefill cost.
+
+Nothing here touches the network.
+
+    python -m benchmarks.history_compaction_bench --turns 50 --max-tokens 6000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fakes import ScriptedChatModel, large_json, tool_then_answer
+from multi_agent.swarm.compaction import HistoryCompactor
+from multi_agent.swarm.langchain_swarm_http import build_workflow
+
+ADDRESS = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+@tool
+def get_assets(address: str) -> str:
+    """List the token holdings of an address."""
+    return large_json(30)
+
+
+def summarizer():
+    return ScriptedChatModel(respond=lambda messages, tools: AIMessage(
+        content=f"The user repeatedly asked for the assets of {ADDRESS} on ethereum; the listings were returned."
+    ))
+
+
+async def play(turns: int, latency_per_1k_tokens: float, compactor=None):
+    model = ScriptedChatModel(
+        respond=tool_then_answer("get_assets", {"address": ADDRESS}, "Here are the holdings of the address."),
+        base_latency=0.002,
+        latency_per_1k_tokens=latency_per_1k_tokens,
+    )
+    tools = {"bridge_tools": [], "swap_tools": [], "transfer_tools": [], "analysis_tools": [get_assets]}
+    app = build_workflow(model, tools, compactor).compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "bench"}}
+    durations, prompt_tokens = [], []
+    for turn in range(turns):
+        calls = len(model.input_tokens)
+        inputs = {"messages": [("user", f"Turn {turn}: what are the assets of {ADDRESS}?")]}
+        if turn == 0:
+            inputs["active_agent"] = "analysis_agent"
+        start = time.perf_counter()
+        await app.ainvoke(inputs, config)
+        durations.append(time.perf_counter() - start)
+        prompt_tokens.append(sum(model.input_tokens[calls:]))
+    return durations, prompt_tokens
+
+
+def report(name, turns, durations, prompt_tokens):
+    marks = sorted({1, 10, 25, turns} & set(range(1, turns + 1)))
+    per_turn = "  ".join(f"t{m}={prompt_tokens[m - 1]:>6}" for m in marks)
+    print(f"{name:<26} prompt tokens/turn {per_turn}  total={sum(prompt_tokens):>8}")
+    print(f"{'':<26} turn latency mean={statistics.fmean(durations) * 1000:7.1f}ms "
+          f"last={durations[-1] * 1000:7.1f}ms total={sum(durations):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=6000)
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.01,
+                        help="simulated model seconds per 1k input tokens")
+    args = parser.parse_args()
+
+    summary_model = summarizer()
+    runs = [
+        ("no compaction", None),
+        ("compaction, extractive", HistoryCompactor(max_tokens=args.max_tokens)),
+        ("compaction, model summary", HistoryCompactor(max_tokens=args.max_tokens, summary_model=summary_model)),
+    ]
+    print(f"{args.turns}-turn session, {args.latency_per_1k_tokens * 1000:g}ms per 1k input tokens")
+    for name, compactor in runs:
+        durations, prompt_tokens = asyncio.run(play(args.turns, args.latency_per_1k_tokens, compactor))
+        report(name, args.turns, durations, prompt_tokens)
+    print(f"model summary: {len(summary_model.input_tokens)} summarizer calls, "
+          f"{sum(summary_model.input_tokens)} input tokens (not included above)")
+
+
+if __name__ == "__main__":
+    main()
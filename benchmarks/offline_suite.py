@@ -0,0 +1,240 @@
+"""Benchmark: end-to-end latency of the swarm server and the A2A agents, fully offline.
+
+Plays each scenario of ``benchmarks.scenarios`` against
+
+- ``swarm``: the ``/chat`` endpoint of ``langchain_swarm_http``, served by
+  uvicorn and read as an SSE stream;
+- ``a2a``: the host agent delegating to the four A2A agents, each served by
+  uvicorn on its own port;
+
+with scripted models in place of OpenRouter and the stub MCP host in place
+of the remote one, and reports p50/p95/p99 latency and throughput per
+scenario. With the default zero model latency and the ``fast`` MCP profile
+the numbers are the orchestration overhead itself.
+
+The MCP tool result cache is off unless ``--tool-cache`` is given, so every
+request pays the profile's tool latency.
+
+    python -m benchmarks.offline_suite --requests 50 --concurrency 8 --output bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+import uvicorn
+
+from benchmarks.fakes import ScriptedAdkModel, ScriptedChatModel
+from benchmarks.scenarios import SCENARIOS, Scenario, host_responder, summary_responder, swarm_responder
+from benchmarks.stats import drive, percentile, summarize
+from benchmarks.stub_mcp_server import LATENCY_PROFILES, free_port, running_stub_server
+
+A2A_AGENTS = ("analysis", "bridge", "swap", "transfer")
+
+
+@contextlib.asynccontextmanager
+async def serving(app, port: int):
+    """Serve ``app`` on ``port`` in this event loop for the duration of the block."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           timeout_graceful_shutdown=1))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+            raise RuntimeError(f"Server on port {port} did not start")
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+async def discover(mcp_url: str) -> Dict[str, list]:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+    from multi_agent.common.mcp_tools import discover_tools, mcp_connections
+
+    server_tools, errors = await discover_tools(MultiServerMCPClient(mcp_connections(host=mcp_url)))
+    if errors:
+        raise RuntimeError(f"Stub MCP servers failed: {errors}")
+    return server_tools
+
+
+# -- swarm -------------------------------------------------------------------
+
+@contextlib.asynccontextmanager
+async def swarm_server(mcp_url: str, llm_latency: float):
+    """Serve the swarm app with the scripted model and yield its URL."""
+    from multi_agent.common.mcp_tools import MCP_SERVERS
+    from multi_agent.swarm import langchain_swarm_http as srv
+    from multi_agent.swarm.pre_router import IntentRouter
+
+    server_tools = await discover(mcp_url)
+    # The same components initialize_components builds, with the scripted model.
+    srv.model = ScriptedChatModel(respond=swarm_responder, base_latency=llm_latency)
+    srv.tools = {f"{name}_tools": server_tools.get(name, []) for name in MCP_SERVERS}
+    srv.compactor = srv.create_compactor(ScriptedChatModel(respond=summary_responder, base_latency=llm_latency))
+    srv.workflow = srv.build_workflow(srv.model, srv.tools, srv.compactor, srv.max_tools_per_call())
+    srv.checkpointer = srv.create_checkpointer()
+    srv.swarm_app = srv.workflow.compile(checkpointer=srv.checkpointer)
+    if os.getenv("SWARM_PRE_ROUTER", "1") == "1":
+        srv.pre_router = IntentRouter.from_agents(srv.HANDOFF_DESCRIPTIONS, srv.AGENT_PROMPTS)
+
+    async with serving(srv.app, free_port()) as url:
+        yield url
+
+
+@contextlib.asynccontextmanager
+async def swarm_system(mcp_url: str, llm_latency: float):
+    """Yield a function that sends one scenario request to a served swarm ``/chat``."""
+    async with swarm_server(mcp_url, llm_latency) as url, httpx.AsyncClient(timeout=60) as http:
+        async def ask(scenario: Scenario, ttfb: List[float]):
+            body = {"messages": [{"role": "user", "content": scenario.query}], "thread_id": f"bench-{uuid.uuid4()}"}
+            start, received = time.perf_counter(), b""
+            async with http.stream("POST", f"{url}/chat", json=body) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    if not received:
+                        ttfb.append(time.perf_counter() - start)
+                    received += chunk
+            if not received.endswith(b"data: [DONE]\n\n") or b'data: {"error":' in received:
+                raise RuntimeError(f"Bad stream: {received[-200:]!r}")
+            if scenario.answer.encode() not in received:
+                raise RuntimeError("The answer never reached the stream")
+
+        yield ask
+
+
+# -- A2A ---------------------------------------------------------------------
+
+def a2a_app(name: str, url: str, tools: list, model):
+    from a2a.server.apps import A2AStarletteApplication
+    from a2a.server.request_handlers import DefaultRequestHandler
+    from a2a.server.tasks import InMemoryTaskStore
+    from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+
+    from multi_agent.a2a.analysis_agent.agent_executor import AnalysisAgentExecutor
+    from multi_agent.a2a.bridge_agent.agent_executor import TransferAgentExecutor as BridgeAgentExecutor
+    from multi_agent.a2a.swap_agent.agent_executor import SwapAgentExecutor
+    from multi_agent.a2a.transfer_agent.agent_executor import TransferAgentExecutor
+
+    executors = {"analysis": AnalysisAgentExecutor, "bridge": BridgeAgentExecutor,
+                 "swap": SwapAgentExecutor, "transfer": TransferAgentExecutor}
+    title = f"{name.title()} Agent"
+    card = AgentCard(
+        name=title,
+        description=f"Helps with {name} requests",
+        url=f"{url}/",
+        version="1.0.0",
+        defaultInputModes=["text", "text/plain"],
+        defaultOutputModes=["text", "text/plain"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[AgentSkill(id=f"{name}_agent", name=title, description=f"Helps with {name} requests", tags=[name])],
+    )
+    handler = DefaultRequestHandler(agent_executor=executors[name](tools, model), task_store=InMemoryTaskStore())
+    return A2AStarletteApplication(agent_card=card, http_handler=handler).build()
+
+
+@contextlib.asynccontextmanager
+async def a2a_system(mcp_url: str, llm_latency: float):
+    """Yield a function that sends one scenario request to the host agent in front of the served A2A agents."""
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    from multi_agent.a2a.host_agent.host_agent import HostAgent
+
+    server_tools = await discover(mcp_url)
+    model = ScriptedChatModel(respond=swarm_responder, base_latency=llm_latency)
+    async with contextlib.AsyncExitStack() as stack:
+        urls = []
+        for name in A2A_AGENTS:
+            port = free_port()
+            app = a2a_app(name, f"http://127.0.0.1:{port}", server_tools.get(name, []), model)
+            urls.append(await stack.enter_async_context(serving(app, port)))
+        host = HostAgent(urls, model=ScriptedAdkModel(respond=host_responder, base_latency=llm_latency))
+        if not await host.wait_ready(10):
+            raise RuntimeError(f"The host agent did not load every agent card: {host.card_errors}")
+        sessions = InMemorySessionService()
+        runner = Runner(agent=host.create_agent(), app_name="benchmark", session_service=sessions)
+
+        async def ask(scenario: Scenario, ttfb: List[float]):
+            session = await sessions.create_session(app_name="benchmark", user_id="benchmark")
+            message = types.Content(role="user", parts=[types.Part(text=scenario.query)])
+            final = None
+            async for event in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+                if event.is_final_response() and event.content and event.content.parts:
+                    final = event.content.parts[0].text
+            if not final or scenario.answer not in final:
+                raise RuntimeError(f"Unexpected answer: {final!r}")
+
+        try:
+            yield ask
+        finally:
+            await host.close()
+
+
+SYSTEMS = {"swarm": swarm_system, "a2a": a2a_system}
+
+
+async def run(args, mcp_url: str) -> List[dict]:
+    results = []
+    for system in args.systems:
+        async with SYSTEMS[system](mcp_url, args.llm_latency_ms / 1000) as ask:
+            for name in args.scenarios:
+                scenario = SCENARIOS[name]
+                for _ in range(args.warmup):
+                    await ask(scenario, [])
+                ttfb: List[float] = []
+                latencies, errors, elapsed = await drive(lambda i: ask(scenario, ttfb), args.requests,
+                                                         args.concurrency)
+                result = {"system": system, "scenario": name, **summarize(latencies, elapsed, errors)}
+                if ttfb:
+                    result["ttfb_p50_ms"] = round(percentile(ttfb, 50) * 1000, 2)
+                    result["ttfb_p95_ms"] = round(percentile(ttfb, 95) * 1000, 2)
+                results.append(result)
+                print(f"{system:<6} {name:<22} n={result['requests']:<4} err={errors:<3} "
+                      f"p50={result['p50_ms']:8.1f}ms p95={result['p95_ms']:8.1f}ms p99={result['p99_ms']:8.1f}ms "
+                      f"{result['throughput_rps']:7.1f} req/s"
+                      + (f"  ttfb p50={result['ttfb_p50_ms']:.1f}ms" if ttfb else ""))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--systems", nargs="+", choices=sorted(SYSTEMS), default=["swarm", "a2a"])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=30, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests per scenario")
+    parser.add_argument("--profile", choices=sorted(LATENCY_PROFILES), default="fast",
+                        help="stub MCP tool latency profile")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="scripted model latency per call")
+    parser.add_argument("--tool-cache", action="store_true", help="keep the MCP tool result cache on")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.tool_cache:
+        os.environ["MCP_TOOL_CACHE_TTLS"] = "{}"
+    # Before the A2A executors' import-time basicConfig, which would log every request.
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"profile={args.profile} llm_latency={args.llm_latency_ms:g}ms requests={args.requests} "
+          f"concurrency={args.concurrency} tool_cache={'on' if args.tool_cache else 'off'}")
+    with running_stub_server(args.profile) as mcp_url:
+        results = asyncio.run(run(args, mcp_url))
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k != "output"}
+        with open(args.output, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Accuracy of the local intent pre-router on a labelled set of first messages.
+
+Each request is labelled with the agent it should start at; requests that
+are vague, multi-step or off-topic are labelled ``dispatch_agent``, meaning
+the router should fall back. A fallback on a request with a specific label
+costs one LLM hop but is not an error; a direct route to the wrong agent is.
+
+The requests are held out from ``ROUTING_EXAMPLES``, which the router is
+built from: none may share most of its terms with an example, or the
+measured precision would only show that the router remembers its examples.
+``--sweep`` counts the right and wrong direct routes to each agent for a
+range of margins, from which the margins of ``IntentRouter`` are chosen:
+per agent, the loosest without a wrong route, with some headroom.
+
+The requests of ``benchmarks.scenarios`` (those of the swarm demo) are
+reported on their own: they are the clearest requests there are, and each
+should skip dispatch.
+
+    python -m benchmarks.pre_router_eval
+    python -m benchmarks.pre_router_eval --min-score 0.1 --min-margin 0.05 --verbose
+    python -m benchmarks.pre_router_eval --sweep
+"""
+import argparse
+import re
+from collections import Counter, defaultdict
+
+from benchmarks.scenarios import SCENARIOS
+from multi_agent.swarm.langchain_swarm_http import AGENT_PROMPTS, HANDOFF_DESCRIPTIONS
+from multi_agent.swarm.pre_router import FALLBACK_AGENT, ROUTING_EXAMPLES, STOPWORDS, IntentRouter
+
+ADDRESS = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+# Share of terms (Jaccard) above which a request counts as a copy of a routing example.
+MAX_EXAMPLE_OVERLAP = 0.5
+
+LABELLED = [
+    ("I'd like to get USDC for my 2 ETH", "swap_agent"),
+    ("quote me a WBTC -> ETH swap", "swap_agent"),
+    ("can you swap half my MATIC into DAI on polygon", "swap_agent"),
+    ("change 300 USDT into ETH on arbitrum", "swap_agent"),
+    ("what would 1 ETH fetch in USDC if I swapped it now", "swap_agent"),
+    ("dump my PEPE for stablecoins", "swap_agent"),
+    ("get me some ARB using my USDC", "swap_agent"),
+    ("I want to swap tokens on uniswap", "swap_agent"),
+    ("turn my BNB into CAKE", "swap_agent"),
+    ("exchange rate to swap LINK into ETH", "swap_agent"),
+    (f"how much ETH is sitting in {ADDRESS}", "analysis_agent"),
+    ("which block is base at right now", "analysis_agent"),
+    ("gas fees on ethereum today?", "analysis_agent"),
+    (f"did 0x{'cd' * 32} go through?", "analysis_agent"),
+    ("what's USDT trading at", "analysis_agent"),
+    (f"list every token {ADDRESS} holds across chains", "analysis_agent"),
+    ("market cap of UNI", "analysis_agent"),
+    (f"show recent activity of {ADDRESS}", "analysis_agent"),
+    ("how congested is arbitrum at the moment", "analysis_agent"),
+    (f"does {ADDRESS} hold anything on polygon", "analysis_agent"),
+    ("get my USDC from arbitrum over to optimism", "bridge_agent"),
+    ("I need to move 0.5 ETH onto zksync", "bridge_agent"),
+    ("port 200 DAI from polygon to mainnet", "bridge_agent"),
+    ("what's the cheapest way to bridge ETH to base", "bridge_agent"),
+    ("relay my USDT from BSC over to ethereum", "bridge_agent"),
+    ("my funds are on optimism but I need them on arbitrum", "bridge_agent"),
+    (f"please wire 25 USDC to {ADDRESS}", "transfer_agent"),
+    (f"{ADDRESS} should receive 0.3 ETH from me", "transfer_agent"),
+    ("give bob 10 DAI", "transfer_agent"),
+    (f"send {ADDRESS} 100 USDT on polygon", "transfer_agent"),
+    ("transfer my whole ETH balance to my cold wallet", "transfer_agent"),
+    ("tip 5 USDC to the creator's address", "transfer_agent"),
+    ("good morning", "dispatch_agent"),
+    ("who are you", "dispatch_agent"),
+    ("explain what a blockchain is", "dispatch_agent"),
+    ("what's the weather like", "dispatch_agent"),
+    ("can you recommend a good DeFi strategy", "dispatch_agent"),
+    ("I lost access to my wallet, what should I do", "dispatch_agent"),
+    ("ok", "dispatch_agent"),
+    ("swap ETH to USDC and then bridge it to arbitrum", "dispatch_agent"),
+]
+
+
+def words(text: str) -> set:
+    """The literal words of ``text``: a copy shares them, a request of the same shape does not."""
+    return set(re.findall(r"[a-z0-9]+", text.lower())) - STOPWORDS
+
+
+def example_overlap(text: str) -> float:
+    """The largest share of words ``text`` has in common with any routing example."""
+    terms = words(text)
+    return max(
+        (len(terms & words(example)) / len(terms | words(example)) if terms else 0.0)
+        for examples in ROUTING_EXAMPLES.values()
+        for example in examples
+    )
+
+
+def check_held_out():
+    copies = [text for text, _ in LABELLED if example_overlap(text) > MAX_EXAMPLE_OVERLAP]
+    if copies:
+        raise SystemExit(f"Labelled requests too close to ROUTING_EXAMPLES: {copies}")
+
+
+def sweep():
+    """Right/wrong direct routes to each agent when every agent needs the same margin."""
+    router = IntentRouter.from_agents(HANDOFF_DESCRIPTIONS, AGENT_PROMPTS)
+    ranked = [(expected, router.scores(text)) for text, expected in LABELLED]
+    agents = sorted(router.vectors)
+    print("margin  " + "  ".join(f"{agent:>15}" for agent in agents))
+    for margin in (0.02, 0.04, 0.06, 0.08, 0.1, 0.12, 0.15, 0.2, 0.25):
+        routes = defaultdict(Counter)
+        for expected, scores in ranked:
+            (best, score), runner_up = scores[0], scores[1][1]
+            if score >= router.min_score and score - runner_up >= margin:
+                routes[best]["ok" if best == expected else "wrong"] += 1
+        print(f"{margin:6.2f}  " + "  ".join(
+            f"{routes[agent]['ok']:>6} ok {routes[agent]['wrong']:>2} bad" for agent in agents))
+
+
+def evaluate(router: IntentRouter, verbose: bool = False):
+    routed = correct_routes = correct = 0
+    confusion = defaultdict(Counter)
+    for text, expected in LABELLED:
+        chosen = router.route(text) or FALLBACK_AGENT
+        confusion[expected][chosen] += 1
+        if chosen != FALLBACK_AGENT:
+            routed += 1
+            correct_routes += chosen == expected
+        correct += chosen == expected
+        if verbose:
+            best = router.scores(text)[:2]
+            marker = "ok " if chosen == expected else ("-- " if chosen == FALLBACK_AGENT else "ERR")
+            print(f"{marker} {chosen:<15} {expected:<15} {best[0][1]:.2f}/{best[1][1]:.2f}  {text}")
+
+    specific = sum(1 for _, expected in LABELLED if expected != FALLBACK_AGENT)
+    print(f"labelled requests           {len(LABELLED)}")
+    print(f"exact accuracy              {correct / len(LABELLED):.1%}")
+    print(f"routed directly             {routed} ({routed / len(LABELLED):.1%})")
+    print(f"precision of direct routes  {correct_routes / routed if routed else 0:.1%}")
+    print(f"dispatch hops saved         {correct_routes}/{specific} specific requests")
+    print("\nconfusion (expected -> chosen)")
+    for expected in sorted(confusion):
+        print(f"  {expected:<15} " + ", ".join(f"{a}={n}" for a, n in confusion[expected].most_common()))
+    print("\nscenario requests")
+    for scenario in SCENARIOS.values():
+        chosen = router.route(scenario.query) or FALLBACK_AGENT
+        print(f"  {chosen:<15} {f'{scenario.agent}_agent':<15} {scenario.query}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument("--min-margin", type=float, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--sweep", action="store_true", help="count the routes to each agent for a range of margins instead")
+    args = parser.parse_args()
+
+    check_held_out()
+    if args.sweep:
+        sweep()
+        return
+
+    thresholds = {}
+    if args.min_score is not None:
+        thresholds["min_score"] = args.min_score
+    if args.min_margin is not None:
+        # The same margin for every agent.
+        thresholds["min_margin"] = args.min_margin
+        thresholds["agent_margins"] = {}
+    evaluate(IntentRouter.from_agents(HANDOFF_DESCRIPTIONS, AGENT_PROMPTS, **thresholds), args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Report: prompt tokens per swarm agent, split into system prompt, tool schemas and history.
+
+Sends sample first-turn requests straight to the agent that handles them,
+once with every tool bound and once with per-turn tool pruning, and prints
+the approximate tokens of each part of the model input. The MCP tools are
+the stub MCP server's tool definitions.
+
+    python -m benchmarks.prompt_size_report --max-tools 8
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+
+from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.stub_mcp_server import STUB_TOOLS
+from multi_agent.swarm.langchain_swarm_http import build_workflow
+
+ADDRESS = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+REQUESTS = [
+    ("analysis_agent", f"what are the assets of {ADDRESS} on ethereum"),
+    ("analysis_agent", "what is the current Ethereum block height"),
+    ("analysis_agent", "price of ETH right now"),
+    ("bridge_agent", "bridge 100 USDC from ethereum to arbitrum"),
+    ("swap_agent", "swap 2 ETH to USDT on ethereum"),
+    ("transfer_agent", f"transfer 1 ETH to {ADDRESS}"),
+    ("dispatch_agent", "hello, what can you do?"),
+]
+
+
+def stub_tool(name, description, parameters):
+    def run(**kwargs):
+        return "{}"
+
+    return StructuredTool.from_function(
+        func=run,
+        name=name,
+        description=description,
+        args_schema={
+            "type": "object",
+            "properties": {p: {"type": "string", "description": f"The {p.replace('_', ' ')}."} for p in parameters},
+            "required": list(parameters),
+        },
+    )
+
+
+def stub_tools():
+    return {f"{server}_tools": [stub_tool(*t) for t in defs] for server, defs in STUB_TOOLS.items()}
+
+
+async def measure(max_tools):
+    parts = []
+
+    def respond(messages, tools):
+        system = [m for m in messages if isinstance(m, SystemMessage)]
+        history = [m for m in messages if not isinstance(m, SystemMessage)]
+        parts.append((count_tokens_approximately(system), count_tokens_approximately(history)))
+        return AIMessage(content="Sure.")
+
+    model = ScriptedChatModel(respond=respond)
+    app = build_workflow(model, stub_tools(), max_tools=max_tools).compile(checkpointer=InMemorySaver())
+    rows = defaultdict(list)
+    for i, (agent, text) in enumerate(REQUESTS):
+        await app.ainvoke({"messages": [("user", text)], "active_agent": agent},
+                          {"configurable": {"thread_id": str(i)}})
+        system, history = parts[-1]
+        rows[agent].append((system, model.tool_tokens[-1], history))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-tools", type=int, default=8)
+    args = parser.parse_args()
+
+    full = asyncio.run(measure(None))
+    pruned = asyncio.run(measure(args.max_tools))
+
+    print(f"approximate prompt tokens per model call (mean over sample requests), max {args.max_tools} MCP tools")
+    print(f"{'agent':<16}{'system':>8}{'history':>9}{'tools':>8}{'pruned':>8}{'total':>8}{'pruned':>8}{'saved':>8}")
+    for agent in full:
+        n = len(full[agent])
+        system = sum(r[0] for r in full[agent]) / n
+        history = sum(r[2] for r in full[agent]) / n
+        tools_all = sum(r[1] for r in full[agent]) / n
+        tools_pruned = sum(r[1] for r in pruned[agent]) / n
+        total, total_pruned = system + history + tools_all, system + history + tools_pruned
+        print(f"{agent:<16}{system:>8.0f}{history:>9.0f}{tools_all:>8.0f}{tools_pruned:>8.0f}"
+              f"{total:>8.0f}{total_pruned:>8.0f}{1 - total_pruned / total:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
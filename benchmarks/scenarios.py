@@ -0,0 +1,129 @@
+"""Benchmark scenarios and the scripted model replies that play them.
+
+A scenario is one user request, the agent that handles it and the tool calls
+that agent makes, batch by batch. ``swarm_responder`` plays every scenario
+for the LangChain agents (the swarm agents and the four A2A agents) and
+``host_responder`` plays the A2A host agent's delegation. Both find the
+scenario from the user's message, so one model serves them all.
+``summary_responder`` stands in for the swarm's history summarizer.
+"""
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from google.genai import types
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+WALLET = "0xF5054F94009B7E9999F6459f40d8EaB1A2ceA22D"
+RECIPIENT = "0xD64229dF1EB0354583F46e46580849B1572BB56d"
+
+
+class Scenario(NamedTuple):
+    name: str
+    query: str
+    # The MCP server whose agent handles the request: analysis, bridge, swap or transfer.
+    agent: str
+    # Tool calls per model call, in order; each batch runs in parallel.
+    steps: Sequence[Sequence[Tuple[str, dict]]]
+    answer: str
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in [
+    Scenario(
+        "assets on all chains",
+        f"What assets does {WALLET} have on all chains?",
+        "analysis",
+        [[("get_address_assets", {"address": WALLET, "chain": chain}) for chain in ("ethereum", "bsc", "arbitrum")]],
+        "The address holds assets on Ethereum, BNB Smart Chain and Arbitrum.",
+    ),
+    Scenario(
+        "send 0.1 USDT",
+        f"My wallet address is {WALLET}, I want to send {RECIPIENT} 0.1 USDT on Ethereum",
+        "transfer",
+        [
+            [("get_address_balance", {"address": WALLET, "token": "USDT", "chain": "ethereum"}),
+             ("estimate_transfer_gas", {"token": "USDT", "amount": "0.1", "chain": "ethereum"})],
+            [("transfer_token", {"token": "USDT", "amount": "0.1", "chain": "ethereum",
+                                 "from_address": WALLET, "to_address": RECIPIENT})],
+        ],
+        "The transfer of 0.1 USDT is ready to be signed.",
+    ),
+    Scenario(
+        "ethereum height",
+        "Query the current Ethereum height.",
+        "analysis",
+        [[("get_total_blocks_ethereum", {})]],
+        "The current Ethereum block height is 21000000.",
+    ),
+    Scenario(
+        "swap quote",
+        "How much USDT do I get for 1 ETH on Ethereum?",
+        "swap",
+        [[("get_swap_quote", {"from_token": "ETH", "to_token": "USDT", "amount": "1", "chain": "ethereum"})]],
+        "Swapping 1 ETH gives about 0.0998 USDT after fees.",
+    ),
+]}
+
+HANDOFF_PREFIX = "transfer_to_"
+
+
+def card_name(scenario: Scenario) -> str:
+    """Name of the A2A agent card of the scenario's agent, e.g. "Analysis Agent"."""
+    return f"{scenario.agent.title()} Agent"
+
+
+def _scenario_for(text: str) -> Scenario:
+    for scenario in SCENARIOS.values():
+        if scenario.query == text:
+            return scenario
+    raise KeyError(f"No scenario for request {text!r}")
+
+
+def swarm_responder(messages: List[BaseMessage], tools: List[str]) -> AIMessage:
+    """Reply of a LangChain agent playing the scenario of the last user message.
+
+    An agent without the scenario's tools hands off to the agent that has
+    them; that agent calls one batch of tools per model call and then
+    answers. A call bound to a single other tool is a structured response
+    (the A2A agents' ``ResponseFormat``), answered with the final text.
+    """
+    start = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    scenario = _scenario_for(messages[start].content)
+    turn = messages[start + 1:]
+    scenario_tools = {name for batch in scenario.steps for name, _ in batch}
+    if len(tools) == 1 and tools[0] not in scenario_tools and not tools[0].startswith(HANDOFF_PREFIX):
+        return AIMessage(content="", tool_calls=[{
+            "name": tools[0], "args": {"status": "completed", "message": scenario.answer}, "id": "call_response",
+        }])
+    if not scenario_tools & set(tools):
+        handoff = f"{HANDOFF_PREFIX}{scenario.agent}_agent"
+        if handoff in tools:
+            return AIMessage(content="", tool_calls=[{"name": handoff, "args": {}, "id": "call_handoff"}])
+        return AIMessage(content=scenario.answer)
+    done = sum(
+        1 for m in turn
+        if isinstance(m, AIMessage) and m.tool_calls and all(c["name"] in scenario_tools for c in m.tool_calls)
+    )
+    if done < len(scenario.steps):
+        return AIMessage(content="", tool_calls=[
+            {"name": name, "args": args, "id": f"call_{done}_{i}"}
+            for i, (name, args) in enumerate(scenario.steps[done])
+        ])
+    return AIMessage(content=scenario.answer)
+
+
+def summary_responder(messages: List[BaseMessage], tools: List[str]) -> AIMessage:
+    """Reply of the history summarizer: the latest user requests of the transcript it was given."""
+    requests = [line for line in messages[-1].content.splitlines() if line.startswith("user: ")]
+    return AIMessage(content="The user asked: " + " / ".join(line[len("user: "):] for line in requests[-3:]))
+
+
+def host_responder(contents: List[types.Content]) -> types.Content:
+    """Reply of the A2A host agent: delegate the request to the scenario's agent, then relay what it returned."""
+    start = max(i for i, c in enumerate(contents) if c.role == "user" and any(p.text for p in c.parts or ()))
+    scenario = _scenario_for(next(p.text for p in contents[start].parts if p.text))
+    responses = [p.function_response for c in contents[start + 1:] for p in c.parts or () if p.function_response]
+    if not responses:
+        return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+            name="send_message", args={"agent_name": card_name(scenario), "message": scenario.query},
+        ))])
+    result = responses[-1].response or {}
+    return types.Content(role="model", parts=[types.Part(text=f"{card_name(scenario)}: {result.get('result', result)}")])
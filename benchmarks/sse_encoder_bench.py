@@ -0,0 +1,80 @@
+"""Microbenchmark: SSE frame encoding and batching throughput on one core.
+
+Encodes a realistic token stream (short word chunks from one agent, with an
+occasional tool frame) three ways: the old ``json.dumps`` + f-string frame,
+``encode_frame`` and the prefix-cached ``token_frame``. It then pushes the
+encoded stream through ``coalesce`` and reports how many writes the
+response would take.
+
+    python -m benchmarks.sse_encoder_bench --frames 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from multi_agent.swarm.sse import coalesce, encode_frame, token_frame
+
+WORDS = ["The ", "current ", "Ethereum ", "block ", "height ", "is ", "21,845,", "003", ". ", "Gas "]
+AGENT = "analysis_agent"
+
+
+def old_frame(frame):
+    return f"data: {json.dumps(frame)}\n\n"
+
+
+def frames_per_second(name, encode, count):
+    start = time.perf_counter()
+    for i in range(count):
+        encode(WORDS[i % len(WORDS)])
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {count / elapsed:14,.0f} frames/s  {elapsed / count * 1e9:8.0f} ns/frame")
+
+
+async def produce(count, burst):
+    for i in range(count):
+        yield token_frame(AGENT, WORDS[i % len(WORDS)])
+        if i % burst == burst - 1:
+            # Tokens arrive from the model in bursts with short gaps between them.
+            await asyncio.sleep(0.002)
+
+
+async def count_writes(count, burst, flush_interval, flush_bytes):
+    writes = size = 0
+    # CPU time rather than wall time: the stream itself sleeps between bursts.
+    start = time.process_time()
+    async for chunk in coalesce(produce(count, burst), flush_interval, flush_bytes):
+        writes += 1
+        size += len(chunk)
+    elapsed = time.process_time() - start
+    label = f"flush {flush_interval * 1000:g}ms/{flush_bytes}B" if flush_interval else "unbatched"
+    print(f"{label:<28} {writes:8d} writes  {size / writes:8.0f} B/write  {count / elapsed:12,.0f} frames/cpu-s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--stream-frames", type=int, default=20_000)
+    parser.add_argument("--burst", type=int, default=20, help="tokens per model burst in the batching run")
+    args = parser.parse_args()
+
+    print(f"encoding {args.frames} token frames")
+    frames_per_second(
+        "json.dumps + f-string (old)",
+        lambda word: old_frame({"role": "assistant", "agent": AGENT, "type": "token", "content": word}).encode(),
+        args.frames,
+    )
+    frames_per_second(
+        "encode_frame",
+        lambda word: encode_frame({"role": "assistant", "agent": AGENT, "type": "token", "content": word}),
+        args.frames,
+    )
+    frames_per_second("token_frame", lambda word: token_frame(AGENT, word), args.frames)
+
+    print(f"\nwriting a {args.stream_frames}-frame stream in bursts of {args.burst}")
+    for flush_interval, flush_bytes in ((0, 0), (0.01, 16384), (0.05, 65536)):
+        asyncio.run(count_writes(args.stream_frames, args.burst, flush_interval, flush_bytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Latency summaries shared by the benchmarks."""
+import asyncio
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The nearest-rank ``q``-th percentile of ``values`` (0 if there are none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies: Sequence[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Request count, p50/p95/p99/mean latency in ms and throughput of one run."""
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def distribution(values: Sequence[float]) -> Dict[str, float]:
+    """p50/p90/p95/p99/max of durations in seconds, in ms."""
+    return {
+        **{f"p{q}_ms": round(percentile(values, q) * 1000, 2) for q in (50, 90, 95, 99)},
+        "max_ms": round(max(values) * 1000, 2) if values else 0.0,
+    }
+
+
+async def drive(request: Callable[[int], Awaitable[None]], requests: int,
+                concurrency: int) -> Tuple[List[float], int, float]:
+    """Run ``request(i)`` for ``i`` in ``range(requests)``, ``concurrency`` at a time.
+
+    Returns the latencies of the requests that succeeded, the number that
+    raised and the wall-clock time of the whole run.
+    """
+    latencies, errors = [], 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await request(i)
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Request {i} failed: {e!r}")
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors, time.perf_counter() - start
@@ -0,0 +1,204 @@
+"""A local stand-in for the remote MCP host.
+
+Serves the bridge, swap, transfer and analysis MCP servers over streamable
+HTTP at ``/mcp/<server>``, like the real host, with tools shaped like theirs.
+Every tool call sleeps for a latency drawn from a log-normal distribution
+given by the server's median and p95 in the selected profile, then returns
+canned JSON.
+
+    python -m benchmarks.stub_mcp_server --port 18133 --profile realistic
+"""
+import argparse
+import asyncio
+import contextlib
+import fnmatch
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, Tuple
+
+import mcp.types as types
+import uvicorn
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from benchmarks.fakes import large_json
+
+# (name, description, parameters) per server, modelled on the MCP servers' tools.
+STUB_TOOLS = {
+    "analysis": [
+        ("get_total_blocks_ethereum", "Get the current block height of Ethereum.", []),
+        ("get_total_blocks_arbitrum", "Get the current block height of Arbitrum.", []),
+        ("get_total_blocks_bsc", "Get the current block height of BNB Smart Chain.", []),
+        ("get_exchange_rate", "Get the exchange rate between two tokens.", ["from_token", "to_token"]),
+        ("get_token_price", "Get the USD price of a token.", ["token", "chain"]),
+        ("get_token_info", "Get the contract, decimals and supply of a token.", ["token", "chain"]),
+        ("get_address_assets", "List the token holdings and their USD value for an address.", ["address", "chain"]),
+        ("get_address_balance", "Get the native coin balance of an address.", ["address", "chain"]),
+        ("get_transaction", "Get the status and details of a transaction by hash.", ["tx_hash", "chain"]),
+        ("get_address_transactions", "List the recent transactions of an address.", ["address", "chain", "limit"]),
+        ("get_gas_price", "Get the current gas price of a chain.", ["chain"]),
+        ("get_top_holders", "List the largest holders of a token.", ["token", "chain", "limit"]),
+    ],
+    "bridge": [
+        ("get_bridge_quote", "Quote bridging a token amount from one chain to another.",
+         ["token", "amount", "from_chain", "to_chain"]),
+        ("bridge_token", "Build the transaction that bridges a token to another chain.",
+         ["token", "amount", "from_chain", "to_chain", "address"]),
+        ("get_bridge_status", "Get the status of a bridge transfer.", ["tx_hash"]),
+        ("list_bridge_routes", "List the supported bridge routes for a token.", ["token"]),
+    ],
+    "swap": [
+        ("get_swap_quote", "Quote swapping one token for another on a chain.", ["from_token", "to_token", "amount", "chain"]),
+        ("swap_token", "Build the transaction that swaps one token for another.",
+         ["from_token", "to_token", "amount", "chain", "address", "slippage"]),
+        ("get_swap_status", "Get the status of a swap transaction.", ["tx_hash", "chain"]),
+        ("list_swap_tokens", "List the tokens that can be swapped on a chain.", ["chain"]),
+    ],
+    "transfer": [
+        ("get_address_balance", "Get the balance of a token for an address.", ["address", "token", "chain"]),
+        ("estimate_transfer_gas", "Estimate the gas fee of a token transfer.", ["token", "amount", "chain"]),
+        ("transfer_token", "Build the transaction that transfers a token to a recipient.",
+         ["token", "amount", "chain", "from_address", "to_address"]),
+        ("get_transfer_status", "Get the status of a transfer transaction.", ["tx_hash", "chain"]),
+    ],
+}
+
+# Tool call latency per server as (median ms, p95 ms).
+LATENCY_PROFILES: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "zero": {server: (0, 0) for server in STUB_TOOLS},
+    "fast": {server: (2, 5) for server in STUB_TOOLS},
+    "realistic": {"analysis": (150, 600), "bridge": (400, 1500), "swap": (300, 1000), "transfer": (200, 700)},
+}
+
+# Canned results by tool name pattern; the first match wins.
+RESULTS = (
+    ("*assets*", lambda args: large_json(20, seed=len(json.dumps(args)))),
+    ("get_total_blocks_*", lambda args: json.dumps({"height": 21_000_000})),
+    ("*balance*", lambda args: json.dumps({"balance": "12.5", **args})),
+    ("*quote*", lambda args: json.dumps({"amount_out": "0.0998", "fee": "0.0002", **args})),
+    ("*gas*", lambda args: json.dumps({"gas": 21000, "gas_price_gwei": "12"})),
+    ("*_token", lambda args: json.dumps({"unsigned_tx": {"to": "0x" + "ab" * 20, "data": "0x" + "00" * 68}, **args})),
+    ("*", lambda args: json.dumps({"ok": True, **args})),
+)
+
+
+def sample_latency(median_ms: float, p95_ms: float, rng: random.Random) -> float:
+    """Seconds drawn from the log-normal distribution with this median and p95."""
+    if median_ms <= 0:
+        return 0.0
+    sigma = math.log(max(p95_ms, median_ms) / median_ms) / 1.645
+    return rng.lognormvariate(math.log(median_ms), sigma) / 1000
+
+
+def make_server(name: str, profile: Dict[str, Tuple[float, float]], rng: random.Random) -> Server:
+    server = Server(name)
+    tools = [
+        types.Tool(
+            name=tool_name,
+            description=description,
+            inputSchema={
+                "type": "object",
+                "properties": {p: {"type": "string", "description": f"The {p.replace('_', ' ')}."} for p in parameters},
+                "required": list(parameters),
+            },
+        )
+        for tool_name, description, parameters in STUB_TOOLS[name]
+    ]
+
+    @server.list_tools()
+    async def list_tools():
+        return tools
+
+    @server.call_tool()
+    async def call_tool(tool_name: str, arguments: dict):
+        delay = sample_latency(*profile[name], rng)
+        if delay:
+            await asyncio.sleep(delay)
+        result = next(fn for pattern, fn in RESULTS if fnmatch.fnmatchcase(tool_name, pattern))(arguments)
+        return [types.TextContent(type="text", text=result)]
+
+    return server
+
+
+class _Endpoint:
+    """ASGI app handing every request to a server's session manager."""
+
+    def __init__(self, manager: StreamableHTTPSessionManager):
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send):
+        await self.manager.handle_request(scope, receive, send)
+
+
+def create_app(profile: str = "fast", seed: int = 0) -> Starlette:
+    rng = random.Random(seed)
+    managers = {
+        name: StreamableHTTPSessionManager(app=make_server(name, LATENCY_PROFILES[profile], rng))
+        for name in STUB_TOOLS
+    }
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with contextlib.AsyncExitStack() as stack:
+            for manager in managers.values():
+                await stack.enter_async_context(manager.run())
+            yield
+
+    routes = [Route(f"/mcp/{name}", endpoint=_Endpoint(manager)) for name, manager in managers.items()]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def running_stub_server(profile: str = "fast", port: int = 0, seed: int = 0) -> Iterator[str]:
+    """Run the stub host in a subprocess, so it does not share the benchmark's CPU, and yield its URL."""
+    port = port or free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_mcp_server", "--port", str(port), "--profile", profile,
+         "--seed", str(seed)],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")]))},
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Stub MCP server exited with {process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Stub MCP server did not start within 30s")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        # Open streamable HTTP sessions keep a graceful shutdown waiting.
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18133)
+    parser.add_argument("--profile", choices=sorted(LATENCY_PROFILES), default="fast")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.profile, args.seed), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
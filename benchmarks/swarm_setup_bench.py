@@ -0,0 +1,106 @@
+"""Microbenchmark: per-request setup overhead of the swarm HTTP server.
+
+Compares the old request path (a new InMemorySaver plus ``workflow.compile``
+for every /chat request) with the current one (a single app compiled at
+startup and shared by all requests). Each request is timed from its start
+to the first update its run streams: setup, config resolution, the first
+checkpoint and the dispatch agent's first step.
+
+Nothing here touches the network: a scripted chat model answers at once,
+so both paths pay the same model cost, and the MCP tools are replaced by
+local stubs with the same shape.
+
+    python -m benchmarks.swarm_setup_bench --iterations 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.scenarios import SCENARIOS, swarm_responder
+from benchmarks.stats import percentile
+from multi_agent.swarm.langchain_swarm_http import build_workflow
+
+
+@tool
+def get_balance(address: str, chain: str) -> str:
+    """Get the token balances of an address on a chain."""
+    return "{}"
+
+
+@tool
+def get_chain_height(chain: str) -> str:
+    """Get the current block height of a chain."""
+    return "0"
+
+
+@tool
+def send_transaction(chain: str, from_address: str, to_address: str, token: str, amount: str) -> str:
+    """Send a token transfer transaction."""
+    return "0x"
+
+
+def stub_tools():
+    return {
+        "bridge_tools": [send_transaction],
+        "swap_tools": [send_transaction],
+        "transfer_tools": [get_balance, send_transaction],
+        "analysis_tools": [get_balance, get_chain_height],
+    }
+
+
+def report(name, samples):
+    print(
+        f"{name:<28} mean={statistics.fmean(samples) * 1e6:10.1f}us "
+        f"p50={percentile(samples, 50) * 1e6:10.1f}us "
+        f"p99={percentile(samples, 99) * 1e6:10.1f}us"
+    )
+
+
+async def first_step(agent, thread_id: str):
+    """Stream a new conversation until its run yields the first update, then stop it."""
+    config = {"configurable": {"thread_id": thread_id}}
+    message = {"role": "user", "content": SCENARIOS["ethereum height"].query}
+    stream = agent.astream({"messages": [message]}, config=config, stream_mode="updates")
+    try:
+        await anext(stream)
+    finally:
+        await stream.aclose()
+
+
+async def run(iterations: int):
+    model = ScriptedChatModel(respond=swarm_responder)
+    workflow = build_workflow(model, stub_tools())
+
+    before = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        agent = workflow.compile(checkpointer=InMemorySaver())
+        await first_step(agent, str(i))
+        before.append(time.perf_counter() - start)
+
+    shared_app = workflow.compile(checkpointer=InMemorySaver())
+    after = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await first_step(shared_app, str(i))
+        after.append(time.perf_counter() - start)
+
+    print(f"time to the first streamed update over {iterations} requests")
+    report("compile per request (old)", before)
+    report("shared compiled app (new)", after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
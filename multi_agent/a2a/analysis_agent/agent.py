@@ -7,6 +7,8 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel
 
+from multi_agent.common.llm_cache import llm_cache_for
+
 memory = MemorySaver()
 
 
@@ -34,12 +36,17 @@ class AnalysisAgent:
         'Set response status to completed if the request is complete.'
     )
 
-    def __init__(self, tools):
-        self.model = ChatOpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            openai_proxy="http://127.0.0.1:7890",
-            model="openai/gpt-4o-2024-11-20",
-        )
+    def __init__(self, tools, model=None):
+        # Any LangChain chat model can stand in, e.g. a scripted one in the offline benchmarks.
+        if model is None:
+            model = ChatOpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                openai_proxy="http://127.0.0.1:7890",
+                model="openai/gpt-4o-2024-11-20",
+                # Identical calls are answered from disk if LLM_CACHE_AGENTS lists this agent.
+                cache=llm_cache_for('analysis_agent'),
+            )
+        self.model = model
         self.tools = tools
 
         self.graph = create_react_agent(
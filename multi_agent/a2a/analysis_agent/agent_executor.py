@@ -16,8 +16,8 @@ logger = logging.getLogger(__name__)
 class AnalysisAgentExecutor(AgentExecutor):
     """Currency Conversion AgentExecutor Example."""
 
-    def __init__(self, tools):
-        self.agent = AnalysisAgent(tools)
+    def __init__(self, tools, model=None):
+        self.agent = AnalysisAgent(tools, model)
 
     async def execute(
         self,
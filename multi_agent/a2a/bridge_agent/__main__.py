@@ -13,6 +13,8 @@ from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from multi_agent.a2a.transfer_agent.agent import TransferAgent
 from multi_agent.a2a.transfer_agent.agent_executor import TransferAgentExecutor
+from multi_agent.common.mcp_tools import load_tools, mcp_connections
+from multi_agent.common.tool_snapshot import ToolSnapshot
 
 load_dotenv()
 
@@ -47,17 +49,19 @@ async def main(host, port):
         )
 
         # --8<-- [start:DefaultRequestHandler]
-        tools = await MultiServerMCPClient(
-            {
-                "analysis": {
-                    "url": "http://36.189.252.2:18133/mcp/bridge",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools()
         httpx_client = httpx.AsyncClient()
+
+        async def install_tools(server_name, server_tools):
+            # The MCP tool definitions changed: rebuild the agent with them.
+            agent_executor.agent = TransferAgent(server_tools)
+
+        # Tools come from the on-disk snapshot when there is one and are
+        # revalidated in the background once the server is running.
+        mcp_client = MultiServerMCPClient(mcp_connections(["bridge"]))
+        tools = await load_tools(mcp_client, on_tools=install_tools, snapshot=ToolSnapshot())
+        agent_executor = TransferAgentExecutor(tools.get("bridge", []))
         request_handler = DefaultRequestHandler(
-            agent_executor=TransferAgentExecutor(tools),
+            agent_executor=agent_executor,
             task_store=InMemoryTaskStore(),
             push_notifier=InMemoryPushNotifier(httpx_client),
         )
@@ -65,7 +69,8 @@ async def main(host, port):
             agent_card=agent_card, http_handler=request_handler
         )
 
-        uvicorn.run(server.build(), host=host, port=port)
+        # Serve on this event loop so the background tool refresh keeps running.
+        await uvicorn.Server(uvicorn.Config(server.build(), host=host, port=port)).serve()
         # --8<-- [end:DefaultRequestHandler]
 
     except MissingAPIKeyError as e:
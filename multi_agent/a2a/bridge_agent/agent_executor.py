@@ -16,8 +16,8 @@ logger = logging.getLogger(__name__)
 class TransferAgentExecutor(AgentExecutor):
     """Currency Conversion AgentExecutor Example."""
 
-    def __init__(self, tools):
-        self.agent = BridgeAgent(tools)
+    def __init__(self, tools, model=None):
+        self.agent = BridgeAgent(tools, model)
 
     async def execute(
         self,
@@ -1,7 +1,6 @@
 import asyncio
 
-import httpx
-
+from multi_agent.a2a.host_agent.card_cache import AgentCardCache
 from multi_agent.a2a.host_agent.host_agent import HostAgent
 import json # Needed for pretty printing dicts
 
@@ -59,7 +58,7 @@ async def main():
         'http://localhost:10002', # swap_agent
         'http://localhost:10003', # transfer_agent
     ],
-        http_client=httpx.AsyncClient(timeout=30)).create_agent()
+        card_cache=AgentCardCache()).create_agent()
 
     capital_runner = Runner(
         agent=root_agent,
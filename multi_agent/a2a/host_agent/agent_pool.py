@@ -0,0 +1,159 @@
+"""Pools of replicas serving the same remote agent.
+
+Cards with the same name are replicas of one agent: ``AgentPool`` holds a
+``RemoteAgentConnections`` per replica address and sends each request to
+one of them. A request continuing a conversation (one with a ``contextId``)
+goes to the replica that served the conversation before, since each
+replica keeps conversation state in its own memory. Other requests go to
+the replica with the fewest requests in flight (``least_outstanding``) or
+with the lowest moving average of latency, weighted by requests in flight
+(``ewma``). Replicas whose circuit is open are skipped.
+"""
+import logging
+import random
+import time
+from collections import OrderedDict
+
+from a2a.types import AgentCard, Message, MessageSendParams, Task
+
+from multi_agent.common.metrics import Counter, Gauge
+
+from .circuit_breaker import CircuitOpenError
+from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback, is_error_reply
+
+logger = logging.getLogger(__name__)
+
+LEAST_OUTSTANDING, EWMA = 'least_outstanding', 'ewma'
+# Conversations remembered per agent for sticky routing, least recently used first out.
+MAX_STICKY_CONTEXTS = 10000
+EWMA_ALPHA = 0.3
+
+REPLICA_OUTSTANDING = Gauge('a2a_replica_outstanding', 'Requests in flight per remote agent replica.',
+                            ['agent', 'replica'])
+REPLICA_REQUESTS = Counter('a2a_replica_requests_total',
+                           'Requests per remote agent replica by how the replica was chosen.',
+                           ['agent', 'replica', 'routing'])
+
+
+class Replica:
+    __slots__ = ('address', 'connection', 'outstanding', 'ewma')
+
+    def __init__(self, address: str, connection: RemoteAgentConnections):
+        self.address = address
+        self.connection = connection
+        self.outstanding = 0
+        # Seconds; 0 until the first call finished, so new replicas are tried first.
+        self.ewma = 0.0
+
+    def observe(self, elapsed: float, failed: bool):
+        """Adds the latency of a finished call to the moving average."""
+        if failed:
+            # A replica that fails fast must not look fast: a failure counts as a slow call,
+            # or as one that ran into the read timeout when the agent has no slow-call threshold.
+            slow = self.connection.breaker.slow_call_seconds
+            elapsed = max(elapsed, self.connection.timeouts.read if slow is None else slow)
+        self.ewma = elapsed if not self.ewma else EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.ewma
+
+    @property
+    def available(self) -> bool:
+        return self.connection.breaker.allows_calls
+
+
+class AgentPool:
+    """The replicas of one remote agent, used like a single ``RemoteAgentConnections``."""
+
+    def __init__(self, name: str, strategy: str = LEAST_OUTSTANDING):
+        if strategy not in (LEAST_OUTSTANDING, EWMA):
+            raise ValueError(f'Unknown routing strategy {strategy!r}')
+        self.name = name
+        self.strategy = strategy
+        self.replicas: dict[str, Replica] = {}
+        # contextId -> address of the replica holding the conversation
+        self.contexts: OrderedDict[str, str] = OrderedDict()
+
+    @property
+    def card(self) -> AgentCard:
+        return next(iter(self.replicas.values())).connection.card
+
+    def get_agent(self) -> AgentCard:
+        return self.card
+
+    @property
+    def available(self) -> bool:
+        return any(replica.available for replica in self.replicas.values())
+
+    def add(self, address: str, connection: RemoteAgentConnections):
+        """Adds the replica at ``address``, or replaces its connection after a card change."""
+        replica = self.replicas.get(address)
+        if replica is None:
+            self.replicas[address] = Replica(address, connection)
+        else:
+            replica.connection = connection
+
+    def remove(self, address: str):
+        self.replicas.pop(address, None)
+        for context_id in [c for c, a in self.contexts.items() if a == address]:
+            del self.contexts[context_id]
+
+    def _pin(self, context_id: str | None, address: str):
+        if not context_id:
+            return
+        self.contexts[context_id] = address
+        self.contexts.move_to_end(context_id)
+        while len(self.contexts) > MAX_STICKY_CONTEXTS:
+            self.contexts.popitem(last=False)
+
+    def _score(self, replica: Replica) -> tuple:
+        if self.strategy == EWMA:
+            return (replica.ewma * (replica.outstanding + 1), replica.outstanding)
+        return (replica.outstanding, replica.ewma)
+
+    def choose(self, request: MessageSendParams) -> tuple[Replica, str]:
+        """The replica to send ``request`` to, and how it was chosen."""
+        context_id = request.message.contextId
+        pinned = self.replicas.get(self.contexts.get(context_id, ''))
+        if pinned is not None:
+            if pinned.available:
+                self.contexts.move_to_end(context_id)
+                return pinned, 'sticky'
+            if request.message.taskId:
+                # Another replica does not know the task, so the request cannot move.
+                raise CircuitOpenError(self.name, pinned.connection.breaker.retry_after())
+        candidates = [r for r in self.replicas.values() if r.available]
+        if not candidates:
+            retry_after = min(r.connection.breaker.retry_after() for r in self.replicas.values())
+            raise CircuitOpenError(self.name, retry_after)
+        best = min(self._score(r) for r in candidates)
+        # Spread ties, e.g. between idle replicas, at random.
+        replica = random.choice([r for r in candidates if self._score(r) == best])
+        if pinned is not None:
+            logger.warning(f'Moving conversation {context_id} of {self.name} from unavailable {pinned.address} '
+                           f'to {replica.address}')
+            return replica, 'failover'
+        return replica, 'balanced'
+
+    async def send_message(
+        self,
+        request: MessageSendParams,
+        task_callback: TaskUpdateCallback | None,
+    ) -> Task | Message | None:
+        replica, routing = self.choose(request)
+        labels = {'agent': self.name, 'replica': replica.address}
+        REPLICA_REQUESTS.inc(routing=routing, **labels)
+        replica.outstanding += 1
+        REPLICA_OUTSTANDING.inc(**labels)
+        start, failed = time.monotonic(), True
+        try:
+            response = await replica.connection.send_message(request, task_callback)
+            failed = is_error_reply(response)
+        except CircuitOpenError:
+            # Nothing was sent, so there is no latency to learn from.
+            start = None
+            raise
+        finally:
+            replica.outstanding -= 1
+            REPLICA_OUTSTANDING.dec(**labels)
+            if start is not None:
+                replica.observe(time.monotonic() - start, failed)
+        self._pin(getattr(response, 'contextId', None) or request.message.contextId, replica.address)
+        return response
@@ -0,0 +1,126 @@
+"""On-disk cache of remote agent cards.
+
+The host agent routes by the cards of its remote agents, so it can start
+from the cards it saw last and revalidate them in the background. Each
+agent address is stored in its own JSON file with the card, the ETag the
+server sent with it (if any), a content hash and the time it was last
+validated. A card younger than the TTL is used without a request; an older
+one is revalidated with ``If-None-Match``, and a 304 only renews its time.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import NamedTuple
+
+import httpx
+
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+AGENT_CARD_PATH = '/.well-known/agent.json'
+DEFAULT_CACHE_DIR = './.a2a_card_cache'
+DEFAULT_TTL = 300.0
+
+
+def card_hash(card: AgentCard) -> str:
+    dumped = card.model_dump(mode='json', exclude_none=True)
+    return hashlib.sha256(
+        json.dumps(dumped, sort_keys=True, separators=(',', ':')).encode()
+    ).hexdigest()
+
+
+class CachedCard(NamedTuple):
+    card: AgentCard
+    etag: str | None
+    hash: str
+    validated_at: float
+
+
+class AgentCardCache:
+    """Stores the agent card of each remote agent address in a local directory."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, address: str) -> str:
+        return os.path.join(
+            self.directory,
+            hashlib.sha256(address.encode()).hexdigest()[:32] + '.json',
+        )
+
+    def is_fresh(self, cached: CachedCard) -> bool:
+        return time.time() - cached.validated_at < self.ttl
+
+    def load(self, address: str) -> CachedCard | None:
+        """The cached card of ``address``, fresh or not, or None."""
+        try:
+            with open(self._path(address)) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable agent card cache for {address}: {e}')
+            return None
+        if data.get('version') != CACHE_VERSION or data.get('address') != address:
+            return None
+        try:
+            card = AgentCard.model_validate(data['card'])
+        except ValueError as e:
+            logger.warning(f'Ignoring invalid cached agent card for {address}: {e}')
+            return None
+        return CachedCard(card, data.get('etag'), data['hash'], data['validated_at'])
+
+    def save(self, address: str, card: AgentCard, etag: str | None = None) -> CachedCard:
+        cached = CachedCard(card, etag, card_hash(card), time.time())
+        path = self._path(address)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(
+                {
+                    'version': CACHE_VERSION,
+                    'address': address,
+                    'etag': etag,
+                    'hash': cached.hash,
+                    'validated_at': cached.validated_at,
+                    'card': card.model_dump(mode='json', exclude_none=True),
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+        return cached
+
+
+async def fetch_card(
+    http_client: httpx.AsyncClient,
+    address: str,
+    cached: CachedCard | None = None,
+    cache: AgentCardCache | None = None,
+) -> CachedCard:
+    """Fetch the card of ``address``, revalidating ``cached`` with its ETag.
+
+    The result is saved to ``cache``. Raises ``httpx.HTTPError`` or
+    ``ValueError`` if the card cannot be fetched or is invalid.
+    """
+    headers = {'If-None-Match': cached.etag} if cached and cached.etag else {}
+    response = await http_client.get(
+        f'{address.rstrip("/")}{AGENT_CARD_PATH}', headers=headers
+    )
+    if response.status_code == 304 and cached is not None:
+        card, etag = cached.card, cached.etag
+    else:
+        response.raise_for_status()
+        card = AgentCard.model_validate(response.json())
+        etag = response.headers.get('etag')
+    if cache is None:
+        return CachedCard(card, etag, card_hash(card), time.time())
+    try:
+        return cache.save(address, card, etag)
+    except OSError as e:
+        logger.warning(f'Could not cache the agent card of {address}: {e}')
+        return CachedCard(card, etag, card_hash(card), time.time())
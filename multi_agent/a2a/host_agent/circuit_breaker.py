@@ -0,0 +1,167 @@
+"""Per-replica circuit breakers for the host agent's remote calls.
+
+A breaker watches the outcome and duration of the last ``window`` calls to
+one replica of a remote agent. Once at least ``min_calls`` have been seen,
+it opens when the share of failed calls reaches ``failure_rate`` or the
+share of calls slower than ``slow_call_seconds`` reaches ``slow_call_rate``.
+LLM agents routinely take tens of seconds per call, so latency alone never
+opens a circuit unless ``slow_call_seconds`` is set, usually per agent
+through ``AgentTimeouts.slow_call``.
+While it is open, calls fail at once with ``CircuitOpenError`` instead of
+waiting on a hung agent. After ``open_seconds`` (or as soon as a health
+probe succeeds) it lets one trial call through: success closes it, failure
+opens it again.
+
+Health probes open a closed breaker after ``probe_failures`` of them failed
+in a row, so an agent that stops answering is cut off before its callers
+have timed out ``min_calls`` times, but a single slow probe is not enough.
+"""
+import logging
+import time
+from collections import deque
+
+from multi_agent.common.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = Gauge('a2a_circuit_state', 'Circuit state per remote agent replica: 0 closed, 1 half-open, 2 open.',
+                      ['agent', 'replica'])
+CIRCUIT_TRANSITIONS = Counter('a2a_circuit_transitions_total', 'Circuit state changes per remote agent replica.',
+                              ['agent', 'replica', 'state'])
+REMOTE_CALLS = Counter('a2a_remote_calls_total', 'Calls to remote agent replicas by outcome.',
+                       ['agent', 'replica', 'outcome'])
+HEALTH_PROBES = Counter('a2a_health_probes_total', 'Agent card health probes by outcome.',
+                        ['agent', 'replica', 'outcome'])
+
+
+class CircuitOpenError(Exception):
+    """The remote agent's circuit is open; the call was not sent."""
+
+    def __init__(self, agent: str, retry_after: float):
+        super().__init__(f'{agent} is unavailable, retry in {retry_after:.0f}s')
+        self.agent = agent
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        agent: str,
+        replica: str = '',
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float | None = None,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        probe_failures: int = 3,
+    ):
+        self.agent = agent
+        self.replica = replica
+        self._labels = {'agent': agent, 'replica': replica}
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.probe_failures = probe_failures
+        # Health probes failed since the last one that succeeded.
+        self._failed_probes = 0
+        # (failed, slow) of the latest calls
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.reason = ''
+        self._trial_running = False
+        CIRCUIT_STATE.set(0, **self._labels)
+
+    def _transition(self, state: str, reason: str = ''):
+        if state == self.state:
+            return
+        logger.warning(f'Circuit of {self.agent} at {self.replica} {self.state} -> {state}'
+                       f'{f": {reason}" if reason else ""}')
+        self.state = state
+        self.reason = reason
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        if state == CLOSED:
+            self._calls.clear()
+        CIRCUIT_STATE.set(STATE_VALUES[state], **self._labels)
+        CIRCUIT_TRANSITIONS.inc(state=state, **self._labels)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    @property
+    def allows_calls(self) -> bool:
+        """Whether ``before_call`` would let a call through now."""
+        if self.state == OPEN:
+            return self.retry_after() == 0
+        return not (self.state == HALF_OPEN and self._trial_running)
+
+    def before_call(self):
+        """Raises ``CircuitOpenError`` unless a call may be sent now."""
+        if self.state == OPEN and self.retry_after() == 0:
+            self._transition(HALF_OPEN)
+        if self.state == OPEN or (self.state == HALF_OPEN and self._trial_running):
+            REMOTE_CALLS.inc(outcome='rejected', **self._labels)
+            raise CircuitOpenError(self.agent, self.retry_after() if self.state == OPEN else 1.0)
+        if self.state == HALF_OPEN:
+            self._trial_running = True
+
+    def record(self, duration: float, failed: bool):
+        """Records the outcome of a call allowed by ``before_call``."""
+        slow = self.slow_call_seconds is not None and duration >= self.slow_call_seconds
+        REMOTE_CALLS.inc(outcome='failed' if failed else 'slow' if slow else 'ok', **self._labels)
+        if self.state == HALF_OPEN:
+            self._trial_running = False
+            if failed or slow:
+                self._transition(OPEN, f'trial call {"failed" if failed else "was slow"}')
+            else:
+                self._transition(CLOSED)
+            return
+        self._calls.append((failed, slow))
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        failures = sum(f for f, _ in self._calls) / len(self._calls)
+        slow_calls = sum(s for _, s in self._calls) / len(self._calls)
+        if failures >= self.failure_rate:
+            self._transition(OPEN, f'{failures:.0%} of the last {len(self._calls)} calls failed')
+        elif slow_calls >= self.slow_call_rate:
+            self._transition(OPEN, f'{slow_calls:.0%} of the last {len(self._calls)} calls were slow')
+
+    def record_probe(self, ok: bool, error: str = ''):
+        """Records a health probe.
+
+        ``probe_failures`` failures in a row open the circuit, a success lets
+        a trial call through.
+        """
+        HEALTH_PROBES.inc(outcome='ok' if ok else 'failed', **self._labels)
+        if ok:
+            self._failed_probes = 0
+            if self.state == OPEN:
+                self._transition(HALF_OPEN)
+            return
+        self._failed_probes += 1
+        if self.state == OPEN:
+            # Keep the circuit open for another full period.
+            self.opened_at = time.monotonic()
+        elif self._failed_probes >= self.probe_failures and not self._trial_running:
+            self._transition(OPEN, f'{self._failed_probes} health probes failed in a row: {error}')
+
+    def snapshot(self) -> dict:
+        """The breaker's state for dashboards."""
+        calls = len(self._calls)
+        return {
+            'agent': self.agent,
+            'replica': self.replica,
+            'state': self.state,
+            'reason': self.reason,
+            'retry_after': round(self.retry_after(), 1) if self.state == OPEN else 0.0,
+            'window_calls': calls,
+            'failure_rate': round(sum(f for f, _ in self._calls) / calls, 3) if calls else 0.0,
+            'slow_call_rate': round(sum(s for _, s in self._calls) / calls, 3) if calls else 0.0,
+        }
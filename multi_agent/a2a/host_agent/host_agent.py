@@ -1,11 +1,12 @@
 import asyncio
 import base64
 import json
+import logging
+import time
 import uuid
 
 import httpx
 
-from a2a.client import A2ACardResolver
 from a2a.types import (
     AgentCard,
     DataPart,
@@ -20,11 +21,33 @@ from a2a.types import (
 from google.adk import Agent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
-from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
+from .agent_pool import LEAST_OUTSTANDING, AgentPool
+from .card_cache import DEFAULT_TTL, AgentCardCache, CachedCard, fetch_card
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .remote_agent_connection import (
+    CALL_TIMEOUT,
+    RemoteAgentConnections,
+    TaskUpdateCallback,
+)
+from .transport import TransportConfig
+
+logger = logging.getLogger(__name__)
+
+# send_messages runs at most this many branches at once and gives each this many seconds.
+FANOUT_CONCURRENCY = 4
+FANOUT_TIMEOUT = 60.0
+# How long a model turn waits for the first round of card fetches, and the
+# longest pause between retries of a card that could not be fetched.
+READY_TIMEOUT = 10.0
+MAX_CARD_RETRY_DELAY = 60.0
+# Every remote agent's card endpoint is probed this often, with this timeout.
+PROBE_INTERVAL = 15.0
+PROBE_TIMEOUT = 2.0
 
 
 class HostAgent:
@@ -37,37 +60,197 @@ class HostAgent:
     def __init__(
         self,
         remote_agent_addresses: list[str],
-        http_client: httpx.AsyncClient,
+        http_client: httpx.AsyncClient | None = None,
         task_callback: TaskUpdateCallback | None = None,
+        model: BaseLlm | None = None,
+        fanout_concurrency: int = FANOUT_CONCURRENCY,
+        fanout_timeout: float = FANOUT_TIMEOUT,
+        card_cache: AgentCardCache | None = None,
+        ready_timeout: float = READY_TIMEOUT,
+        breaker_options: dict | None = None,
+        call_timeout: float | None = CALL_TIMEOUT,
+        probe_interval: float = PROBE_INTERVAL,
+        probe_timeout: float = PROBE_TIMEOUT,
+        routing: str = LEAST_OUTSTANDING,
+        transport: TransportConfig | None = None,
     ):
         self.task_callback = task_callback
-        self.httpx_client = http_client
-        self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
+        # Defaults to GPT-4o through OpenRouter; the offline benchmarks pass a scripted model.
+        self.model = model
+        # Without a client, the host builds one from ``transport`` and closes it on close().
+        self.transport = transport or TransportConfig()
+        self.owns_http_client = http_client is None
+        self.httpx_client = http_client or self.transport.create_client(
+            remote_agent_addresses
+        )
+        self.fanout_concurrency = fanout_concurrency
+        self.fanout_timeout = fanout_timeout
+        # Cards with the same name are replicas of one agent, pooled under that name.
+        self.remote_agent_connections: dict[str, AgentPool] = {}
+        self.routing = routing
         self.cards: dict[str, AgentCard] = {}
         self.agents: str = ''
+        self.remote_agent_addresses = remote_agent_addresses
+        self.card_cache = card_cache
+        self.card_ttl = card_cache.ttl if card_cache else DEFAULT_TTL
+        self.ready_timeout = ready_timeout
+        # The card registered for each address, and why its last fetch failed.
+        self.card_entries: dict[str, CachedCard] = {}
+        self.card_errors: dict[str, str] = {}
+        self._ready = asyncio.Event()
+        # One breaker per replica address, kept when its card is replaced.
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.breaker_options = breaker_options or {}
+        self.call_timeout = call_timeout
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        # Route from the cached cards right away, stale or not; they are revalidated in the background.
+        if card_cache is not None:
+            for address in remote_agent_addresses:
+                cached = card_cache.load(address)
+                if cached is not None:
+                    self.card_entries[address] = cached
+                    self.register_agent_card(cached.card, address)
+            if len(self.card_entries) == len(remote_agent_addresses):
+                self._ready.set()
         loop = asyncio.get_running_loop()
-        loop.create_task(
+        self._card_task = loop.create_task(
             self.init_remote_agent_addresses(remote_agent_addresses)
         )
+        self._probe_task = loop.create_task(self.probe_remote_agents())
+
+    @property
+    def ready(self) -> bool:
+        """Whether every remote agent has a card or has failed its first fetch."""
+        return self._ready.is_set()
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        """Waits until the host is ready; returns whether every remote agent has a card.
+
+        Returns False if the host is not ready within ``timeout`` seconds.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except TimeoutError:
+            return False
+        return len(self.card_entries) == len(self.remote_agent_addresses)
+
+    async def close(self):
+        """Stops refreshing the agent cards and probing the agents."""
+        self._card_task.cancel()
+        self._probe_task.cancel()
+        if self.owns_http_client:
+            await self.httpx_client.aclose()
+
+    async def probe_remote_agents(self):
+        """Probes every remote agent's card endpoint each probe_interval seconds."""
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await asyncio.gather(
+                *(
+                    replica.connection.probe(self.probe_timeout)
+                    for pool in list(self.remote_agent_connections.values())
+                    for replica in list(pool.replicas.values())
+                )
+            )
+
+    def circuit_states(self) -> list[dict]:
+        """The circuit breaker state of every remote agent replica, for dashboards."""
+        return [breaker.snapshot() for breaker in self.breakers.values()]
 
     async def init_remote_agent_addresses(
         self, remote_agent_addresses: list[str]
     ):
-        async with asyncio.TaskGroup() as task_group:
-            for address in remote_agent_addresses:
-                task_group.create_task(self.retrieve_card(address))
-        # The task groups run in the background and complete.
-        # Once completed the self.agents string is set and the remote
-        # connections are established.
-
-    async def retrieve_card(self, address: str):
-        card_resolver = A2ACardResolver(self.httpx_client, address)
-        card = await card_resolver.get_agent_card()
-        self.register_agent_card(card)
-
-    def register_agent_card(self, card: AgentCard):
-        remote_connection = RemoteAgentConnections(self.httpx_client, card)
-        self.remote_agent_connections[card.name] = remote_connection
+        """Fetches the missing and stale cards, then keeps them current.
+
+        A card that cannot be fetched does not hold back the others; it is
+        retried with exponential backoff, while the rest are revalidated
+        once their TTL has passed.
+        """
+        delay = 0.0
+        while True:
+            due = [
+                address
+                for address in remote_agent_addresses
+                if address not in self.card_entries
+                or time.time() - self.card_entries[address].validated_at
+                >= self.card_ttl
+            ]
+            fetched = await asyncio.gather(
+                *(self.retrieve_card(address) for address in due)
+            )
+            self._ready.set()
+            if all(fetched):
+                delay = 0.0
+                await asyncio.sleep(self.card_ttl)
+            else:
+                delay = min(max(delay * 2, 1.0), MAX_CARD_RETRY_DELAY)
+                await asyncio.sleep(delay)
+
+    async def retrieve_card(self, address: str) -> bool:
+        """Fetches or revalidates the card of ``address``; returns whether that worked."""
+        previous = self.card_entries.get(address)
+        try:
+            entry = await fetch_card(
+                self.httpx_client, address, previous, self.card_cache
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            self.card_errors[address] = str(e) or repr(e)
+            logger.warning(f'Agent card fetch failed for {address}: {e!r}')
+            return False
+        self.card_errors.pop(address, None)
+        self.card_entries[address] = entry
+        if previous is None or previous.hash != entry.hash:
+            self.register_agent_card(
+                entry.card,
+                address,
+                replaces=previous.card.name if previous else None,
+            )
+        return True
+
+    def register_agent_card(
+        self,
+        card: AgentCard,
+        address: str | None = None,
+        replaces: str | None = None,
+    ):
+        """Adds the agent at ``address`` (the card's URL by default) to the pool of its name.
+
+        ``replaces`` is the name the address had before its card changed.
+        """
+        address = address or card.url
+        if replaces is not None and replaces != card.name:
+            old_pool = self.remote_agent_connections.get(replaces)
+            if old_pool is not None:
+                old_pool.remove(address)
+                if not old_pool.replicas:
+                    del self.remote_agent_connections[replaces]
+                    self.cards.pop(replaces, None)
+        timeouts = self.transport.timeouts(card.name)
+        breaker = self.breakers.get(address)
+        if breaker is None or breaker.agent != card.name:
+            options = dict(self.breaker_options)
+            if timeouts.slow_call is not None:
+                options['slow_call_seconds'] = timeouts.slow_call
+            breaker = self.breakers[address] = CircuitBreaker(
+                card.name, address, **options
+            )
+        pool = self.remote_agent_connections.get(card.name)
+        if pool is None:
+            pool = self.remote_agent_connections[card.name] = AgentPool(
+                card.name, self.routing
+            )
+        pool.add(
+            address,
+            RemoteAgentConnections(
+                self.httpx_client,
+                card,
+                breaker,
+                self.call_timeout,
+                timeouts,
+                address,
+            ),
+        )
         self.cards[card.name] = card
         agent_info = []
         for ra in self.list_remote_agents():
@@ -76,7 +259,7 @@ class HostAgent:
 
     def create_agent(self) -> Agent:
         return Agent(
-            model=LiteLlm(
+            model=self.model or LiteLlm(
                 model="openai/gpt-4o-2024-11-20",
                 api_base="https://openrouter.ai/api/v1",
                 # Alternatively, if endpoint uses an API key:
@@ -92,10 +275,15 @@ class HostAgent:
             tools=[
                 self.list_remote_agents,
                 self.send_message,
+                self.send_messages,
             ],
         )
 
-    def root_instruction(self, context: ReadonlyContext) -> str:
+    async def root_instruction(self, context: ReadonlyContext) -> str:
+        # The first turns after startup wait for the agent cards instead of
+        # running with an empty agent list.
+        if not self.ready:
+            await self.wait_ready(self.ready_timeout)
         current_agent = self.check_state(context)
         return f"""You are an expert delegator that can delegate the user request to the
 appropriate remote agents.
@@ -106,6 +294,10 @@ can use to delegate the task.
 
 Execution:
 - For actionable requests, you can use `send_message` to interact with remote agents to take action.
+- When a request needs several independent answers, such as the same question
+for several chains or questions for several agents, use `send_messages` to send
+them all at once instead of one `send_message` after another.
+- If an agent is unavailable, tell the user instead of sending it more messages.
 
 Be sure to include the remote agent name when you respond to the user.
 
@@ -144,7 +336,13 @@ Current agent: {current_agent['active_agent']}
         remote_agent_info = []
         for card in self.cards.values():
             remote_agent_info.append(
-                {'name': card.name, 'description': card.description}
+                {
+                    'name': card.name,
+                    'description': card.description,
+                    'available': self.remote_agent_connections[
+                        card.name
+                    ].available,
+                }
             )
         return remote_agent_info
 
@@ -189,8 +387,15 @@ Current agent: {current_agent['active_agent']}
                 acceptedOutputModes=['text', 'text/plain', 'image/png'],
             ),
         )
-        response = await client.send_message(request, self.task_callback)
+        try:
+            response = await client.send_message(request, self.task_callback)
+        except CircuitOpenError as e:
+            # Fail fast and tell the model, rather than waiting on a hung agent.
+            return {'status': 'unavailable', 'error': str(e)}
         if isinstance(response, Message):
+            # Continue the same conversation, on the same replica, next time.
+            if response.contextId:
+                state['context_id'] = response.contextId
             return await convert_parts(response.parts, tool_context)
         task: Task = response
         # Assume completion unless a state returns that isn't complete
@@ -213,18 +418,110 @@ Current agent: {current_agent['active_agent']}
         elif task.status.state == TaskState.failed:
             # Raise error for failure
             raise ValueError(f'Agent {agent_name} task {task.id} failed')
-        response = []
-        if task.status.message:
-            # Assume the information is in the task message.
-            response.extend(
-                await convert_parts(task.status.message.parts, tool_context)
+        return await convert_task(task, tool_context)
+
+    async def send_messages(
+        self,
+        agent_names: list[str],
+        messages: list[str],
+        tool_context: ToolContext,
+    ):
+        """Sends several independent tasks at the same time and returns all their results.
+
+        agent_names[i] receives messages[i]; an agent may appear more than
+        once to answer several sub-queries. Each message starts a new task,
+        so it must make sense on its own.
+
+        Args:
+          agent_names: The name of the agent to send each message to.
+          messages: The messages to send, one per agent name.
+          tool_context: The tool context this method runs in.
+
+        Returns:
+          One result per message, in the order given, each with its agent
+          name, message and status: "completed", "input_required", "failed",
+          "timeout" or "unavailable" (the agent's circuit is open). Such
+          branches do not hold back the results of the others.
+        """
+        if len(agent_names) != len(messages):
+            raise ValueError(
+                f'Got {len(agent_names)} agent names for {len(messages)} messages'
             )
-        if task.artifacts:
-            for artifact in task.artifacts:
-                response.extend(
-                    await convert_parts(artifact.parts, tool_context)
-                )
-        return response
+        unknown = sorted(
+            set(agent_names) - self.remote_agent_connections.keys()
+        )
+        if unknown:
+            raise ValueError(f'Agents {", ".join(unknown)} not found')
+        slots = asyncio.Semaphore(self.fanout_concurrency)
+
+        async def branch(agent_name: str, message: str) -> dict:
+            result = {'agent_name': agent_name, 'message': message}
+            async with slots:
+                try:
+                    status, output = await asyncio.wait_for(
+                        self.send_branch(agent_name, message, tool_context),
+                        self.fanout_timeout,
+                    )
+                except CircuitOpenError as e:
+                    result.update(status='unavailable', error=str(e))
+                except TimeoutError:
+                    result.update(
+                        status='timeout',
+                        error=f'No answer within {self.fanout_timeout:g}s',
+                    )
+                except Exception as e:
+                    result.update(status='failed', error=str(e))
+                else:
+                    result.update(status=status, result=output)
+            return result
+
+        return await asyncio.gather(
+            *(branch(a, m) for a, m in zip(agent_names, messages))
+        )
+
+    async def send_branch(
+        self, agent_name: str, message: str, tool_context: ToolContext
+    ) -> tuple[str, list]:
+        """Sends one message of send_messages as a new task; returns its status and output."""
+        client = self.remote_agent_connections[agent_name]
+        request = MessageSendParams(
+            id=str(uuid.uuid4()),
+            message=Message(
+                role='user',
+                parts=[TextPart(text=message)],
+                messageId=str(uuid.uuid4()),
+            ),
+            configuration=MessageSendConfiguration(
+                acceptedOutputModes=['text', 'text/plain', 'image/png'],
+            ),
+        )
+        response = await client.send_message(request, self.task_callback)
+        if isinstance(response, Message):
+            return 'completed', await convert_parts(response.parts, tool_context)
+        if not isinstance(response, Task):
+            # A JSON-RPC error from the remote agent.
+            raise ValueError(getattr(response, 'message', None) or repr(response))
+        if response.status.state in (TaskState.canceled, TaskState.failed):
+            raise ValueError(f'Task {response.id} {response.status.state.value}')
+        status = (
+            'input_required'
+            if response.status.state == TaskState.input_required
+            else 'completed'
+        )
+        return status, await convert_task(response, tool_context)
+
+
+async def convert_task(task: Task, tool_context: ToolContext):
+    response = []
+    if task.status.message:
+        # Assume the information is in the task message.
+        response.extend(
+            await convert_parts(task.status.message.parts, tool_context)
+        )
+    if task.artifacts:
+        for artifact in task.artifacts:
+            response.extend(await convert_parts(artifact.parts, tool_context))
+    return response
 
 
 async def convert_parts(parts: list[Part], tool_context: ToolContext):
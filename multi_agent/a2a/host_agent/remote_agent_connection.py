@@ -1,3 +1,6 @@
+import asyncio
+import time
+import typing
 from collections.abc import Callable
 from uuid import uuid4
 
@@ -17,16 +20,50 @@ from a2a.types import (
 )
 from a2a.utils import new_agent_text_message
 
+from .card_cache import AGENT_CARD_PATH
+from .circuit_breaker import CircuitBreaker
+from .transport import AgentTimeouts
+
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+# Longest non-streaming call, on top of the read timeout of its request.
+# Streamed calls have no overall limit: they end when the stream stays
+# silent for the stream idle timeout.
+CALL_TIMEOUT = 60.0
+
+# Every error type a JSON-RPC error reply can carry; they share no base class.
+JSONRPC_ERRORS = typing.get_args(JSONRPCErrorResponse.model_fields['error'].annotation)
+
+
+def is_error_reply(response) -> bool:
+    """Whether ``response`` is the error of a JSON-RPC error reply."""
+    return isinstance(response, JSONRPC_ERRORS)
+
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
-    def __init__(self, client: httpx.AsyncClient, agent_card: AgentCard):
-        self.agent_client = A2AClient(client, agent_card)
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        agent_card: AgentCard,
+        breaker: CircuitBreaker | None = None,
+        call_timeout: float | None = CALL_TIMEOUT,
+        timeouts: AgentTimeouts | None = None,
+        address: str | None = None,
+    ):
+        self.httpx_client = client
+        # Replicas may all advertise one URL in their cards, so calls go to
+        # the address the card was fetched from.
+        self.address = address or agent_card.url
+        self.agent_client = A2AClient(client, url=self.address)
         self.card = agent_card
+        self.call_timeout = call_timeout
+        self.timeouts = timeouts or AgentTimeouts()
+        self.breaker = breaker or CircuitBreaker(
+            agent_card.name, self.address, slow_call_seconds=self.timeouts.slow_call
+        )
         self.pending_tasks = set()
 
     def get_agent(self) -> AgentCard:
@@ -36,30 +73,80 @@ class RemoteAgentConnections:
         self,
         request: MessageSendParams,
         task_callback: TaskUpdateCallback | None,
+    ) -> Task | Message | None:
+        """Sends the request through the agent's circuit breaker.
+
+        Raises ``CircuitOpenError`` without sending anything while the
+        circuit is open. A non-streaming call raises ``TimeoutError`` if it
+        takes longer than ``call_timeout`` seconds; a streamed one fails
+        once no event arrived for ``timeouts.stream_idle`` seconds, however
+        long it has run. A JSON-RPC error reply is returned, but counts as
+        a failed call.
+        """
+        self.breaker.before_call()
+        start, failed = time.monotonic(), True
+        try:
+            call = self._send_message(request, task_callback)
+            if self.card.capabilities.streaming:
+                response = await call
+            else:
+                response = await asyncio.wait_for(call, self.call_timeout)
+            failed = is_error_reply(response)
+            return response
+        finally:
+            # Cancelled calls, such as timed out fan-out branches, count as failures.
+            self.breaker.record(time.monotonic() - start, failed)
+
+    async def probe(self, timeout: float) -> bool:
+        """Fetches the agent card endpoint as a health check and records the result."""
+        url = f'{self.address.rstrip("/")}{AGENT_CARD_PATH}'
+        try:
+            response = await self.httpx_client.get(url, timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.breaker.record_probe(False, repr(e))
+            return False
+        self.breaker.record_probe(True)
+        return True
+
+    async def _send_message(
+        self,
+        request: MessageSendParams,
+        task_callback: TaskUpdateCallback | None,
     ) -> Task | Message | None:
         if self.card.capabilities.streaming:
             task = None
+            result = None
             async for response in self.agent_client.send_message_streaming(
-                SendStreamingMessageRequest(id=str(uuid4()), params=request)
+                SendStreamingMessageRequest(id=str(uuid4()), params=request),
+                http_kwargs={'timeout': self.timeouts.stream_timeout()},
             ):
-                if not response.root.result:
-                    return response.root.error
+                # Read the stream to its end even after the result: a connection
+                # left with unread data is closed instead of kept alive.
+                if result is not None:
+                    continue
+                if isinstance(response.root, JSONRPCErrorResponse):
+                    result = response.root.error
+                    continue
                 # In the case a message is returned, that is the end of the interaction.
                 event = response.root.result
                 if isinstance(event, Message):
-                    return event
+                    result = event
+                    continue
                 if isinstance(event, TaskArtifactUpdateEvent):
-                    return new_agent_text_message(text=event.artifact.parts[0].root.text, context_id=event.contextId, task_id=event.taskId)
+                    result = new_agent_text_message(text=event.artifact.parts[0].root.text, context_id=event.contextId, task_id=event.taskId)
+                    continue
 
                 # Otherwise we are in the Task + TaskUpdate cycle.
                 if task_callback and event:
                     task = task_callback(event, self.card)
                 if hasattr(event, 'final') and event.final:
-                    return new_agent_text_message(text=event.status.message.parts[0].root.text, context_id=event.contextId, task_id=event.taskId)
-            return task
+                    result = new_agent_text_message(text=event.status.message.parts[0].root.text, context_id=event.contextId, task_id=event.taskId)
+            return result if result is not None else task
         # Non-streaming
         response = await self.agent_client.send_message(
-            SendMessageRequest(id=str(uuid4()), params=request)
+            SendMessageRequest(id=str(uuid4()), params=request),
+            http_kwargs={'timeout': self.timeouts.request_timeout()},
         )
         if isinstance(response.root, JSONRPCErrorResponse):
             return response.root.error
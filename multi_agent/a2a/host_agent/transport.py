@@ -0,0 +1,198 @@
+"""HTTP transport of the host agent's traffic to its remote agents.
+
+``TransportConfig`` builds the ``httpx.AsyncClient`` the host shares with
+every ``A2AClient``. Each remote agent origin (scheme, host and port) gets
+its own connection pool, sized and kept alive by a ``HostTransport``, so a
+busy agent cannot take every connection from the others. HTTP/2 is used
+where asked for and the optional ``h2`` package is installed.
+
+``AgentTimeouts`` are set per agent name: the connect timeout, the read
+timeout of ordinary requests, how long a streamed response may stay
+silent before it is abandoned, and the latency above which a call counts
+as slow for the agent's circuit breakers.
+
+Every pool is wrapped in a ``MeteredTransport``, which reports whether each
+request reused a kept-alive connection, how long it waited for one, and how
+saturated the pool is.
+"""
+import importlib.util
+import inspect
+import logging
+import time
+from typing import AsyncIterator, Callable, Iterable, NamedTuple
+
+import httpx
+
+from multi_agent.common.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUESTS = Counter('a2a_http_requests_total',
+                        'Requests to remote agent hosts by whether a kept-alive connection was reused.',
+                        ['host', 'connection'])
+HTTP_ERRORS = Counter('a2a_http_errors_total', 'Requests to remote agent hosts that failed.', ['host', 'error'])
+POOL_WAIT_SECONDS = Histogram('a2a_http_pool_wait_seconds',
+                              'Time from sending a request until its headers went out on a connection.',
+                              ['host'])
+POOL_CONNECTIONS = Gauge('a2a_http_pool_connections', 'Open connections per remote agent host.',
+                         ['host', 'state'])
+POOL_QUEUED = Gauge('a2a_http_pool_queued', 'Requests waiting for a connection per remote agent host.', ['host'])
+POOL_SATURATION = Gauge('a2a_http_pool_saturation', 'Active connections over the pool limit per remote agent host.',
+                        ['host'])
+
+
+class HostTransport(NamedTuple):
+    """Connection pool settings for one remote agent origin."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+
+
+class AgentTimeouts(NamedTuple):
+    """Timeouts in seconds for the requests to one remote agent."""
+    connect: float = 5.0
+    read: float = 30.0
+    # Longest silence between the events of a streamed response.
+    stream_idle: float = 120.0
+    # Longest wait for a free connection of the pool.
+    pool: float = 10.0
+    # Calls slower than this count towards opening the circuit; None never opens it for latency.
+    slow_call: float | None = None
+
+    def request_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(connect=self.connect, read=self.read, write=self.read, pool=self.pool)
+
+    def stream_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(connect=self.connect, read=self.stream_idle, write=self.read, pool=self.pool)
+
+
+def origin(url: str) -> str:
+    """``scheme://host:port`` of ``url``, with the default port filled in."""
+    parsed = httpx.URL(url)
+    port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    return f'{parsed.scheme}://{parsed.host}:{port}'
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Wraps the transport of one host and reports connection reuse, pool waits and saturation."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, host: str, max_connections: int):
+        self._transport = transport
+        self.host = host
+        self.max_connections = max_connections
+
+    def report_pool(self):
+        # The httpcore pool is not public API; without it only the request metrics are reported.
+        pool = getattr(self._transport, '_pool', None)
+        if pool is None:
+            return
+        connections = pool.connections
+        idle = sum(1 for c in connections if c.is_idle())
+        active = len(connections) - idle
+        POOL_CONNECTIONS.set(active, host=self.host, state='active')
+        POOL_CONNECTIONS.set(idle, host=self.host, state='idle')
+        POOL_QUEUED.set(sum(1 for r in getattr(pool, '_requests', ()) if r.connection is None), host=self.host)
+        POOL_SATURATION.set(active / self.max_connections, host=self.host)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        seen = {'connected': False, 'sent': None}
+        outer_trace = request.extensions.get('trace')
+
+        async def trace(event: str, info: dict):
+            if event == 'connection.connect_tcp.started':
+                seen['connected'] = True
+            elif event.endswith('.send_request_headers.started') and seen['sent'] is None:
+                seen['sent'] = time.monotonic()
+            if outer_trace is not None:
+                result = outer_trace(event, info)
+                if inspect.isawaitable(result):
+                    await result
+
+        request.extensions['trace'] = trace
+        self.report_pool()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            HTTP_ERRORS.inc(host=self.host, error=type(e).__name__)
+            self.report_pool()
+            raise
+        HTTP_REQUESTS.inc(host=self.host, connection='new' if seen['connected'] else 'reused')
+        if seen['sent'] is not None:
+            POOL_WAIT_SECONDS.observe(seen['sent'] - start, host=self.host)
+        self.report_pool()
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_MeteredStream(response.stream, self.report_pool),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class TransportConfig:
+    """Pool settings per remote agent origin and timeouts per remote agent name."""
+
+    def __init__(
+        self,
+        default_host: HostTransport = HostTransport(),
+        hosts: dict[str, HostTransport] | None = None,
+        default_timeouts: AgentTimeouts = AgentTimeouts(),
+        agent_timeouts: dict[str, AgentTimeouts] | None = None,
+    ):
+        self.default_host = default_host
+        # Keyed by agent address; only the origin of the address counts.
+        self.hosts = {origin(address): settings for address, settings in (hosts or {}).items()}
+        self.default_timeouts = default_timeouts
+        self.agent_timeouts = agent_timeouts or {}
+
+    def host(self, address: str) -> HostTransport:
+        return self.hosts.get(origin(address), self.default_host)
+
+    def timeouts(self, agent_name: str) -> AgentTimeouts:
+        return self.agent_timeouts.get(agent_name, self.default_timeouts)
+
+    def _transport(self, settings: HostTransport, host: str) -> MeteredTransport:
+        http2 = settings.http2
+        if http2 and importlib.util.find_spec('h2') is None:
+            logger.warning(f'HTTP/2 requested for {host} but the h2 package is not installed; using HTTP/1.1')
+            http2 = False
+        limits = httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+        return MeteredTransport(httpx.AsyncHTTPTransport(limits=limits, http2=http2), host,
+                                settings.max_connections)
+
+    def create_client(self, addresses: Iterable[str]) -> httpx.AsyncClient:
+        """A client with a pool of its own for the origin of each address, and a shared one for the rest."""
+        mounts = {}
+        for address in addresses:
+            key = origin(address)
+            if key not in mounts:
+                mounts[key] = self._transport(self.host(address), key.split('://', 1)[1])
+        return httpx.AsyncClient(
+            transport=self._transport(self.default_host, 'other'),
+            mounts=mounts,
+            timeout=self.default_timeouts.request_timeout(),
+        )
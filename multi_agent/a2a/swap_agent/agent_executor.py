@@ -16,8 +16,8 @@ logger = logging.getLogger(__name__)
 class SwapAgentExecutor(AgentExecutor):
     """Currency Conversion AgentExecutor Example."""
 
-    def __init__(self, tools):
-        self.agent = SwapAgent(tools)
+    def __init__(self, tools, model=None):
+        self.agent = SwapAgent(tools, model)
 
     async def execute(
         self,
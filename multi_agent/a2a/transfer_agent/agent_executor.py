@@ -16,8 +16,8 @@ logger = logging.getLogger(__name__)
 class TransferAgentExecutor(AgentExecutor):
     """Currency Conversion AgentExecutor Example."""
 
-    def __init__(self, tools):
-        self.agent = TransferAgent(tools)
+    def __init__(self, tools, model=None):
+        self.agent = TransferAgent(tools, model)
 
     async def execute(
         self,
@@ -0,0 +1,241 @@
+"""Exact-match cache of chat model responses in a local SQLite file.
+
+Many prompts repeat verbatim, e.g. the same first question with the same
+system prompt and tools. ``LLMResponseCache`` is a LangChain ``BaseCache``:
+set it as a chat model's ``cache`` and identical calls are answered from
+disk instead of the provider.
+
+Entries are keyed by a hash of the normalized messages and the model's
+``llm_string`` (model name, parameters and bound tools). Normalization drops
+what differs between otherwise identical conversations: message IDs,
+response and usage metadata, and tool call IDs, which are renumbered in
+order of appearance. The file is kept under ``max_bytes`` by evicting the
+least recently used entries.
+
+Nothing that leads to a transaction is cached: a turn that already called a
+tool that moves funds is neither looked up nor stored, and neither is a
+response that calls one. The cache is opt-in per agent through
+``LLM_CACHE_AGENTS``, a comma-separated list of agent names.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Sequence, Set
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration
+
+from multi_agent.common.metrics import Counter, Gauge
+from multi_agent.common.tool_cache import is_write_tool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./.llm_cache.sqlite")
+DEFAULT_LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+# Swarm handoff tools are named transfer_to_<agent>; they move the conversation, not funds.
+HANDOFF_TOOL = re.compile(r"^transfer_to_\w+_agent$")
+# Message fields that differ between otherwise identical conversations.
+VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+REQUESTS = Counter("llm_cache_requests_total", "Chat model calls seen by the response cache, by result.", ["result"])
+EVICTIONS = Counter("llm_cache_evictions_total", "Responses evicted from the cache to stay under its size limit.")
+BYTES = Gauge("llm_cache_bytes", "Approximate size of the cached responses.")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def _moves_funds(tool_name: Optional[str]) -> bool:
+    return bool(tool_name) and not HANDOFF_TOOL.match(tool_name) and is_write_tool(tool_name)
+
+
+def _current_turn(messages: Sequence[dict]) -> Sequence[dict]:
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("type") == "human":
+            return messages[i:]
+    return messages
+
+
+def _turn_moves_funds(messages: Sequence[dict]) -> bool:
+    for message in _current_turn(messages):
+        if message.get("type") == "tool" and _moves_funds(message.get("name")):
+            return True
+        if any(_moves_funds(call.get("name")) for call in message.get("tool_calls") or ()):
+            return True
+    return False
+
+
+def normalize_messages(prompt: str) -> List[dict]:
+    """The messages of a serialized prompt without IDs and metadata, tool call IDs renumbered."""
+    call_ids = {}
+    messages = []
+    for item in json.loads(prompt):
+        message = dict(item.get("kwargs", item))
+        for field in VOLATILE_FIELDS:
+            message.pop(field, None)
+        if message.get("additional_kwargs"):
+            # OpenAI keeps a raw copy of the tool calls here, IDs included.
+            message["additional_kwargs"] = {k: v for k, v in message["additional_kwargs"].items() if k != "tool_calls"}
+        if message.get("tool_calls"):
+            message["tool_calls"] = [
+                {**call, "id": call_ids.setdefault(call.get("id"), f"call_{len(call_ids)}")}
+                for call in message["tool_calls"]
+            ]
+        if "tool_call_id" in message:
+            message["tool_call_id"] = call_ids.get(message["tool_call_id"], message["tool_call_id"])
+        messages.append(message)
+    return messages
+
+
+class LLMResponseCache(BaseCache):
+    """``BaseCache`` backed by a SQLite file, bounded by the total size of its entries."""
+
+    def __init__(self, path: str = DEFAULT_LLM_CACHE_PATH, max_bytes: int = DEFAULT_LLM_CACHE_MAX_BYTES,
+                 ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._bytes = self._total_bytes()
+        BYTES.set_function(lambda: self._bytes)
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def key(self, prompt: str, llm_string: str) -> Optional[str]:
+        """The entry key of a call, or None if the call must not be cached."""
+        messages = normalize_messages(prompt)
+        if _turn_moves_funds(messages):
+            return None
+        payload = json.dumps(messages, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{llm_string}\x00{payload}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.key(prompt, llm_string)
+        if key is None:
+            REQUESTS.inc(result="skipped")
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._delete(key)
+                row = None
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        if row is None:
+            REQUESTS.inc(result="miss")
+            return None
+        REQUESTS.inc(result="hit")
+        return self._load(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not all(isinstance(g, ChatGeneration) for g in return_val):
+            return
+        if any(_moves_funds(call["name"]) for g in return_val for call in getattr(g.message, "tool_calls", ())):
+            return
+        key = self.key(prompt, llm_string)
+        if key is None:
+            return
+        value = self._dump(return_val)
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _delete(self, key: str):
+        row = self._conn.execute("DELETE FROM responses WHERE key = ? RETURNING size", (key,)).fetchone()
+        if row is not None:
+            self._bytes -= row[0]
+
+    def _evict(self):
+        # Other processes may share the file, so start from its actual size.
+        self._bytes = self._total_bytes()
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT 64) "
+                "RETURNING size"
+            ).fetchall()
+            if not rows:
+                break
+            self._bytes -= sum(size for size, in rows)
+            EVICTIONS.inc(len(rows))
+
+    @staticmethod
+    def _dump(generations: Sequence[ChatGeneration]) -> str:
+        return json.dumps([
+            {"message": message_to_dict(g.message), "generation_info": g.generation_info} for g in generations
+        ], default=str)
+
+    @staticmethod
+    def _load(value: str) -> List[ChatGeneration]:
+        generations = []
+        for item in json.loads(value):
+            message = messages_from_dict([item["message"]])[0]
+            # A fresh ID keeps add_messages from replacing an earlier copy of
+            # this reply, and nothing was spent on the call.
+            message.id = None
+            message.response_metadata = {**message.response_metadata, "cache_hit": True}
+            if hasattr(message, "usage_metadata"):
+                message.usage_metadata = None
+            generations.append(ChatGeneration(message=message, generation_info=item.get("generation_info")))
+        return generations
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._bytes = 0
+
+    def close(self):
+        self._conn.close()
+
+
+def llm_cache_agents() -> Set[str]:
+    """Names of the agents whose model calls are cached, from ``LLM_CACHE_AGENTS``."""
+    return {name.strip() for name in os.getenv("LLM_CACHE_AGENTS", "").split(",") if name.strip()}
+
+
+_default_cache: Optional[LLMResponseCache] = None
+
+
+def default_llm_cache() -> LLMResponseCache:
+    """The process-wide response cache, configured from the environment on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMResponseCache()
+    return _default_cache
+
+
+def llm_cache_for(agent: str) -> Optional[LLMResponseCache]:
+    """The response cache if ``agent`` opted in through ``LLM_CACHE_AGENTS``, else None."""
+    return default_llm_cache() if agent in llm_cache_agents() else None
@@ -0,0 +1,212 @@
+"""Pooled, persistent MCP client sessions.
+
+Tools built by ``langchain_mcp_adapters`` without a session open a new
+connection and run the MCP handshake for every call. ``MCPSessionPool``
+keeps initialized sessions to one server alive and checks them out one call
+at a time, which also caps the number of concurrent calls per server.
+
+A session's transport lives in an anyio task group that must be exited by
+the task that entered it, so every pooled session is owned by a background
+task that opens it, waits until it is closed, and then tears it down.
+
+The pool implements ``call_tool`` like ``ClientSession``, so it can be passed
+as the session of ``convert_mcp_tool_to_langchain_tool``.
+"""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+import httpx
+from langchain_mcp_adapters.sessions import create_session
+from mcp.shared.exceptions import McpError
+
+from multi_agent.common.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Error code the streamable HTTP transport reports when the server answers 404
+# for our session id (e.g. after a restart); the call was not executed.
+SESSION_TERMINATED = 32600
+# HTTP statuses with which servers reject an unknown session id. Other SDK
+# versions raise these from the transport instead of reporting 32600.
+SESSION_REJECTED_STATUSES = (400, 404)
+
+SESSIONS_OPENED = Counter("mcp_sessions_opened_total", "MCP sessions opened by the session pool.", ["server"])
+SESSIONS_DISCARDED = Counter("mcp_sessions_discarded_total", "Pooled MCP sessions dropped as dead or idle.",
+                             ["server", "reason"])
+CONNECT_SECONDS = Histogram("mcp_session_connect_seconds", "Time to open and initialize an MCP session.", ["server"])
+CALL_SECONDS = Histogram("mcp_tool_call_server_seconds", "Time from sending a tool call to its result.",
+                         ["server", "tool"])
+CALLS = Counter("mcp_tool_calls_total", "Pooled MCP tool calls by whether a live session was reused.",
+                ["server", "reused"])
+
+
+class SessionLost(ConnectionError):
+    """The pooled session closed while a call was waiting for its result."""
+
+    def __init__(self, server: str, cause: Optional[BaseException]):
+        super().__init__(f"MCP session to {server} closed during a tool call: {cause!r}")
+        self.cause = cause
+
+    @property
+    def rejected(self) -> bool:
+        """Whether the server refused the session, so the call never ran."""
+        errors = [self.cause]
+        while errors:
+            error = errors.pop()
+            if isinstance(error, BaseExceptionGroup):
+                errors.extend(error.exceptions)
+            elif isinstance(error, httpx.HTTPStatusError):
+                return error.response.status_code in SESSION_REJECTED_STATUSES
+        return False
+
+
+def _session_terminated(error: BaseException) -> bool:
+    if isinstance(error, McpError):
+        return error.error.code == SESSION_TERMINATED
+    return isinstance(error, SessionLost) and error.rejected
+
+
+class _PooledSession:
+    def __init__(self):
+        self.session = None
+        self.error: Optional[BaseException] = None
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self.task is not None and not self.task.done()
+
+    def close(self):
+        self.stop.set()
+
+
+class MCPSessionPool:
+    """Keeps up to ``max_sessions`` initialized sessions to one MCP server."""
+
+    def __init__(
+        self,
+        connection: Dict[str, Any],
+        name: Optional[str] = None,
+        max_sessions: int = 4,
+        idle_timeout: float = 300.0,
+        call_timeout: float = 120.0,
+    ):
+        self.connection = connection
+        self.name = name or connection.get("url", "mcp")
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.call_timeout = timedelta(seconds=call_timeout)
+        self._slots = asyncio.Semaphore(max_sessions)
+        self._idle: list = []
+
+    async def _own(self, pooled: _PooledSession):
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                pooled.session = session
+                pooled.ready.set()
+                await pooled.stop.wait()
+        except BaseException as e:
+            pooled.error = e
+            if not isinstance(e, asyncio.CancelledError):
+                logger.warning(f"MCP session to {self.name} closed with an error: {e!r}")
+        finally:
+            pooled.session = None
+            pooled.ready.set()
+
+    async def _open(self) -> _PooledSession:
+        pooled = _PooledSession()
+        start = time.perf_counter()
+        pooled.task = asyncio.create_task(self._own(pooled))
+        await pooled.ready.wait()
+        if pooled.session is None:
+            raise pooled.error or ConnectionError(f"Could not open an MCP session to {self.name}")
+        CONNECT_SECONDS.observe(time.perf_counter() - start, server=self.name)
+        SESSIONS_OPENED.inc(server=self.name)
+        return pooled
+
+    def _checkout_idle(self) -> Optional[_PooledSession]:
+        now = time.monotonic()
+        while self._idle:
+            pooled = self._idle.pop()
+            if not pooled.alive:
+                SESSIONS_DISCARDED.inc(server=self.name, reason="dead")
+            elif now - pooled.last_used > self.idle_timeout:
+                pooled.close()
+                SESSIONS_DISCARDED.inc(server=self.name, reason="idle")
+            else:
+                return pooled
+        return None
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs):
+        """Call a tool on a pooled session, opening one if none is idle."""
+        kwargs.setdefault("read_timeout_seconds", self.call_timeout)
+        async with self._slots:
+            pooled = self._checkout_idle()
+            reused = pooled is not None
+            if pooled is None:
+                pooled = await self._open()
+            try:
+                try:
+                    result = await self._call(pooled, name, arguments, kwargs)
+                except (McpError, SessionLost) as e:
+                    if not reused or not _session_terminated(e):
+                        raise
+                    # The server dropped our session; the call never ran, so retry on a fresh one.
+                    pooled.close()
+                    SESSIONS_DISCARDED.inc(server=self.name, reason="terminated")
+                    reused = False
+                    pooled = await self._open()
+                    result = await self._call(pooled, name, arguments, kwargs)
+            except BaseException:
+                pooled.close()
+                SESSIONS_DISCARDED.inc(server=self.name, reason="error")
+                raise
+            pooled.last_used = time.monotonic()
+            self._idle.append(pooled)
+            CALLS.inc(server=self.name, reused=str(reused).lower())
+            return result
+
+    async def _call(self, pooled: _PooledSession, name, arguments, kwargs):
+        start = time.perf_counter()
+        # A transport error ends the owner task without failing the pending
+        # request, so wait on both and give up on the call if the owner ends.
+        call = asyncio.ensure_future(pooled.session.call_tool(name, arguments, **kwargs))
+        try:
+            await asyncio.wait((call, pooled.task), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not call.done():
+                call.cancel()
+        if not call.done() or call.cancelled():
+            raise SessionLost(self.name, pooled.error)
+        result = call.result()
+        CALL_SECONDS.observe(time.perf_counter() - start, server=self.name, tool=name)
+        return result
+
+    async def aclose(self):
+        sessions, self._idle = self._idle, []
+        for pooled in sessions:
+            pooled.close()
+        await asyncio.gather(*(p.task for p in sessions if p.task), return_exceptions=True)
+
+
+_pools: Dict[str, MCPSessionPool] = {}
+
+
+def get_session_pool(connection: Dict[str, Any], name: Optional[str] = None, **kwargs) -> MCPSessionPool:
+    """The process-wide pool for the server at ``connection["url"]``."""
+    url = connection["url"]
+    if url not in _pools:
+        _pools[url] = MCPSessionPool(connection, name=name, **kwargs)
+    return _pools[url]
+
+
+async def close_session_pools():
+    await asyncio.gather(*(pool.aclose() for pool in _pools.values()))
+    _pools.clear()
@@ -0,0 +1,182 @@
+"""Discovery of the MCP tools served by the remote MCP host.
+
+All servers are configured on one ``MultiServerMCPClient`` and discovered
+concurrently. A server that fails does not fail the others; it is retried in
+the background by ``refresh_tools``.
+
+With a ``ToolSnapshot``, ``load_tools`` builds tools from the definitions on
+disk without any network round-trip and revalidates them in the background,
+calling back only for servers whose definitions changed.
+
+The tools call their server through a persistent ``MCPSessionPool`` instead
+of opening a session per call, behind a TTL cache for read-only tools.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import Tool as MCPTool
+
+from multi_agent.common.mcp_session_pool import get_session_pool
+from multi_agent.common.tool_cache import CachedToolSession, default_tool_cache
+from multi_agent.common.tool_snapshot import ToolSnapshot
+
+logger = logging.getLogger(__name__)
+
+MCP_HOST = "http://36.189.252.2:18133"
+MCP_SERVERS = ("bridge", "swap", "transfer", "analysis")
+
+OnTools = Callable[[str, List[BaseTool]], Awaitable[None]]
+
+# Keeps background refresh tasks alive until they finish.
+_background_tasks = set()
+
+
+def mcp_connections(server_names: Iterable[str] = MCP_SERVERS, host: str = MCP_HOST) -> dict:
+    """Connection config for ``MultiServerMCPClient`` with one entry per server."""
+    return {
+        name: {
+            "url": f"{host}/mcp/{name}",
+            "transport": "streamable_http",
+        }
+        for name in server_names
+    }
+
+
+async def fetch_tool_definitions(client: MultiServerMCPClient, server_name: str) -> List[MCPTool]:
+    """List the raw MCP tool definitions of one server, following pagination."""
+    definitions, cursor = [], None
+    async with client.session(server_name) as session:
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            definitions.extend(page.tools)
+            if not page.nextCursor:
+                return definitions
+            cursor = page.nextCursor
+
+
+def to_langchain_tools(client: MultiServerMCPClient, server_name: str,
+                       definitions: List[MCPTool]) -> List[BaseTool]:
+    """Wrap ``definitions`` as tools that call the server through its shared session pool.
+
+    Read-only tools are answered from the process-wide result cache while fresh.
+    """
+    pool = get_session_pool(client.connections[server_name], name=server_name)
+    session = CachedToolSession(pool, server_name, default_tool_cache())
+    return [convert_mcp_tool_to_langchain_tool(session, d) for d in definitions]
+
+
+async def discover_tools(
+    client: MultiServerMCPClient,
+    server_names: Optional[Iterable[str]] = None,
+    snapshot: Optional[ToolSnapshot] = None,
+) -> Tuple[Dict[str, List[BaseTool]], Dict[str, BaseException]]:
+    """Load the tools of every server concurrently over the network.
+
+    Returns the tools of the servers that answered and the error of each
+    server that did not. Fetched definitions are saved to ``snapshot``.
+    """
+    names = list(server_names or client.connections)
+    results = await asyncio.gather(
+        *(fetch_tool_definitions(client, name) for name in names),
+        return_exceptions=True,
+    )
+    tools, failed = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"MCP tool discovery failed for {name}: {result!r}")
+            failed[name] = result
+            continue
+        if snapshot is not None:
+            snapshot.save(client.connections[name]["url"], result)
+        tools[name] = to_langchain_tools(client, name, result)
+    return tools, failed
+
+
+def snapshot_tools(
+    client: MultiServerMCPClient,
+    snapshot: ToolSnapshot,
+    server_names: Optional[Iterable[str]] = None,
+) -> Dict[str, List[BaseTool]]:
+    """Build tools from the snapshot for every server that has one."""
+    tools = {}
+    for name in server_names or client.connections:
+        saved = snapshot.load(client.connections[name]["url"])
+        if saved is not None:
+            tools[name] = to_langchain_tools(client, name, saved[1])
+    return tools
+
+
+async def refresh_tools(
+    client: MultiServerMCPClient,
+    server_names: Iterable[str],
+    on_tools: OnTools,
+    snapshot: Optional[ToolSnapshot] = None,
+    initial_delay: float = 0.0,
+    max_delay: float = 60.0,
+):
+    """Fetch the servers' definitions, retrying failures with exponential backoff.
+
+    ``on_tools`` is awaited for each server whose definitions differ from the
+    snapshot (or for every server, without a snapshot).
+    """
+    pending = list(server_names)
+    delay = initial_delay
+    while pending:
+        if delay:
+            await asyncio.sleep(delay)
+        results = await asyncio.gather(
+            *(fetch_tool_definitions(client, name) for name in pending),
+            return_exceptions=True,
+        )
+        failed = []
+        for name, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"MCP tool refresh failed for {name}: {result!r}")
+                failed.append(name)
+                continue
+            if snapshot is None or snapshot.save(client.connections[name]["url"], result):
+                logger.info(f"MCP tools updated for {name}: {len(result)} tools")
+                await on_tools(name, to_langchain_tools(client, name, result))
+        pending = failed
+        delay = min(max(delay * 2, 1.0), max_delay)
+
+
+def spawn_refresh(*args, **kwargs) -> asyncio.Task:
+    """Run ``refresh_tools`` in the background."""
+    task = asyncio.create_task(refresh_tools(*args, **kwargs))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def load_tools(
+    client: MultiServerMCPClient,
+    on_tools: OnTools,
+    server_names: Optional[Iterable[str]] = None,
+    snapshot: Optional[ToolSnapshot] = None,
+) -> Dict[str, List[BaseTool]]:
+    """Tools for every server, from the snapshot where possible.
+
+    Servers found in the snapshot are returned without a network call and
+    revalidated in the background; the others are fetched now, and the ones
+    that fail are retried in the background. ``on_tools`` receives the new
+    tools of a server whenever they change after this call returns.
+    """
+    names = list(server_names or client.connections)
+    tools = snapshot_tools(client, snapshot, names) if snapshot is not None else {}
+    from_snapshot = list(tools)
+    failed = {}
+    missing = [name for name in names if name not in tools]
+    if missing:
+        fetched, failed = await discover_tools(client, missing, snapshot)
+        tools.update(fetched)
+    # Started last, so no callback can fire before the caller has the tools.
+    if from_snapshot:
+        spawn_refresh(client, from_snapshot, on_tools, snapshot)
+    if failed:
+        spawn_refresh(client, list(failed), on_tools, snapshot, initial_delay=1.0)
+    return tools
@@ -0,0 +1,121 @@
+"""In-flight deduplication of identical concurrent work.
+
+``SingleFlight.do`` runs one coroutine per key and hands its result (or
+error) to every caller that asks for the same key while it is running.
+``StreamFlight.stream`` does the same for async iterators: the first caller
+starts the producer and every caller, including late ones, receives all of
+its items from the start.
+
+Nothing is kept once the work finishes; this is not a cache.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List
+
+from multi_agent.common.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+CALLS = Counter("single_flight_calls_total", "Deduplicated calls by whether they ran the work or joined it.",
+                ["flight", "role"])
+
+
+def _consume_error(future: asyncio.Future):
+    # Followers may all be gone by the time the work fails.
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Shares the result of one running coroutine between callers with the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._running: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._running.get(key)
+        if future is None:
+            CALLS.inc(flight=self.name, role="leader")
+            future = self._running[key] = asyncio.ensure_future(fn())
+            future.add_done_callback(lambda f: self._forget(key, f))
+            future.add_done_callback(_consume_error)
+        else:
+            CALLS.inc(flight=self.name, role="follower")
+        # A caller that goes away must not cancel the work the others wait for.
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._running.get(key) is future:
+            del self._running[key]
+
+    def __len__(self):
+        return len(self._running)
+
+
+class _Broadcast:
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def _notify(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def produce(self, iterator: AsyncIterator):
+        try:
+            async for item in iterator:
+                self.items.append(item)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    async def subscribe(self) -> AsyncIterator:
+        i = 0
+        while True:
+            changed = self.changed
+            while i < len(self.items):
+                yield self.items[i]
+                i += 1
+            if self.done:
+                break
+            await changed.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class StreamFlight:
+    """Shares the items of one running async iterator between callers with the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._running: Dict[Hashable, _Broadcast] = {}
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        broadcast = self._running.get(key)
+        if broadcast is None:
+            CALLS.inc(flight=self.name, role="leader")
+            broadcast = self._running[key] = _Broadcast()
+            # The producer runs on its own, so a disconnecting caller does not
+            # cut the stream short for the others.
+            broadcast.task = asyncio.create_task(broadcast.produce(factory()))
+            broadcast.task.add_done_callback(lambda _: self._forget(key, broadcast))
+        else:
+            CALLS.inc(flight=self.name, role="follower")
+        return broadcast.subscribe()
+
+    def _forget(self, key: Hashable, broadcast: _Broadcast):
+        if self._running.get(key) is broadcast:
+            del self._running[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._running
+
+    def __len__(self):
+        return len(self._running)
@@ -0,0 +1,216 @@
+"""TTL cache for the results of read-only MCP tools.
+
+Agents often call the same read-only tool with the same arguments within
+seconds, e.g. the current block height or the assets of one address. Only
+tools whose name matches a configured TTL pattern are cached, results that
+are errors are never stored, and tools that move funds are excluded even if
+a pattern matches them.
+
+TTLs are ``fnmatch`` patterns over tool names mapped to seconds; they can be
+overridden with a JSON object in ``MCP_TOOL_CACHE_TTLS``. Identical concurrent
+calls share one upstream call only for tools known to be read-only: those with
+a TTL, and those matching ``READ_ONLY_TOOL_PATTERNS`` (a JSON list in
+``MCP_READ_ONLY_TOOLS``). Every other tool is called as is.
+"""
+import fnmatch
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from multi_agent.common.metrics import Counter, Gauge
+from multi_agent.common.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTLS = {
+    "get_total_blocks_*": 5.0,
+    "get_*height*": 5.0,
+    "get_exchange_rate*": 10.0,
+    "get_*price*": 10.0,
+    "get_*balance*": 15.0,
+    "get_*assets*": 15.0,
+    "get_token_info*": 300.0,
+}
+# Read-only tools that are not cached but whose concurrent identical calls may be shared.
+READ_ONLY_TOOL_PATTERNS = ("get_*", "list_*")
+# Tools that change state are never cached or shared, whatever the patterns above say.
+WRITE_TOOL_PATTERNS = ("*transfer*", "*swap*", "*bridge*", "*send*", "*approve*", "*sign*")
+
+HITS = Counter("mcp_tool_cache_hits_total", "MCP tool calls answered from the result cache.", ["tool"])
+MISSES = Counter("mcp_tool_cache_misses_total", "Cacheable MCP tool calls that went upstream.", ["tool"])
+EVICTIONS = Counter("mcp_tool_cache_evictions_total", "MCP tool results dropped from the cache.", ["reason"])
+ENTRIES = Gauge("mcp_tool_cache_entries", "MCP tool results held in the cache.")
+BYTES = Gauge("mcp_tool_cache_bytes", "Approximate size of the cached MCP tool results.")
+
+TOOL_FLIGHT = SingleFlight("mcp_tool")
+
+
+def ttls_from_env() -> Dict[str, float]:
+    raw = os.getenv("MCP_TOOL_CACHE_TTLS")
+    if not raw:
+        return dict(DEFAULT_TTLS)
+    try:
+        return {str(k): float(v) for k, v in json.loads(raw).items()}
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid MCP_TOOL_CACHE_TTLS: {e}")
+        return dict(DEFAULT_TTLS)
+
+
+def read_only_patterns_from_env() -> Tuple[str, ...]:
+    raw = os.getenv("MCP_READ_ONLY_TOOLS")
+    if not raw:
+        return READ_ONLY_TOOL_PATTERNS
+    try:
+        patterns = json.loads(raw)
+        if not isinstance(patterns, list):
+            raise ValueError("expected a JSON list of patterns")
+        return tuple(str(p) for p in patterns)
+    except ValueError as e:
+        logger.warning(f"Ignoring invalid MCP_READ_ONLY_TOOLS: {e}")
+        return READ_ONLY_TOOL_PATTERNS
+
+
+def is_write_tool(tool_name: str) -> bool:
+    name = tool_name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in WRITE_TOOL_PATTERNS)
+
+
+def normalize_arguments(arguments: Optional[Dict[str, Any]]) -> str:
+    """Canonical JSON for ``arguments``: sorted keys, no None values, trimmed strings."""
+
+    def normalize(value):
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items() if v is not None}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    return json.dumps(normalize(arguments or {}), sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """LRU map of ``(server, tool, arguments)`` to results, bounded by entries and bytes."""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 10_000,
+        max_bytes: int = 32 * 1024 * 1024,
+        read_only: Optional[Tuple[str, ...]] = None,
+    ):
+        self.ttls = ttls_from_env() if ttls is None else ttls
+        self.read_only = read_only_patterns_from_env() if read_only is None else tuple(read_only)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (expires_at, size, result)
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._ttl_by_tool: Dict[str, Optional[float]] = {}
+        self._read_only_by_tool: Dict[str, bool] = {}
+        ENTRIES.set_function(lambda: len(self._entries))
+        BYTES.set_function(lambda: self._bytes)
+
+    def ttl(self, tool_name: str) -> Optional[float]:
+        """Seconds to cache ``tool_name`` for, or None if it is not cacheable."""
+        if tool_name not in self._ttl_by_tool:
+            ttl = None
+            if not is_write_tool(tool_name):
+                for pattern, seconds in self.ttls.items():
+                    if fnmatch.fnmatchcase(tool_name, pattern):
+                        ttl = seconds if seconds > 0 else None
+                        break
+            self._ttl_by_tool[tool_name] = ttl
+        return self._ttl_by_tool[tool_name]
+
+    def is_read_only(self, tool_name: str) -> bool:
+        """Whether ``tool_name`` is known not to change state, so identical calls may share a result."""
+        if tool_name not in self._read_only_by_tool:
+            self._read_only_by_tool[tool_name] = self.ttl(tool_name) is not None or (
+                not is_write_tool(tool_name)
+                and any(fnmatch.fnmatchcase(tool_name, pattern) for pattern in self.read_only)
+            )
+        return self._read_only_by_tool[tool_name]
+
+    def key(self, server: str, tool_name: str, arguments: Optional[Dict[str, Any]]):
+        return server, tool_name, normalize_arguments(arguments)
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key, "expired")
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key, result, ttl: float):
+        size = len(result.model_dump_json()) if hasattr(result, "model_dump_json") else len(repr(result))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key, "replaced")
+        self._entries[key] = (time.monotonic() + ttl, size, result)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)), "lru")
+
+    def _remove(self, key, reason: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        EVICTIONS.inc(reason=reason)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+class CachedToolSession:
+    """Wraps an object with ``call_tool`` and answers cacheable calls from ``cache``.
+
+    Identical concurrent calls of tools known to be read-only share one
+    upstream call, whether or not the tool is cached; any other tool is
+    called straight through.
+    """
+
+    def __init__(self, session, server: str, cache: ToolResultCache, flight: Optional[SingleFlight] = None):
+        self.session = session
+        self.server = server
+        self.cache = cache
+        self.flight = flight or TOOL_FLIGHT
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs):
+        if not self.cache.is_read_only(name):
+            return await self.session.call_tool(name, arguments, **kwargs)
+        key = self.cache.key(self.server, name, arguments)
+        ttl = self.cache.ttl(name)
+        if ttl is None:
+            return await self.flight.do(key, lambda: self.session.call_tool(name, arguments, **kwargs))
+        result = self.cache.get(key)
+        if result is not None:
+            HITS.inc(tool=name)
+            return result
+        return await self.flight.do(key, lambda: self._fetch(key, ttl, name, arguments, kwargs))
+
+    async def _fetch(self, key, ttl: float, name: str, arguments, kwargs):
+        MISSES.inc(tool=name)
+        result = await self.session.call_tool(name, arguments, **kwargs)
+        if not getattr(result, "isError", False):
+            self.cache.put(key, result, ttl)
+        return result
+
+
+_default_cache: Optional[ToolResultCache] = None
+
+
+def default_tool_cache() -> ToolResultCache:
+    """The process-wide cache, configured from the environment on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ToolResultCache()
+    return _default_cache
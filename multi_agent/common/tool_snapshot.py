@@ -0,0 +1,76 @@
+"""Versioned on-disk snapshot of MCP tool definitions.
+
+Tool schemas rarely change, so a process can build its agents from the last
+definitions it saw and revalidate them in the background. Each MCP server
+URL is stored in its own JSON file together with a content hash of its tool
+definitions; a new fetch replaces the file only when that hash changes.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+from mcp.types import Tool as MCPTool
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = os.getenv("MCP_TOOL_SNAPSHOT_DIR", "./.mcp_tool_snapshots")
+
+
+def tools_hash(definitions: List[MCPTool]) -> str:
+    """Content hash of a server's tool definitions, independent of their order."""
+    dumped = sorted(
+        (d.model_dump(mode="json", exclude_none=True) for d in definitions),
+        key=lambda d: d["name"],
+    )
+    return hashlib.sha256(json.dumps(dumped, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class ToolSnapshot:
+    """Stores the tool definitions of each MCP server URL in a local directory."""
+
+    def __init__(self, directory: str = DEFAULT_SNAPSHOT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+    def load(self, url: str) -> Optional[Tuple[str, List[MCPTool]]]:
+        """Return ``(hash, definitions)`` for ``url``, or None if there is no usable snapshot."""
+        try:
+            with open(self._path(url)) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool snapshot for {url}: {e}")
+            return None
+        if data.get("version") != SNAPSHOT_VERSION or data.get("url") != url:
+            return None
+        return data["hash"], [MCPTool.model_validate(d) for d in data["tools"]]
+
+    def save(self, url: str, definitions: List[MCPTool]) -> bool:
+        """Store ``definitions`` for ``url``. Returns True if they differ from the stored snapshot."""
+        digest = tools_hash(definitions)
+        current = self.load(url)
+        if current is not None and current[0] == digest:
+            return False
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "url": url,
+                    "hash": digest,
+                    "saved_at": time.time(),
+                    "tools": [d.model_dump(mode="json", exclude_none=True) for d in definitions],
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+        return True
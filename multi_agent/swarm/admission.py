@@ -0,0 +1,303 @@
+"""Admission control and per-thread serialization for /chat.
+
+``AdmissionController`` caps the number of swarm runs in flight. Requests
+beyond the cap wait in a bounded queue; when the queue is full, or a request
+waited too long, it is rejected with a Retry-After estimate so the endpoint
+can answer 429 before it starts streaming.
+
+``ThreadLocks`` makes turns on one thread_id run one at a time, so two
+requests never advance the same checkpoint concurrently. ``ThreadLeases``
+does the same across the worker processes sharing a SQLite file.
+"""
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, TypeVar
+
+from multi_agent.common.metrics import Counter, Gauge, Histogram
+
+QUEUE_DEPTH = Gauge("swarm_chat_queue_depth", "Chat requests waiting for a run slot.")
+ACTIVE = Gauge("swarm_chat_active_runs", "Chat runs holding a run slot.")
+WAIT_SECONDS = Histogram("swarm_chat_admission_wait_seconds", "Time chat requests waited for a run slot.")
+REJECTED = Counter("swarm_chat_rejected_total", "Chat requests rejected by admission control.", ["reason"])
+THREAD_WAIT_SECONDS = Histogram("swarm_chat_thread_lock_wait_seconds",
+                                "Time chat requests waited for an earlier turn on the same thread.")
+THREAD_LEASE_WAIT_SECONDS = Histogram("swarm_chat_thread_lease_wait_seconds",
+                                      "Time chat requests waited for a turn on the same thread in another worker.")
+LEASES_LOST = Counter("swarm_chat_thread_leases_lost_total", "Thread leases that expired while their turn still ran.")
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Rejected(Exception):
+    """The request was not admitted; the client should retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Chat request rejected ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """A semaphore of ``max_concurrent`` run slots with a wait queue of ``max_queue`` requests.
+
+    Requests waiting for an earlier turn on their thread (``acquire_turn``)
+    share the same queue and timeout; at most ``max_thread_queue`` of them
+    wait on any one thread.
+    """
+
+    def __init__(self, max_concurrent: int = 32, max_queue: int = 64, queue_timeout: float = 30.0,
+                 max_thread_queue: int = 4):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_thread_queue = max_thread_queue
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._active = 0
+        # Moving average of how long a run holds its slot, for Retry-After.
+        self._run_seconds = 5.0
+        QUEUE_DEPTH.set_function(lambda: self._waiting)
+        ACTIVE.set_function(lambda: self._active)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue is likely to have drained."""
+        return max(1, math.ceil(self._run_seconds * (self._waiting + 1) / self.max_concurrent))
+
+    def _reject(self, reason: str) -> Rejected:
+        REJECTED.inc(reason=reason)
+        return Rejected(reason, self.retry_after())
+
+    async def _queued(self, wait: Callable[[], Awaitable[T]], timeout_reason: str) -> T:
+        if self._waiting >= self.max_queue:
+            raise self._reject("queue_full")
+        self._waiting += 1
+        try:
+            return await asyncio.wait_for(wait(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject(timeout_reason) from None
+        finally:
+            self._waiting -= 1
+
+    async def acquire(self) -> Callable[[], None]:
+        """Wait for a run slot and return the function that releases it, or raise ``Rejected``."""
+        start = time.monotonic()
+        if self._slots.locked():
+            await self._queued(self._slots.acquire, "timeout")
+        else:
+            # Free slot: Semaphore.acquire returns without suspending.
+            await self._slots.acquire()
+        acquired = time.monotonic()
+        WAIT_SECONDS.observe(acquired - start)
+        self._active += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._active -= 1
+            self._run_seconds = 0.8 * self._run_seconds + 0.2 * (time.monotonic() - acquired)
+            self._slots.release()
+
+        return release
+
+    async def acquire_turn(self, locks: "ThreadLocks | ThreadLeases", key: str) -> Callable[[], None]:
+        """Wait for the turn on thread ``key`` in ``locks`` as a queued request, or raise ``Rejected``."""
+        release = await locks.try_acquire(key)
+        if release is not None:
+            return release
+        if locks.waiters(key) >= self.max_thread_queue:
+            raise self._reject("thread_queue_full")
+        return await self._queued(lambda: locks.acquire(key), "thread_timeout")
+
+
+class ThreadLocks:
+    """One asyncio.Lock per key, dropped once nobody holds or waits for it."""
+
+    def __init__(self):
+        # key -> [lock, holders and waiters]
+        self._locks: Dict[Hashable, List] = {}
+
+    async def acquire(self, key: Hashable) -> Callable[[], None]:
+        """Wait for the lock of ``key`` and return the function that releases it."""
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        start = time.monotonic()
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._drop(key, entry)
+            raise
+        THREAD_WAIT_SECONDS.observe(time.monotonic() - start)
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            entry[0].release()
+            self._drop(key, entry)
+
+        return release
+
+    async def try_acquire(self, key: Hashable) -> Optional[Callable[[], None]]:
+        """Take the lock of ``key`` if nobody holds or waits for it, else return None."""
+        if key in self._locks:
+            return None
+        # Fresh lock: acquire returns without suspending.
+        return await self.acquire(key)
+
+    def waiters(self, key: Hashable) -> int:
+        """Requests waiting for the lock of ``key``, not counting its holder."""
+        entry = self._locks.get(key)
+        if entry is None:
+            return 0
+        return entry[1] - (1 if entry[0].locked() else 0)
+
+    def _drop(self, key: Hashable, entry: List):
+        entry[1] -= 1
+        if entry[1] == 0 and self._locks.get(key) is entry:
+            del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
+
+
+class ThreadLeases:
+    """``ThreadLocks`` across processes: a lease row per key in a SQLite file shared by all workers.
+
+    A lease is taken in a ``BEGIN IMMEDIATE`` transaction and renewed every
+    third of ``lease_seconds`` while its turn runs, so the lease of a worker
+    that died expires within ``lease_seconds``. Requests of one process queue
+    on a local lock first, so only one of them polls the database.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 30.0, poll_interval: float = 0.05):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_leases "
+            "(thread_id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self.lock = threading.Lock()
+        self.local = ThreadLocks()
+        self._releasing: Set[asyncio.Task] = set()
+
+    def _take(self, key: str, owner: str) -> bool:
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT expires FROM thread_leases WHERE thread_id = ?", (key,)).fetchone()
+                taken = row is None or row[0] <= now
+                if taken:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO thread_leases (thread_id, owner, expires) VALUES (?, ?, ?)",
+                        (key, owner, now + self.lease_seconds),
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return taken
+
+    def _renew(self, key: str, owner: str) -> bool:
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE thread_leases SET expires = ? WHERE thread_id = ? AND owner = ?",
+                (time.time() + self.lease_seconds, key, owner),
+            )
+        return cursor.rowcount == 1
+
+    def _drop(self, key: str, owner: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM thread_leases WHERE thread_id = ? AND owner = ?", (key, owner))
+
+    async def _keep(self, key: str, owner: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self._renew, key, owner):
+                LEASES_LOST.inc()
+                logger.warning(f"Lease of thread {key} expired while its turn was running")
+                return
+
+    async def _release(self, key: str, owner: str, release_local: Callable[[], None]):
+        try:
+            await asyncio.to_thread(self._drop, key, owner)
+        finally:
+            release_local()
+
+    async def acquire(self, key: str) -> Callable[[], None]:
+        """Wait for the lease of ``key`` and return the function that releases it."""
+        release_local = await self.local.acquire(key)
+        owner = uuid.uuid4().hex
+        start = time.monotonic()
+        try:
+            delay = self.poll_interval
+            while not await asyncio.to_thread(self._take, key, owner):
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, 1.0)
+        except BaseException:
+            release_local()
+            raise
+        THREAD_LEASE_WAIT_SECONDS.observe(time.monotonic() - start)
+        return self._held(key, owner, release_local)
+
+    async def try_acquire(self, key: str) -> Optional[Callable[[], None]]:
+        """Take the lease of ``key`` if no request of any worker holds it, else return None."""
+        release_local = await self.local.try_acquire(key)
+        if release_local is None:
+            return None
+        owner = uuid.uuid4().hex
+        try:
+            taken = await asyncio.to_thread(self._take, key, owner)
+        except BaseException:
+            release_local()
+            raise
+        if not taken:
+            release_local()
+            return None
+        return self._held(key, owner, release_local)
+
+    def waiters(self, key: str) -> int:
+        """Requests of this process waiting for the lease of ``key``."""
+        return self.local.waiters(key)
+
+    def _held(self, key: str, owner: str, release_local: Callable[[], None]) -> Callable[[], None]:
+        keeper = asyncio.create_task(self._keep(key, owner))
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            keeper.cancel()
+            # The local lock is passed on once the row is gone, so the next
+            # request of this process does not have to poll for it.
+            task = asyncio.get_running_loop().create_task(self._release(key, owner, release_local))
+            self._releasing.add(task)
+            task.add_done_callback(self._releasing.discard)
+
+        return release
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __len__(self):
+        return len(self.local)
@@ -0,0 +1,250 @@
+"""A bounded in-memory checkpointer for the swarm HTTP server.
+
+``InMemorySaver`` keeps every thread forever. ``BoundedInMemorySaver`` keeps
+only recently used threads resident and evicts the rest by three policies:
+
+- LRU: at most ``max_threads`` threads are resident.
+- Idle TTL: threads not touched for ``idle_ttl`` seconds are evicted.
+- Byte budget: the serialized size of all resident threads stays under
+  ``max_bytes`` (the most recently used thread is never evicted).
+
+Evicted threads are spilled to a ``SpillStore`` on local disk and restored
+transparently the next time the thread is read or written. The policies are
+applied on every read and write; ``sweep_periodically`` also applies them
+while no thread is touched, so idle threads do not stay resident for good.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from multi_agent.common.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+EVICTIONS = Counter("swarm_checkpoint_evictions_total", "Threads evicted from the in-memory checkpointer.", ["reason"])
+SPILLS = Counter("swarm_checkpoint_spills_total", "Evicted threads written to the spill store.")
+RESTORES = Counter("swarm_checkpoint_restores_total", "Threads restored from the spill store.")
+RESIDENT_THREADS = Gauge("swarm_checkpoint_resident_threads", "Threads currently held in memory.")
+RESIDENT_BYTES = Gauge("swarm_checkpoint_resident_bytes", "Serialized bytes of all threads held in memory.")
+
+
+class SpillStore:
+    """Stores evicted threads as one pickle file per thread in a local directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, thread_id: str) -> str:
+        digest = hashlib.sha256(thread_id.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pkl")
+
+    def save(self, thread_id: str, payload: Dict[str, Any]):
+        path = self._path(thread_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(thread_id), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, thread_id: str):
+        try:
+            os.remove(self._path(thread_id))
+        except FileNotFoundError:
+            pass
+
+
+def _typed_size(value) -> int:
+    # Serialized values are (type, bytes) tuples.
+    return len(value[1]) if value and value[1] else 0
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """``InMemorySaver`` with LRU, idle-TTL and byte-budget eviction to a spill store."""
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 1000,
+        idle_ttl: float = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        spill_store: Optional[SpillStore] = None,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.spill_store = spill_store or SpillStore(os.path.join(tempfile.gettempdir(), "swarm-checkpoints"))
+        # thread ID -> [last access time, resident bytes], least recently used first
+        self._threads: OrderedDict[str, list] = OrderedDict()
+        self._writes_keys: Dict[str, set] = {}
+        self._blob_keys: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def resident_threads(self) -> int:
+        return len(self._threads)
+
+    def _touch(self, thread_id: str):
+        entry = self._threads.get(thread_id)
+        if entry is None:
+            entry = self._threads[thread_id] = [time.monotonic(), 0]
+            RESIDENT_THREADS.inc()
+            self._restore(thread_id)
+        else:
+            entry[0] = time.monotonic()
+            self._threads.move_to_end(thread_id)
+
+    def _add_bytes(self, thread_id: str, delta: int):
+        self._threads[thread_id][1] += delta
+        self._bytes += delta
+        RESIDENT_BYTES.inc(delta)
+
+    def _restore(self, thread_id: str):
+        payload = self.spill_store.load(thread_id)
+        if payload is None:
+            return
+        self.spill_store.delete(thread_id)
+        self.storage[thread_id].update(payload["storage"])
+        self.writes.update(payload["writes"])
+        self.blobs.update(payload["blobs"])
+        self._writes_keys[thread_id] = set(payload["writes"])
+        self._blob_keys[thread_id] = set(payload["blobs"])
+        self._add_bytes(thread_id, payload["nbytes"])
+        RESTORES.inc()
+
+    def _evict(self, thread_id: str, reason: str):
+        _, nbytes = self._threads.pop(thread_id)
+        payload = {
+            "storage": dict(self.storage.pop(thread_id, {})),
+            "writes": {k: self.writes.pop(k) for k in self._writes_keys.pop(thread_id, ()) if k in self.writes},
+            "blobs": {k: self.blobs.pop(k) for k in self._blob_keys.pop(thread_id, ()) if k in self.blobs},
+            "nbytes": nbytes,
+        }
+        self._bytes -= nbytes
+        RESIDENT_BYTES.dec(nbytes)
+        RESIDENT_THREADS.dec()
+        EVICTIONS.inc(reason=reason)
+        if payload["storage"]:
+            self.spill_store.save(thread_id, payload)
+            SPILLS.inc()
+
+    def _enforce(self):
+        now = time.monotonic()
+        while self._threads:
+            oldest, (last_access, _) = next(iter(self._threads.items()))
+            if now - last_access <= self.idle_ttl:
+                break
+            self._evict(oldest, "ttl")
+        while len(self._threads) > self.max_threads:
+            self._evict(next(iter(self._threads)), "lru")
+        while self._bytes > self.max_bytes and len(self._threads) > 1:
+            self._evict(next(iter(self._threads)), "bytes")
+
+    def sweep(self):
+        """Apply the eviction policies without a read or write, e.g. from a periodic task."""
+        with self._lock:
+            self._enforce()
+
+    async def sweep_periodically(self, interval: float):
+        """Sweep every ``interval`` seconds until cancelled, off the event loop."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except OSError as e:
+                logger.warning(f"Checkpoint sweep failed to spill a thread: {e}")
+
+    def _index_reads(self, tuples):
+        # InMemorySaver reads writes through a defaultdict, which inserts empty
+        # entries; index them so eviction removes them with the thread.
+        for t in tuples:
+            c = t.config["configurable"]
+            key = (c["thread_id"], c.get("checkpoint_ns", ""), c["checkpoint_id"])
+            if key in self.writes:
+                self._writes_keys.setdefault(c["thread_id"], set()).add(key)
+
+    def get_tuple(self, config):
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            result = super().get_tuple(config)
+            if result is not None:
+                self._index_reads([result])
+            self._enforce()
+            return result
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            if config:
+                self._touch(config["configurable"]["thread_id"])
+            # Materialize under the lock so eviction cannot race the iteration.
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+            self._index_reads(items)
+        yield from items
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._touch(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            blob_keys = self._blob_keys.setdefault(thread_id, set())
+            added = 0
+            for k, v in new_versions.items():
+                key = (thread_id, checkpoint_ns, k, v)
+                if key not in blob_keys:
+                    blob_keys.add(key)
+                    added += _typed_size(self.blobs[key])
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            added += _typed_size(saved) + _typed_size(saved_metadata)
+            self._add_bytes(thread_id, added)
+            self._enforce()
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""),
+                     config["configurable"]["checkpoint_id"])
+        with self._lock:
+            self._touch(thread_id)
+            before = sum(_typed_size(w[2]) for w in self.writes.get(outer_key, {}).values())
+            super().put_writes(config, writes, task_id, task_path)
+            after = sum(_typed_size(w[2]) for w in self.writes.get(outer_key, {}).values())
+            self._writes_keys.setdefault(thread_id, set()).add(outer_key)
+            self._add_bytes(thread_id, after - before)
+            self._enforce()
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            for k in self._writes_keys.pop(thread_id, ()):
+                self.writes.pop(k, None)
+            for k in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(k, None)
+            self.storage.pop(thread_id, None)
+            entry = self._threads.pop(thread_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+                RESIDENT_BYTES.dec(entry[1])
+                RESIDENT_THREADS.dec()
+            self.spill_store.delete(thread_id)
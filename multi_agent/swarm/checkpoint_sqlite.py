@@ -0,0 +1,474 @@
+"""A durable SQLite (WAL) checkpointer that writes message lists as deltas.
+
+LangGraph savers normally serialize every changed channel in full at every
+super-step, so the cost of a checkpoint grows with the length of the
+conversation. ``SqliteDeltaSaver`` stores the message channels (``messages``
+by default) in an append-only ``message_log`` shared by all checkpoint
+namespaces of a thread:
+
+- a channel version is stored as a ``start:count`` range into the log;
+- when the new list extends the last written range with the very same
+  message objects, only the new messages are appended;
+- anything else (a fork, an edited or removed message) starts a new range.
+
+Thread state is rebuilt lazily: nothing is loaded at startup, and the first
+read of a thread restores its checkpoint and the message range it points to.
+Every write runs in a ``BEGIN IMMEDIATE`` transaction and re-checks the log
+tail in the database, so several processes can share one file.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from multi_agent.common.metrics import Counter
+
+MESSAGES_APPENDED = Counter("swarm_checkpoint_messages_appended_total", "Messages appended to the SQLite message log.")
+MESSAGE_RANGES = Counter("swarm_checkpoint_message_ranges_total",
+                         "Message log ranges started, by reason (a full rewrite of the list).", ["reason"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint BLOB,
+    checkpoint_type TEXT,
+    metadata BLOB,
+    metadata_type TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS message_log (
+    thread_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, channel, seq)
+);
+CREATE TABLE IF NOT EXISTS message_tails (
+    thread_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (thread_id, channel)
+);
+"""
+
+# Marks a blobs row whose value lives in message_log.
+DELTA_TYPE = "delta"
+
+
+def _is_message_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(m, BaseMessage) for m in value)
+
+
+def _digest(typed) -> bytes:
+    return hashlib.blake2b(typed[1], digest_size=16, person=typed[0].encode()[:16]).digest()
+
+
+class _Tail:
+    """The last range written to a thread's message log.
+
+    Keeps weak references to the message objects and digests of their
+    serialized form, so an extension check is an identity comparison in the
+    common case and re-serializes only messages that are not the same object.
+    """
+
+    __slots__ = ("start", "refs", "digests")
+
+    def __init__(self, start: int, messages: Sequence[Any], digests: Sequence[bytes]):
+        self.start = start
+        self.refs = [weakref.ref(m) for m in messages]
+        self.digests = list(digests)
+
+    @property
+    def count(self) -> int:
+        return len(self.refs)
+
+    def extended_by(self, messages: Sequence[Any], serde) -> bool:
+        if len(messages) < self.count:
+            return False
+        for ref, digest, message in zip(self.refs, self.digests, messages):
+            if ref() is not message and _digest(serde.dumps_typed(message)) != digest:
+                return False
+        return True
+
+
+class SqliteDeltaSaver(BaseCheckpointSaver[str]):
+    """Checkpointer backed by a SQLite file in WAL mode with delta writes for message channels."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        delta_channels: Sequence[str] = ("messages",),
+        max_cached_threads: int = 1024,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.delta_channels = frozenset(delta_channels)
+        self.max_cached_threads = max_cached_threads
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        # (thread ID, channel) -> _Tail, least recently used first
+        self._tails: OrderedDict[Tuple[str, str], _Tail] = OrderedDict()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # -- message log -------------------------------------------------------
+
+    def _cache_tail(self, key: Tuple[str, str], tail: _Tail):
+        self._tails[key] = tail
+        self._tails.move_to_end(key)
+        while len(self._tails) > self.max_cached_threads:
+            self._tails.popitem(last=False)
+
+    def _write_messages(self, thread_id: str, channel: str, messages: list) -> bytes:
+        """Append ``messages`` to the log and return the range that now holds them."""
+        key = (thread_id, channel)
+        row = self.conn.execute(
+            "SELECT start, count FROM message_tails WHERE thread_id = ? AND channel = ?", key
+        ).fetchone()
+        tail = self._tails.get(key)
+        if row is not None and tail is not None and (tail.start, tail.count) == row \
+                and tail.extended_by(messages, self.serde):
+            start, new, digests = tail.start, messages[tail.count:], tail.digests
+        else:
+            # Either the thread is new, its tail is not cached in this process,
+            # or the list is not a plain extension of the tail (a fork, an
+            # edited or removed message): write the whole list as a new range.
+            MESSAGE_RANGES.inc(reason="new" if row is None else "cold" if tail is None else "rewrite")
+            start, new, digests = (row[0] + row[1] if row else 0), messages, []
+        first_seq = start + len(messages) - len(new)
+        if new:
+            typed = [self.serde.dumps_typed(m) for m in new]
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO message_log (thread_id, channel, seq, type, blob) VALUES (?, ?, ?, ?, ?)",
+                [(thread_id, channel, first_seq + i, *t) for i, t in enumerate(typed)],
+            )
+            digests = digests + [_digest(t) for t in typed]
+            MESSAGES_APPENDED.inc(len(new))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO message_tails (thread_id, channel, start, count) VALUES (?, ?, ?, ?)",
+            (thread_id, channel, start, len(messages)),
+        )
+        self._cache_tail(key, _Tail(start, messages, digests))
+        return f"{start}:{len(messages)}".encode()
+
+    def _read_messages(self, thread_id: str, channel: str, ref: bytes) -> list:
+        start, count = (int(x) for x in ref.decode().split(":"))
+        rows = self.conn.execute(
+            "SELECT type, blob FROM message_log WHERE thread_id = ? AND channel = ? AND seq >= ? AND seq < ? "
+            "ORDER BY seq",
+            (thread_id, channel, start, start + count),
+        ).fetchall()
+        messages = [self.serde.loads_typed(row) for row in rows]
+        # Reading the current tail lets the next put append to it directly.
+        row = self.conn.execute(
+            "SELECT start, count FROM message_tails WHERE thread_id = ? AND channel = ?", (thread_id, channel)
+        ).fetchone()
+        if row == (start, count):
+            self._cache_tail((thread_id, channel), _Tail(start, messages, [_digest(row) for row in rows]))
+        return messages
+
+    # -- reads -------------------------------------------------------------
+
+    def _load_channel_values(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            row = self.conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            if row[0] == DELTA_TYPE:
+                values[channel] = self._read_messages(thread_id, channel, row[1])
+            else:
+                values[channel] = self.serde.loads_typed(row)
+        return values
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row, metadata=None) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_b, checkpoint_type, metadata_b, metadata_type = row
+        checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_b))
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_channel_values(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=metadata if metadata is not None else self.serde.loads_typed((metadata_type, metadata_b)),
+            pending_writes=[(task_id, c, self.serde.loads_typed((t, b))) for task_id, c, t, b in writes],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, checkpoint, checkpoint_type, metadata, metadata_type"
+        with self.lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, checkpoint_type, "
+                 "metadata, metadata_type FROM checkpoints")
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        results = []
+        with self.lock:
+            for thread_id, checkpoint_ns, *row in self.conn.execute(query, params).fetchall():
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[5], row[4]))
+                if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(self._to_tuple(thread_id, checkpoint_ns, row, metadata))
+        yield from results
+
+    # -- writes ------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for channel, version in new_versions.items():
+                    if channel not in values:
+                        typed = ("empty", b"")
+                    elif channel in self.delta_channels and _is_message_list(values[channel]):
+                        typed = (DELTA_TYPE, self._write_messages(thread_id, channel, values[channel]))
+                    else:
+                        typed = self.serde.dumps_typed(values[channel])
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (thread_id, checkpoint_ns, channel, str(version), *typed),
+                    )
+                checkpoint_type, checkpoint_b = self.serde.dumps_typed(c)
+                metadata_type, metadata_b = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                    "checkpoint, checkpoint_type, metadata, metadata_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     checkpoint_b, checkpoint_type, metadata_b, metadata_type),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                for channel in self.delta_channels:
+                    self._tails.pop((thread_id, channel), None)
+                raise
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            # Special channels (negative idx) overwrite, regular writes are written once.
+            verb = "REPLACE" if idx < 0 else "IGNORE"
+            rows.append((verb, (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel,
+                                *self.serde.dumps_typed(value), task_path)))
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for verb, row in rows:
+                    self.conn.execute(
+                        f"INSERT OR {verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, "
+                        "type, blob, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for table in ("checkpoints", "blobs", "writes", "message_log", "message_tails"):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("COMMIT")
+            for key in [k for k in self._tails if k[0] == thread_id]:
+                del self._tails[key]
+
+    # -- async -------------------------------------------------------------
+    # SQLite calls are short but may wait on fsync or on another writer, so
+    # they run in a worker thread instead of blocking the event loop.
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
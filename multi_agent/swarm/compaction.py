@@ -0,0 +1,181 @@
+"""History compaction before each agent's model call.
+
+Every turn used to send a thread's whole ``messages`` list, tool outputs
+included, to whichever agent was active. ``HistoryCompactor`` runs as the
+agents' ``pre_model_hook`` and builds a smaller model input instead, leaving
+the stored messages untouched:
+
+1. tool outputs older than the last ``keep_recent`` messages are truncated;
+2. if the input is still over ``max_tokens``, the turns before the most
+   recent ones that fit are replaced by a running summary.
+
+The summary is kept in the thread's state under ``history_summary`` together
+with the ID of the last message it covers, so each later compaction only
+summarizes the messages that fell out of the window since.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from langgraph_swarm import SwarmState
+from typing_extensions import NotRequired
+
+from multi_agent.common.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and crypto wallet assistants. "
+    "Update the summary with the new messages below. Keep every address, chain, token, amount, "
+    "transaction hash and decision the user made; drop pleasantries and raw tool output. "
+    "Answer with the updated summary only."
+)
+
+COMPACTED = Counter("swarm_history_compactions_total", "Model inputs shortened by history compaction.", ["kind"])
+INPUT_TOKENS = Histogram("swarm_history_input_tokens", "Approximate tokens of model inputs after compaction.",
+                         buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000))
+
+
+class CompactionAgentState(AgentState):
+    history_summary: NotRequired[Dict[str, Any]]
+
+
+class CompactionSwarmState(SwarmState):
+    history_summary: NotRequired[Dict[str, Any]]
+
+
+class HistoryCompactor:
+    """Builds the model input of an agent within a token budget."""
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        keep_recent: int = 6,
+        tool_output_chars: int = 2000,
+        summary_model=None,
+        summary_max_chars: int = 4000,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.tool_output_chars = tool_output_chars
+        # Tagged so the summarizer's tokens never reach the client's stream.
+        self.summary_model = summary_model.with_config(tags=[TAG_NOSTREAM]) if summary_model is not None else None
+        self.summary_max_chars = summary_max_chars
+
+    @property
+    def hook(self) -> RunnableLambda:
+        """The ``pre_model_hook`` for ``create_react_agent``."""
+        return RunnableLambda(self.compact, afunc=self.acompact, name="compact_history")
+
+    # -- steps -------------------------------------------------------------
+
+    def _trim_tool_outputs(self, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        cutoff = len(messages) - self.keep_recent
+        trimmed = []
+        for i, message in enumerate(messages):
+            if i < cutoff and isinstance(message, ToolMessage) and isinstance(message.content, str) \
+                    and len(message.content) > self.tool_output_chars:
+                dropped = len(message.content) - self.tool_output_chars
+                message = message.model_copy(update={
+                    "content": f"{message.content[:self.tool_output_chars]}... [{dropped} characters truncated]"
+                })
+                COMPACTED.inc(kind="tool_output")
+            trimmed.append(message)
+        return trimmed
+
+    def _window_start(self, messages: Sequence[AnyMessage], budget: int) -> int:
+        """Index of the earliest user message from which the rest of ``messages`` fits in ``budget``.
+
+        Windows start at a user message so no tool result is separated from
+        the call that produced it; the current turn is always kept.
+        """
+        starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        if not starts:
+            return 0
+        start, used, end = starts[-1], 0, len(messages)
+        for i in reversed(starts):
+            used += count_tokens_approximately(messages[i:end])
+            end = i
+            if used > budget and i != starts[-1]:
+                break
+            start = i
+        return start
+
+    def _plan(self, state) -> tuple:
+        messages = self._trim_tool_outputs(state["messages"])
+        if count_tokens_approximately(messages) <= self.max_tokens:
+            return messages, [], None, None
+        summary = state.get("history_summary") or {}
+        start = self._window_start(messages, int(self.max_tokens * 0.75))
+        ids = [m.id for m in messages]
+        covered = ids.index(summary["until"]) + 1 if summary.get("until") in ids else 0
+        if covered > start and covered < len(messages) and isinstance(messages[covered], HumanMessage):
+            # The window could reach back into summarized turns; keep it
+            # after them rather than summarizing everything again.
+            start = covered
+        if start == 0:
+            return messages, [], None, None
+        if covered > start:
+            covered = 0
+        previous = summary.get("text") if covered else None
+        return messages[start:], messages[covered:start], previous, ids[start - 1]
+
+    def _extractive_summary(self, previous: Optional[str], messages: Sequence[AnyMessage]) -> str:
+        lines = [previous] if previous else []
+        for message in messages:
+            if message.type in ("human", "ai") and isinstance(message.content, str) and message.content.strip():
+                speaker = "user" if message.type == "human" else (message.name or "assistant")
+                lines.append(f"{speaker}: {message.content.strip()[:300]}")
+        return "\n".join(lines)[-self.summary_max_chars:]
+
+    def _summary_input(self, previous: Optional[str], messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        transcript = self._extractive_summary(None, messages) or "(no new messages)"
+        return [
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"),
+        ]
+
+    def _result(self, window, summary_text: Optional[str], until: Optional[str], changed: bool) -> Dict[str, Any]:
+        llm_input = list(window)
+        if summary_text:
+            llm_input.insert(0, SystemMessage(content=f"Summary of the earlier conversation:\n{summary_text}"))
+        INPUT_TOKENS.observe(count_tokens_approximately(llm_input))
+        update: Dict[str, Any] = {"llm_input_messages": llm_input}
+        if changed:
+            COMPACTED.inc(kind="summary")
+            update["history_summary"] = {"until": until, "text": summary_text}
+        return update
+
+    # -- hook --------------------------------------------------------------
+
+    def compact(self, state) -> Dict[str, Any]:
+        window, new, previous, until = self._plan(state)
+        if until is None:
+            return self._result(window, None, None, False)
+        if not new:
+            return self._result(window, previous, until, False)
+        text = None
+        if self.summary_model is not None:
+            try:
+                text = self.summary_model.invoke(self._summary_input(previous, new)).content
+            except Exception as e:
+                logger.warning(f"History summary failed, falling back to an extractive one: {e!r}")
+        return self._result(window, text or self._extractive_summary(previous, new), until, True)
+
+    async def acompact(self, state) -> Dict[str, Any]:
+        window, new, previous, until = self._plan(state)
+        if until is None:
+            return self._result(window, None, None, False)
+        if not new:
+            return self._result(window, previous, until, False)
+        text = None
+        if self.summary_model is not None:
+            try:
+                text = (await self.summary_model.ainvoke(self._summary_input(previous, new))).content
+            except Exception as e:
+                logger.warning(f"History summary failed, falling back to an extractive one: {e!r}")
+        return self._result(window, text or self._extractive_summary(previous, new), until, True)
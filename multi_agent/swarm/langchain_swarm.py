@@ -1,52 +1,35 @@
 import asyncio
+import uuid
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.prebuilt import create_react_agent
 from langgraph_swarm import create_handoff_tool, create_swarm
 
+from multi_agent.common.mcp_tools import MCP_SERVERS, load_tools, mcp_connections
+from multi_agent.common.tool_snapshot import ToolSnapshot
+from multi_agent.swarm.checkpoint_sqlite import SqliteDeltaSaver
+from multi_agent.swarm.tracing import TracingCallbackHandler, format_trace
+
 model = ChatOpenAI(
     base_url="https://openrouter.ai/api/v1",
     openai_proxy="http://127.0.0.1:7890",
     model="openai/gpt-4o-2024-11-20")
 
 
+async def ignore_tool_updates(server_name, server_tools):
+    # A one-shot run keeps the tools it started with; the background
+    # revalidation still refreshes the snapshot for the next run.
+    pass
+
+
 async def main():
-    tools = {
-        "bridge_tools": await MultiServerMCPClient(
-            {
-                "bridge": {
-                    "url": "http://36.189.252.2:18133/mcp/bridge",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-        "swap_tools": await MultiServerMCPClient(
-            {
-                "swap": {
-                    "url": "http://36.189.252.2:18133/mcp/swap",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-        "transfer_tools": await MultiServerMCPClient(
-            {
-                "transfer": {
-                    "url": "http://36.189.252.2:18133/mcp/transfer",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-        "analysis_tools": await MultiServerMCPClient(
-            {
-                "analysis": {
-                    "url": "http://36.189.252.2:18133/mcp/analysis",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-    }
+    # Build tools from the snapshot on disk when there is one, otherwise
+    # discover all MCP servers concurrently through one client. A server that
+    # fails leaves its agent without tools instead of aborting the run.
+    server_tools = await load_tools(MultiServerMCPClient(mcp_connections()), on_tools=ignore_tool_updates,
+                                    snapshot=ToolSnapshot())
+    tools = {f"{name}_tools": server_tools.get(name, []) for name in MCP_SERVERS}
 
     agents = {
         "dispatch_agent": create_handoff_tool(agent_name="dispatch_agent",
@@ -96,16 +79,19 @@ async def main():
         name="transfer_agent",
     )
 
-    checkpointer = InMemorySaver()
+    # Each run is a new conversation; its thread stays in the file for inspection.
+    checkpointer = SqliteDeltaSaver("./.swarm_checkpoints/checkpoints.db")
     workflow = create_swarm(
         [dispatch_agent, analysis_agent, bridge_agent, swap_agent, transfer_agent],
         default_active_agent=dispatch_agent.name
     )
     agent = workflow.compile(checkpointer=checkpointer)
 
-    config = {"configurable": {"thread_id": "1"}}
+    # Trace every run: the timing tree is printed at the end and appended to the trace file.
+    tracer = TracingCallbackHandler(sample_rate=1.0)
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}, "callbacks": [tracer]}
 
-    async for turn in agent.astream(
+    result = await agent.ainvoke(
             input={"messages": [
                 # case 1
                 # {"role": "user", "content": "Current Ethereum height"}]},
@@ -118,14 +104,11 @@ async def main():
                 #  "content": "My wallet address is 0xF5054F94009B7E9999F6459f40d8EaB1A2ceA22D，I want to send 0xD64229dF1EB0354583F46e46580849B1572BB56d 0.1 USDT on Ethereum"}]},
 
             config=config,
-            stream_mode="debug",
-    ):
-        print(turn)
-        print(f"step: {turn.get('step')}")
-        print(f"type: {turn.get('type')}")
-        if turn.get('payload').__contains__('values'):
-            for msg in turn['payload']['values']['messages']:
-                print(f"{type(msg).__name__}: {msg.content if msg.content != '' else msg.additional_kwargs}")
+    )
+    print(result["messages"][-1].content)
+    for trace in tracer.recent:
+        print(format_trace(trace))
+    tracer.export("./.swarm_traces/traces.otlp.jsonl")
 
 
 # asyncio.run(main())
@@ -1,25 +1,86 @@
+import asyncio
 import json
+import os
+import time
 import uuid
 from typing import List, Dict, Any, Optional
 
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from langchain_core.caches import BaseCache
+from langchain_core.messages import AIMessageChunk
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.prebuilt import create_react_agent
 from langgraph_swarm import create_handoff_tool, create_swarm
 from pydantic import BaseModel
 
+from multi_agent.common import metrics
+from multi_agent.common.llm_cache import llm_cache_for
+from multi_agent.common.mcp_tools import MCP_SERVERS, load_tools, mcp_connections
+from multi_agent.common.single_flight import StreamFlight
+from multi_agent.common.tool_snapshot import ToolSnapshot
+from multi_agent.swarm.admission import AdmissionController, Rejected, ThreadLeases, ThreadLocks
+from multi_agent.swarm.checkpoint_memory import BoundedInMemorySaver, SpillStore
+from multi_agent.swarm.checkpoint_sqlite import SqliteDeltaSaver
+from multi_agent.swarm.compaction import CompactionAgentState, CompactionSwarmState, HistoryCompactor
+from multi_agent.swarm.metrics_callbacks import HANDOFFS, MetricsCallbackHandler, observe_request
+from multi_agent.swarm.pre_router import IntentRouter, mentions_fund_movement
+from multi_agent.swarm.sse import DONE, coalesce, encode_frame, token_frame
+from multi_agent.swarm.tool_pruning import ToolPruningModel
+from multi_agent.swarm.tracing import tracer_from_env
+
 app = FastAPI()
 
 # Global variables store various components.
 model = None
 tools = {}
-agents = {}
 workflow = None
-checkpointers = {}
+checkpointer = None
+swarm_app = None
+pre_router = None
+compactor = None
+llm_caches = {}
+
+# Concurrent identical requests without a thread_id share one swarm run.
+chat_flight = StreamFlight("chat")
+
+# Worker processes of the server, set by start_server for the workers it spawns.
+WORKERS = int(os.getenv("SWARM_WORKERS", "1"))
+CHECKPOINT_DB = os.getenv("SWARM_CHECKPOINT_DB", "./.swarm_checkpoints/checkpoints.db")
+
+# At most SWARM_MAX_CONCURRENT_CHATS runs stream at once; up to
+# SWARM_MAX_QUEUED_CHATS more wait for a slot or for an earlier turn on their
+# thread (at most SWARM_MAX_QUEUED_TURNS per thread), the rest are answered 429.
+# The limits are for the whole server: every worker enforces its share.
+admission = AdmissionController(
+    max_concurrent=max(1, int(os.getenv("SWARM_MAX_CONCURRENT_CHATS", "32")) // WORKERS),
+    max_queue=max(1, int(os.getenv("SWARM_MAX_QUEUED_CHATS", "64")) // WORKERS),
+    queue_timeout=float(os.getenv("SWARM_CHAT_QUEUE_TIMEOUT", "30")),
+    max_thread_queue=int(os.getenv("SWARM_MAX_QUEUED_TURNS", "4")),
+)
+# Turns on the same thread_id run one after another. With several workers,
+# a turn takes a lease in the checkpoint database, whichever worker serves it.
+thread_locks = ThreadLeases(CHECKPOINT_DB) if WORKERS > 1 else ThreadLocks()
+# Times model and tool calls of every run for /metrics.
+metrics_handler = MetricsCallbackHandler()
+# Records per-node timing traces of a sampled share of runs (SWARM_TRACE_SAMPLE) for /traces
+# and appends them as OTLP JSON to SWARM_TRACE_FILE every SWARM_TRACE_EXPORT_SECONDS.
+tracer = tracer_from_env()
+run_callbacks = [metrics_handler] + ([tracer] if tracer else [])
+TRACE_FILE = os.getenv("SWARM_TRACE_FILE", "./.swarm_traces/traces.otlp.jsonl")
+TRACE_EXPORT_INTERVAL = float(os.getenv("SWARM_TRACE_EXPORT_SECONDS", "30"))
+trace_exporter = None
+# The in-memory checkpointer evicts idle threads every SWARM_CHECKPOINT_SWEEP_SECONDS
+# even when no request touches it.
+CHECKPOINT_SWEEP_INTERVAL = float(os.getenv("SWARM_CHECKPOINT_SWEEP_SECONDS", "60"))
+checkpoint_sweeper = None
+
+# SSE frames are written in batches held for at most SWARM_SSE_FLUSH_MS
+# (0 writes every frame on its own) or until SWARM_SSE_FLUSH_BYTES are buffered.
+SSE_FLUSH_INTERVAL = float(os.getenv("SWARM_SSE_FLUSH_MS", "10")) / 1000
+SSE_FLUSH_BYTES = int(os.getenv("SWARM_SSE_FLUSH_BYTES", "16384"))
 
 
 class ChatMessage(BaseModel):
@@ -33,162 +94,395 @@ class ChatRequest(BaseModel):
 
 
 async def initialize_components():
-    global model, tools, agents, workflow
+    global model, tools, workflow, checkpointer, swarm_app, pre_router, compactor, llm_caches
 
-    if model is not None:
+    if swarm_app is not None:
         return
 
     model = ChatOpenAI(
         base_url="https://openrouter.ai/api/v1",
         openai_proxy="http://127.0.0.1:7890",
-        model="openai/gpt-4o-2024-11-20"
+        model="openai/gpt-4o-2024-11-20",
+        # Report token usage on streamed responses too.
+        stream_usage=True,
     )
 
-    # Initialize tool
-    tools = {
-        "bridge_tools": await MultiServerMCPClient(
-            {
-                "bridge": {
-                    "url": "http://36.189.252.2:18133/mcp/bridge",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-        "swap_tools": await MultiServerMCPClient(
-            {
-                "swap": {
-                    "url": "http://36.189.252.2:18133/mcp/swap",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-        "transfer_tools": await MultiServerMCPClient(
-            {
-                "transfer": {
-                    "url": "http://36.189.252.2:18133/mcp/transfer",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-        "analysis_tools": await MultiServerMCPClient(
-            {
-                "analysis": {
-                    "url": "http://36.189.252.2:18133/mcp/analysis",
-                    "transport": "streamable_http",
-                }
-            }
-        ).get_tools(),
-    }
+    # Build agents from the tool snapshot on disk when there is one and
+    # revalidate it in the background; otherwise discover the tools of all
+    # MCP servers concurrently through one client. Servers that fail are
+    # retried in the background and their agents get their tools once they
+    # answer, without holding up the other agents.
+    mcp_client = MultiServerMCPClient(mcp_connections())
+    server_tools = await load_tools(mcp_client, on_tools=install_tools, snapshot=ToolSnapshot())
+    tools = {f"{name}_tools": server_tools.get(name, []) for name in MCP_SERVERS}
+
+    compactor = create_compactor(model)
+    # Exact-match response caching, opt-in per agent through LLM_CACHE_AGENTS.
+    llm_caches = {name: cache for name in AGENT_PROMPTS if (cache := llm_cache_for(name)) is not None}
+    workflow = build_workflow(model, tools, compactor, max_tools_per_call(), llm_caches)
+
+    # Compile once at startup. Every /chat request shares this app and its
+    # checkpointer; threads are isolated by configurable.thread_id only.
+    checkpointer = create_checkpointer()
+    swarm_app = workflow.compile(checkpointer=checkpointer)
+
+    # New conversations with a clear intent skip the dispatch agent's LLM
+    # hop; SWARM_PRE_ROUTER=0 always starts at dispatch_agent.
+    if os.getenv("SWARM_PRE_ROUTER", "1") == "1":
+        pre_router = IntentRouter.from_agents(HANDOFF_DESCRIPTIONS, AGENT_PROMPTS)
+
+
+async def install_tools(server_name: str, server_tools: list):
+    """Swap in the new tools of a server that recovered or changed, recompiling the shared app."""
+    global workflow, swarm_app
+
+    tools[f"{server_name}_tools"] = server_tools
+    workflow = build_workflow(model, tools, compactor, max_tools_per_call(), llm_caches)
+    swarm_app = workflow.compile(checkpointer=checkpointer)
+
+
+def create_checkpointer():
+    """Create the shared checkpointer from the SWARM_CHECKPOINT_* environment variables.
+
+    The default is a durable SQLite file; SWARM_CHECKPOINT_BACKEND=memory
+    selects the bounded in-memory saver instead.
+    """
+    if os.getenv("SWARM_CHECKPOINT_BACKEND", "sqlite") == "sqlite":
+        return SqliteDeltaSaver(CHECKPOINT_DB)
+    return BoundedInMemorySaver(
+        max_threads=int(os.getenv("SWARM_CHECKPOINT_MAX_THREADS", "1000")),
+        idle_ttl=float(os.getenv("SWARM_CHECKPOINT_IDLE_TTL", "3600")),
+        max_bytes=int(os.getenv("SWARM_CHECKPOINT_MAX_BYTES", str(256 * 1024 * 1024))),
+        spill_store=SpillStore(os.getenv("SWARM_CHECKPOINT_SPILL_DIR", "./.swarm_checkpoints")),
+    )
+
+
+def create_compactor(model) -> Optional[HistoryCompactor]:
+    """Create the history compactor from the SWARM_HISTORY_* environment variables.
+
+    Model inputs are kept within SWARM_HISTORY_MAX_TOKENS (0 disables
+    compaction); earlier turns are summarized by the chat model, or
+    extractively with SWARM_HISTORY_SUMMARY=extractive.
+    """
+    max_tokens = int(os.getenv("SWARM_HISTORY_MAX_TOKENS", "6000"))
+    if max_tokens <= 0:
+        return None
+    return HistoryCompactor(
+        max_tokens=max_tokens,
+        keep_recent=int(os.getenv("SWARM_HISTORY_KEEP_RECENT", "6")),
+        tool_output_chars=int(os.getenv("SWARM_HISTORY_TOOL_OUTPUT_CHARS", "2000")),
+        summary_model=model if os.getenv("SWARM_HISTORY_SUMMARY", "model") == "model" else None,
+    )
+
+
+def max_tools_per_call() -> Optional[int]:
+    """SWARM_MAX_TOOLS_PER_CALL MCP tools are shown to the model per call (0 shows all)."""
+    return int(os.getenv("SWARM_MAX_TOOLS_PER_CALL", "8")) or None
+
+
+# What each agent is for, as told to the other agents by its handoff tool.
+HANDOFF_DESCRIPTIONS = {
+    "dispatch_agent": "Transfer to dispatch agent, she can help with dispatch",
+    "bridge_agent": "Transfer to bridge agent, she can help with bridge token",
+    "transfer_agent": "Transfer to transfer agent, she can help with transfer token",
+    "swap_agent": "Transfer to swap agent, she can help with swap token. e.g. swap ETH to USDT",
+    "analysis_agent": "Transfer to analysis agent, she can help with analysis chain info and token info",
+}
+
+AGENT_PROMPTS = {
+    "dispatch_agent": "You are Dispatch Agent.",
+    "analysis_agent": "You are asset analysis Agent. You can query user assets, chain information, and transaction information.",
+    "bridge_agent": "You are bridge agent. You can transfer the user's token from one chain to another.",
+    "swap_agent": "You are swap agent.",
+    "transfer_agent": "You are transfer agent. Before sending a transaction, it is necessary to check if the user's balance is sufficient. If not, consider swapping or bridging equivalent tokens. Note that when swapping or bridging, a portion of the gas fee needs to be reserved.",
+}
+
+
+def build_workflow(model, tools: Dict[str, list], compactor: Optional[HistoryCompactor] = None,
+                   max_tools: Optional[int] = None, llm_caches: Optional[Dict[str, BaseCache]] = None):
+    """Build the (uncompiled) swarm graph from a chat model and the MCP tools of each server.
+
+    With a ``compactor``, every agent compacts the history before calling
+    the model and the thread state carries the running summary. With
+    ``max_tools``, each model call is only shown that many of the agent's
+    MCP tools, chosen for the current turn. Agents named in ``llm_caches``
+    answer repeated identical calls from their response cache.
+    """
+    agent_options = {}
+    if compactor is not None:
+        agent_options = {"pre_model_hook": compactor.hook, "state_schema": CompactionAgentState}
+
+    def agent_model(name: str):
+        agent = model
+        if llm_caches and name in llm_caches:
+            agent = model.model_copy(update={"cache": llm_caches[name]})
+        return ToolPruningModel(agent, agent=name, max_tools=max_tools) if max_tools else agent
 
     # Initialize proxy tools
     agents = {
-        "dispatch_agent": create_handoff_tool(agent_name="dispatch_agent",
-                                              description="Transfer to dispatch agent, she can help with dispatch"),
-        "bridge_agent": create_handoff_tool(agent_name="bridge_agent",
-                                            description="Transfer to bridge agent, she can help with bridge token"),
-        "transfer_agent": create_handoff_tool(agent_name="transfer_agent",
-                                              description="Transfer to transfer agent, she can help with transfer token"),
-        "swap_agent": create_handoff_tool(agent_name="swap_agent",
-                                          description="Transfer to swap agent, she can help with swap token. e.g. swap ETH to USDT"),
-        "analysis_agent": create_handoff_tool(agent_name="analysis_agent",
-                                              description="Transfer to analysis agent, she can help with analysis chain info and token info"),
+        name: create_handoff_tool(agent_name=name, description=description)
+        for name, description in HANDOFF_DESCRIPTIONS.items()
     }
 
     # Create each agent
     dispatch_agent = create_react_agent(
-        model,
+        agent_model("dispatch_agent"),
         tools=list({k: v for k, v in agents.items() if k != "dispatch_agent"}.values()),
-        prompt="You are Dispatch Agent.",
+        prompt=AGENT_PROMPTS["dispatch_agent"],
         name="dispatch_agent",
+        **agent_options,
     )
 
     analysis_agent = create_react_agent(
-        model,
+        agent_model("analysis_agent"),
         tools=tools["analysis_tools"] + list({k: v for k, v in agents.items() if k != "analysis_agent"}.values()),
-        prompt="You are asset analysis Agent. You can query user assets, chain information, and transaction information.",
+        prompt=AGENT_PROMPTS["analysis_agent"],
         name="analysis_agent",
+        **agent_options,
     )
 
     bridge_agent = create_react_agent(
-        model,
+        agent_model("bridge_agent"),
         tools=tools["bridge_tools"] + list({k: v for k, v in agents.items() if k != "bridge_agent"}.values()),
-        prompt="You are bridge agent. You can transfer the user's token from one chain to another.",
+        prompt=AGENT_PROMPTS["bridge_agent"],
         name="bridge_agent",
+        **agent_options,
     )
 
     swap_agent = create_react_agent(
-        model,
+        agent_model("swap_agent"),
         tools=tools["swap_tools"] + list({k: v for k, v in agents.items() if k != "swap_agent"}.values()),
-        prompt="You are swap agent.",
+        prompt=AGENT_PROMPTS["swap_agent"],
         name="swap_agent",
+        **agent_options,
     )
 
     transfer_agent = create_react_agent(
-        model,
+        agent_model("transfer_agent"),
         tools=tools["transfer_tools"] + list({k: v for k, v in agents.items() if k != "transfer_agent"}.values()),
-        prompt="You are transfer agent. Before sending a transaction, it is necessary to check if the user's balance is sufficient. If not, consider swapping or bridging equivalent tokens. Note that when swapping or bridging, a portion of the gas fee needs to be reserved.",
+        prompt=AGENT_PROMPTS["transfer_agent"],
         name="transfer_agent",
+        **agent_options,
     )
 
     # Create workflow
-    workflow = create_swarm(
+    return create_swarm(
         [dispatch_agent, analysis_agent, bridge_agent, swap_agent, transfer_agent],
-        default_active_agent=dispatch_agent.name
+        default_active_agent=dispatch_agent.name,
+        **({"state_schema": CompactionSwarmState} if compactor is not None else {}),
     )
 
 
 @app.on_event("startup")
 async def startup_event():
+    global trace_exporter, checkpoint_sweeper
     await initialize_components()
+    if tracer is not None:
+        trace_exporter = asyncio.create_task(tracer.export_periodically(TRACE_FILE, TRACE_EXPORT_INTERVAL))
+    if isinstance(checkpointer, BoundedInMemorySaver):
+        checkpoint_sweeper = asyncio.create_task(checkpointer.sweep_periodically(CHECKPOINT_SWEEP_INTERVAL))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if checkpoint_sweeper is not None:
+        checkpoint_sweeper.cancel()
+    if trace_exporter is not None:
+        trace_exporter.cancel()
+        tracer.export(TRACE_FILE)
+
+
+def agent_name(namespace) -> str:
+    """Name of the swarm agent that produced a subgraph event, e.g. ("swap_agent:<task id>",) -> "swap_agent"."""
+    return namespace[0].split(":", 1)[0] if namespace else ""
+
+
+def message_frame(message, agent: str) -> Optional[Dict[str, Any]]:
+    """Build the SSE payload for one streamed message or token chunk, or None if there is nothing to send."""
+    if isinstance(message, AIMessageChunk):
+        if message.content:
+            return {"role": "assistant", "agent": agent, "type": "token", "content": message.content}
+        if message.tool_call_chunks:
+            return {"role": "assistant", "agent": agent, "type": "tool_call", "content": message.tool_call_chunks}
+        return None
+    if message.type == "tool":
+        return {"role": "assistant", "agent": agent, "type": "tool", "name": message.name, "content": message.content}
+    if message.type == "ai":
+        # Complete AI messages are only emitted by models that did not stream.
+        content = message.content if message.content else message.additional_kwargs
+        return {"role": "assistant", "agent": agent, "type": "message", "content": content}
+    return None
+
+
+def last_user_message(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user" and isinstance(message.get("content"), str):
+            return message["content"]
+    return ""
 
 
 async def process_chat_stream(request_data: Dict[str, Any], thread_id: str):
-    """Process chat streams and generate responses"""
-    global workflow, checkpointers
+    """Process chat streams and generate responses.
 
+    Streams LLM tokens and tool results as they are produced, plus a frame
+    for every handoff between agents. Every frame carries the producing agent.
+    """
     await initialize_components()
 
-    if thread_id not in checkpointers:
-        checkpointers[thread_id] = InMemorySaver()
+    agent = swarm_app
 
-    agent = workflow.compile(checkpointer=checkpointers[thread_id])
-
-    config = {"configurable": {"thread_id": thread_id}}
+    config = {"configurable": {"thread_id": thread_id}, "callbacks": run_callbacks}
 
     input_data = {"messages": request_data["messages"]}
 
+    if pre_router is not None and await agent.checkpointer.aget_tuple(config) is None:
+        start_agent = pre_router.route(last_user_message(request_data["messages"]))
+        if start_agent:
+            # Read by the swarm's router at START in place of the default agent.
+            input_data["active_agent"] = start_agent
+
     try:
-        msg_idx = 0
-        async for turn in agent.astream(
+        async for namespace, mode, data in agent.astream(
                 input=input_data,
                 config=config,
-                stream_mode="values",
+                stream_mode=["messages", "updates"],
+                subgraphs=True,
         ):
-            while len(turn['messages']) > msg_idx:
-                if turn['messages'][msg_idx].type in ('ai', 'tool'):
-                    messages = turn['messages'][msg_idx]
-                    content = messages.content if messages.content else messages.additional_kwargs
-                    yield f"data: {json.dumps({'content': content, 'role': 'assistant'})}\n\n"
-                msg_idx += 1
+            if mode == "messages":
+                message, name = data[0], agent_name(namespace)
+                if isinstance(message, AIMessageChunk) and message.content:
+                    yield token_frame(name, message.content)
+                    continue
+                frame = message_frame(message, name)
+                if frame:
+                    yield encode_frame(frame)
+            elif not namespace:
+                # Top-level updates only matter for handoffs; tokens and tool
+                # results already went out through the messages stream.
+                for node, update in data.items():
+                    active_agent = update.get("active_agent") if isinstance(update, dict) else None
+                    if active_agent and active_agent != node:
+                        HANDOFFS.inc(from_agent=node, to_agent=active_agent)
+                        frame = {"role": "assistant", "agent": node, "type": "handoff", "content": active_agent}
+                        yield encode_frame(frame)
     except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield encode_frame({"error": str(e)})
 
-    yield "data: [DONE]\n\n"
+    yield DONE
+
+
+def stateless_key(messages: List[Dict[str, Any]]) -> str:
+    """Coalescing key of a request without a thread_id: its messages, normalized."""
+    return json.dumps(
+        [(m.get("role"), m.get("content").strip() if isinstance(m.get("content"), str) else m.get("content"))
+         for m in messages],
+        sort_keys=True,
+    )
+
+
+def may_move_funds(messages: List[Dict[str, Any]]) -> bool:
+    """Whether a request could lead to a transfer, swap or bridge, judged by any of its messages.
+
+    Earlier messages count too: "yes, go ahead" confirms whatever was proposed before it.
+    """
+    texts = [m["content"] for m in messages if isinstance(m.get("content"), str)]
+    return any(mentions_fund_movement(text) or (pre_router is not None and pre_router.may_move_funds(text))
+               for text in texts)
+
+
+async def release_after(stream, *releases):
+    """Yield from ``stream``, then release the admission slot it ran under."""
+    try:
+        async for frame in stream:
+            yield frame
+    finally:
+        for release in releases:
+            release()
+
+
+def release_all(releases):
+    for release in releases:
+        if release:
+            release()
+
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """A StreamingResponse that releases the admission slot and locks of its run once it is done.
+
+    The release does not depend on the body iterator ever starting, so a
+    client that disconnects before the first frame does not leak them.
+    """
+
+    def __init__(self, content, *releases, **kwargs):
+        super().__init__(content, **kwargs)
+        self.releases = releases
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            release_all(self.releases)
 
 
 @app.post("/chat")
 async def openai_compatible_chat(request: Request):
+    received = time.perf_counter()
     data = await request.json()
 
     messages = data.get("messages", [])
-    thread_id = data.get("thread_id") or str(uuid.uuid4())
-
     request_data = {"messages": messages}
+    thread_id = data.get("thread_id")
 
-    return StreamingResponse(
-        process_chat_stream(request_data, thread_id),
-        media_type="text/event-stream"
-    )
+    # Identical stateless requests may share one run (SWARM_COALESCE_STATELESS=1),
+    # except those that could move funds: each of those must run, and answer, on its own.
+    share_run = (not thread_id and os.getenv("SWARM_COALESCE_STATELESS", "0") == "1"
+                 and not may_move_funds(messages))
+    key = stateless_key(messages) if share_run else None
+
+    # Slots and locks are taken before the response starts, so a rejection
+    # can still be a 429, and released when the response is done.
+    release_thread = None
+    try:
+        if thread_id:
+            release_thread = await admission.acquire_turn(thread_locks, thread_id)
+        # Joining a shared run costs no run slot.
+        release_slot = None if share_run and key in chat_flight else await admission.acquire()
+    except BaseException as e:
+        if release_thread:
+            release_thread()
+        if not isinstance(e, Rejected):
+            raise
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": str(e.retry_after)})
+
+    # The response releases what this request holds; a shared run releases its own slot.
+    releases = () if share_run else (release_slot, release_thread)
+    started = False
+    try:
+        if share_run:
+            # A stateless request cannot be continued by its client, so every
+            # identical one in flight can receive the frames of a single run.
+            # The slot is held by the run, not by whichever client started it.
+            def start_run():
+                nonlocal started
+                started = True
+                run = process_chat_stream(request_data, str(uuid.uuid4()))
+                return release_after(run, release_slot) if release_slot else run
+
+            stream = chat_flight.stream(key, start_run)
+            if release_slot and not started:
+                # An identical run started while this request waited for its slot.
+                release_slot()
+        else:
+            stream = process_chat_stream(request_data, thread_id or str(uuid.uuid4()))
+
+        stream = coalesce(stream, SSE_FLUSH_INTERVAL, SSE_FLUSH_BYTES)
+        return ReleasingStreamingResponse(observe_request(stream, received), *releases,
+                                          media_type="text/event-stream")
+    except BaseException:
+        release_all(releases)
+        if release_slot and not started:
+            release_slot()
+        raise
 
 
 @app.get("/health")
@@ -196,8 +490,42 @@ async def health_check():
     return {"status": "healthy"}
 
 
-def start_server():
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/traces")
+async def traces_endpoint(limit: int = 20):
+    """The most recent sampled traces as OTLP JSON."""
+    if tracer is None:
+        return JSONResponse({"error": "Tracing is disabled (SWARM_TRACE_SAMPLE=0)"}, status_code=404)
+    return tracer.to_otlp(limit)
+
+
+def start_server(workers: Optional[int] = None):
+    """Serve the app on port 8000 with ``workers`` processes (SWARM_WORKERS, default 1).
+
+    Workers share nothing in memory, so every turn of a thread must find its
+    state in the checkpoint backend whichever worker serves it: more than one
+    worker requires the SQLite backend, which all workers open in WAL mode.
+    Turns of one thread are serialized by lease rows in the same file, and
+    each worker admits its share of the concurrency and queue limits.
+    """
+    workers = workers or WORKERS
+    if workers == 1:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
+        return
+    backend = os.getenv("SWARM_CHECKPOINT_BACKEND", "sqlite")
+    if backend != "sqlite":
+        raise RuntimeError(
+            f"{workers} workers cannot share the {backend!r} checkpoint backend; "
+            "set SWARM_CHECKPOINT_BACKEND=sqlite or run a single worker"
+        )
+    # Workers import the app themselves, so it has to be given as an import
+    # string, and they learn their number from the environment.
+    os.environ["SWARM_WORKERS"] = str(workers)
+    uvicorn.run("multi_agent.swarm.langchain_swarm_http:app", host="0.0.0.0", port=8000, workers=workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+"""Hot-path latency metrics for swarm runs, collected through LangChain callbacks.
+
+``MetricsCallbackHandler`` is passed in the run config and times every chat
+model and tool call, attributing model calls and token usage to the agent
+that made them. It runs inline and only touches a dict and the metric
+counters, so it can stay enabled in production.
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from multi_agent.common.metrics import Counter, Histogram
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 34.0, 60.0, 120.0)
+
+LLM_SECONDS = Histogram("swarm_llm_call_seconds", "Chat model call latency by agent.", ["agent"], buckets=LLM_BUCKETS)
+LLM_ERRORS = Counter("swarm_llm_errors_total", "Chat model calls that raised, by agent.", ["agent"])
+TOKENS = Counter("swarm_llm_tokens_total", "Tokens used by chat model calls, by agent and direction.",
+                 ["agent", "kind"])
+TOOL_SECONDS = Histogram("swarm_tool_call_seconds", "Tool call latency as seen by the agents.", ["tool", "status"])
+HANDOFFS = Counter("swarm_handoffs_total", "Handoffs between swarm agents.", ["from_agent", "to_agent"])
+TTFB_SECONDS = Histogram("swarm_chat_ttfb_seconds", "Time from receiving a /chat request to its first SSE frame.")
+REQUEST_SECONDS = Histogram("swarm_chat_request_seconds", "Time from receiving a /chat request to its last SSE frame.",
+                            buckets=LLM_BUCKETS)
+
+
+def agent_from_metadata(metadata: Optional[Dict[str, Any]]) -> str:
+    """The swarm agent of a callback event, from its checkpoint namespace ("swap_agent:<id>|agent:<id>")."""
+    namespace = (metadata or {}).get("langgraph_checkpoint_ns", "")
+    return namespace.split("|", 1)[0].split(":", 1)[0] or "unknown"
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Observes chat model and tool latency; one instance can be shared by all runs."""
+
+    run_inline = True
+
+    def __init__(self):
+        # run ID -> (start time, agent or tool name)
+        self._runs: Dict[UUID, Tuple[float, str]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs):
+        self._runs[run_id] = (time.perf_counter(), agent_from_metadata(metadata))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        start = self._runs.pop(run_id, None)
+        if start is None:
+            return
+        LLM_SECONDS.observe(time.perf_counter() - start[0], agent=start[1])
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    TOKENS.inc(usage.get("input_tokens", 0), agent=start[1], kind="input")
+                    TOKENS.inc(usage.get("output_tokens", 0), agent=start[1], kind="output")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        start = self._runs.pop(run_id, None)
+        if start is not None:
+            LLM_SECONDS.observe(time.perf_counter() - start[0], agent=start[1])
+            LLM_ERRORS.inc(agent=start[1])
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs):
+        self._runs[run_id] = (time.perf_counter(), (serialized or {}).get("name") or kwargs.get("name", "unknown"))
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id, "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id, "error")
+
+    def _end_tool(self, run_id: UUID, status: str):
+        start = self._runs.pop(run_id, None)
+        if start is not None:
+            TOOL_SECONDS.observe(time.perf_counter() - start[0], tool=start[1], status=status)
+
+
+async def observe_request(stream, received: float):
+    """Yield the SSE frames of ``stream``, observing time to first frame and total time since ``received``."""
+    first = True
+    try:
+        async for frame in stream:
+            if first:
+                TTFB_SECONDS.observe(time.perf_counter() - received)
+                first = False
+            yield frame
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - received)
@@ -0,0 +1,216 @@
+"""Local intent pre-router for new swarm conversations.
+
+Every new thread starts at ``dispatch_agent``, whose only job is to pick a
+handoff tool, which costs a full LLM round-trip. ``IntentRouter`` scores the
+first user message against a TF-IDF vector per agent, built from the agent's
+prompt, its handoff description, a few example requests and the terms that
+mark its requests, and names the agent to start at when the best match is
+clear. Otherwise it returns None
+and the conversation starts at ``dispatch_agent`` as before.
+"""
+import math
+import re
+from collections import Counter as TermCounter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from multi_agent.common.metrics import Counter
+
+DECISIONS = Counter("swarm_pre_router_decisions_total", "First-turn routing decisions of the local pre-router.",
+                    ["agent"])
+
+FALLBACK_AGENT = "dispatch_agent"
+# Agents whose turns sign and send transactions.
+FUND_MOVING_AGENTS = frozenset({"transfer_agent", "swap_agent", "bridge_agent"})
+# Word stems of requests that may move funds, inflections included.
+FUND_MOVING_STEMS = (
+    "transfer", "send", "sent", "pay", "paid", "swap", "exchang", "convert", "trade", "trading", "buy", "bought",
+    "sell", "sold", "bridg", "cross-chain", "move", "moving", "withdr", "deposit", "approv", "sign",
+)
+
+# Requests that should clearly start at each agent, phrased the way users ask.
+ROUTING_EXAMPLES = {
+    "analysis_agent": [
+        "what are the assets of this address",
+        "check the balance of my wallet",
+        "show token holdings portfolio",
+        "current block height of ethereum",
+        "latest block number on the chain",
+        "what is the price of ETH",
+        "token info and market data",
+        "look up this transaction hash status",
+        "how much gas does the network charge",
+        "analyze this wallet history",
+    ],
+    "bridge_agent": [
+        "bridge USDC from ethereum to arbitrum",
+        "move my tokens cross-chain to base",
+        "cross chain transfer from polygon to optimism",
+        "send ETH from mainnet to another chain via a bridge",
+        "bridge tokens between chains",
+    ],
+    "swap_agent": [
+        "swap ETH to USDT",
+        "exchange USDC for DAI",
+        "convert my BNB into USDT",
+        "trade 100 USDT for ETH",
+        "buy ETH with USDC",
+        "sell my tokens for stablecoins",
+    ],
+    "transfer_agent": [
+        "transfer 1 ETH to this address",
+        "send 50 USDT to my friend",
+        "pay 0.1 ETH to a wallet",
+        "send tokens to a recipient address",
+        "transfer USDC to another account",
+    ],
+}
+
+# Terms that mark a request for each agent, whatever else it says.
+ROUTING_TERMS = {
+    "analysis_agent": "asset balance holding hold portfolio worth height block price gas fee market info status "
+                      "history activity transaction txhash",
+    "bridge_agent": "bridge cross-chain move across onto",
+    "swap_agent": "swap exchange convert trade buy sell rate quote",
+    "transfer_agent": "send transfer pay payment recipient receive give",
+}
+
+# Margins of agents that need a clearer match than ``IntentRouter.min_margin``:
+# "trading" names a trade as often as a price question.
+AGENT_MARGINS = {"swap_agent": 0.25}
+
+STOPWORDS = frozenset(
+    "a an the of to and or in on for with my me i you your is are be can could would please this that "
+    "it its from into at by as do does how what which who she he they them her his our we us".split()
+)
+
+_ADDRESS = re.compile(r"\b0x[0-9a-fA-F]{40}\b")
+_TX_HASH = re.compile(r"\b0x[0-9a-fA-F]{64}\b")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Which chain or token a request names says nothing about what it wants done.
+_CHAIN = re.compile(
+    r"\b(?:ethereum|mainnet|arbitrum|optimism|base|polygon|bsc|avalanche|solana|zksync|linea|tron|bitcoin)\b",
+    re.IGNORECASE,
+)
+_SYMBOL = re.compile(r"\b(?:[A-Z][A-Z0-9]{1,5}|eth|weth|btc|wbtc|usdt|usdc|dai|bnb|matic|sol)\b")
+_WORD = re.compile(r"[a-z][a-z0-9\-]*")
+
+
+def _words(text: str) -> List[str]:
+    """Lowercase words without stopwords; addresses, hashes, amounts and tokens become placeholders."""
+    text = _TX_HASH.sub(" txhash ", text)
+    text = _ADDRESS.sub(" address ", text)
+    text = _NUMBER.sub(" amount ", text)
+    text, chains = _CHAIN.subn(" ", text)
+    text = _SYMBOL.sub(" symbol ", text)
+    # One chain is where anything happens; two are where funds move between.
+    words = ["chainpair"] if chains >= 2 else []
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        words.append(word)
+        if "-" in word:
+            words.extend(part for part in word.split("-") if part and part not in STOPWORDS)
+    return words
+
+
+def stem(word: str) -> str:
+    """Folds the plural, -ing and -ed forms of a word and a final e into one term: "trading" -> "trad"."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if word[-1] == word[-2] and word[-1] not in "aeiouls":
+                word = word[:-1]
+            break
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """The stemmed terms of ``text``, see ``_words``."""
+    return [stem(word) for word in _words(text)]
+
+
+def mentions_fund_movement(text: str) -> bool:
+    """Whether ``text`` has a word that may ask to move funds; errs towards True."""
+    return any(word.startswith(FUND_MOVING_STEMS) for word in _words(text))
+
+
+def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {term: v / norm for term, v in vector.items()} if norm else {}
+
+
+class IntentRouter:
+    """Cosine similarity between a request and one TF-IDF vector per agent.
+
+    A request goes to the best agent when it scores at least ``min_score``
+    and leads the runner-up by the agent's margin in ``agent_margins``, or by
+    ``min_margin``. The defaults are the loosest with no wrong route on the
+    held-out requests of ``benchmarks.pre_router_eval --sweep``, with some
+    headroom.
+    """
+
+    def __init__(
+        self,
+        documents: Dict[str, Iterable[str]],
+        min_score: float = 0.12,
+        min_margin: float = 0.06,
+        agent_margins: Dict[str, float] = AGENT_MARGINS,
+    ):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.agent_margins = agent_margins
+        counts = {agent: TermCounter(t for text in texts for t in tokenize(text)) for agent, texts in documents.items()}
+        total = len(counts)
+        document_frequency = TermCounter(term for terms in counts.values() for term in terms)
+        self.idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+        self.vectors = {
+            agent: _normalize({term: (1 + math.log(n)) * self.idf[term] for term, n in terms.items()})
+            for agent, terms in counts.items()
+        }
+
+    @classmethod
+    def from_agents(
+        cls,
+        descriptions: Dict[str, str],
+        prompts: Dict[str, str],
+        examples: Dict[str, List[str]] = ROUTING_EXAMPLES,
+        terms: Dict[str, str] = ROUTING_TERMS,
+        **kwargs,
+    ) -> "IntentRouter":
+        """Build vectors for every agent except the fallback from its description, prompt, examples and terms."""
+        documents = {
+            agent: [descriptions.get(agent, ""), prompts.get(agent, ""), terms.get(agent, "")]
+            + list(examples.get(agent, []))
+            for agent in descriptions
+            if agent != FALLBACK_AGENT
+        }
+        return cls(documents, **kwargs)
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        """Every agent with its similarity to ``text``, best first."""
+        terms = TermCounter(t for t in tokenize(text) if t in self.idf)
+        query = _normalize({term: (1 + math.log(n)) * self.idf[term] for term, n in terms.items()})
+        ranked = [
+            (agent, sum(weight * vector.get(term, 0.0) for term, weight in query.items()))
+            for agent, vector in self.vectors.items()
+        ]
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+    def may_move_funds(self, text: str) -> bool:
+        """Whether the best match of ``text`` is a fund-moving agent, clear enough to route or not."""
+        agent, score = self.scores(text)[0]
+        return score > 0 and agent in FUND_MOVING_AGENTS
+
+    def route(self, text: str) -> Optional[str]:
+        """The agent to start at, or None when the match is not clear enough to skip dispatch."""
+        ranked = self.scores(text)
+        best, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        margin = self.agent_margins.get(best, self.min_margin)
+        agent = best if score >= self.min_score and score - runner_up >= margin else None
+        DECISIONS.inc(agent=agent or FALLBACK_AGENT)
+        return agent
@@ -0,0 +1,105 @@
+"""Server-sent event encoding for /chat.
+
+Frames are encoded with orjson straight to bytes. Token frames, which are
+the vast majority of a response, reuse a precomputed prefix per agent and
+only encode their content.
+
+``coalesce`` batches frames into fewer, larger writes: the first frame goes
+out at once, later frames are held for at most ``flush_interval`` seconds or
+until ``flush_bytes`` are buffered, and whatever is buffered is flushed as
+soon as the producer goes quiet for that long or finishes.
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict
+
+import orjson
+
+DONE = b"data: [DONE]\n\n"
+
+_token_prefixes: Dict[str, bytes] = {}
+
+
+def _default(value):
+    return str(value)
+
+
+def encode_frame(frame: Any) -> bytes:
+    """One SSE event whose data is ``frame`` as JSON."""
+    return b"data: " + orjson.dumps(frame, default=_default) + b"\n\n"
+
+
+def token_frame(agent: str, content: Any) -> bytes:
+    """The event for one streamed token chunk of ``agent``; same JSON as ``encode_frame`` would produce."""
+    prefix = _token_prefixes.get(agent)
+    if prefix is None:
+        prefix = _token_prefixes[agent] = (
+            b'data: {"role":"assistant","agent":' + orjson.dumps(agent) + b',"type":"token","content":'
+        )
+    return prefix + orjson.dumps(content, default=_default) + b"}\n\n"
+
+
+async def coalesce(
+    frames: AsyncIterator[bytes],
+    flush_interval: float = 0.01,
+    flush_bytes: int = 16384,
+) -> AsyncIterator[bytes]:
+    """Join encoded frames into larger chunks without delaying any frame by more than ``flush_interval``."""
+    if flush_interval <= 0:
+        async for frame in frames:
+            yield frame
+        return
+
+    loop = asyncio.get_running_loop()
+    buffer = []
+    state = {"size": 0, "done": False, "error": None, "timer": None}
+    ready = asyncio.Event()
+    # The producer pauses while a full batch waits for a slow client.
+    drained = asyncio.Event()
+    drained.set()
+
+    def flush_now():
+        if state["timer"] is not None:
+            state["timer"].cancel()
+            state["timer"] = None
+        ready.set()
+
+    async def produce():
+        first = True
+        try:
+            async for frame in frames:
+                await drained.wait()
+                buffer.append(frame)
+                state["size"] += len(frame)
+                if first or state["size"] >= flush_bytes:
+                    # The first frame is what the client waits for; never hold it.
+                    first = False
+                    drained.clear()
+                    flush_now()
+                elif state["timer"] is None and not ready.is_set():
+                    state["timer"] = loop.call_later(flush_interval, ready.set)
+        except Exception as e:
+            state["error"] = e
+        finally:
+            state["done"] = True
+            flush_now()
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            await ready.wait()
+            ready.clear()
+            state["timer"] = None
+            if buffer:
+                chunk = b"".join(buffer)
+                buffer.clear()
+                state["size"] = 0
+                drained.set()
+                yield chunk
+            if state["done"] and not buffer:
+                break
+        if state["error"] is not None:
+            raise state["error"]
+    finally:
+        if state["timer"] is not None:
+            state["timer"].cancel()
+        producer.cancel()
@@ -0,0 +1,121 @@
+"""Per-turn tool selection for swarm agents.
+
+``create_react_agent`` in langgraph 0.5 binds a fixed tool list to the model,
+so every call resends the JSON schema of every MCP tool of the agent.
+``ToolPruningModel`` stands in for the chat model: it accepts the full list
+through ``bind_tools`` and, on each call, binds only the tools whose name
+and description share terms with the current turn.
+
+Handoff tools are always kept, as are tools already called in the current
+turn. When no tool matches at all, every tool is sent, so a request the
+keywords miss behaves as before. All tools stay executable; only what the
+model is shown changes.
+"""
+import math
+from collections import Counter as TermCounter
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from multi_agent.common.metrics import Counter
+from multi_agent.swarm.pre_router import tokenize
+
+SCHEMAS_SENT = Counter("swarm_tool_schemas_sent_total", "Tool schemas bound to model calls, by agent.", ["agent"])
+SCHEMAS_PRUNED = Counter("swarm_tool_schemas_pruned_total", "Tool schemas left out of model calls, by agent.",
+                         ["agent"])
+
+HANDOFF_PREFIX = "transfer_to_"
+
+
+def current_turn(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    """The messages from the last user message on."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i:]
+    return messages
+
+
+class ToolSelector:
+    """Scores tools against a turn by TF-IDF weighted term overlap with their name and description."""
+
+    def __init__(self, schemas: Dict[str, dict], max_tools: int = 8):
+        self.max_tools = max_tools
+        self.terms = {
+            name: set(tokenize(name.replace("_", " ") + " " + schema["function"].get("description", "")))
+            for name, schema in schemas.items()
+        }
+        document_frequency = TermCounter(term for terms in self.terms.values() for term in terms)
+        total = max(1, len(self.terms))
+        self.idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    def select(self, text: str, candidates: Sequence[str]) -> List[str]:
+        """The best ``max_tools`` candidates that match ``text``, or all of them if none does."""
+        query = set(tokenize(text))
+        scored = [(sum(self.idf[t] for t in self.terms[name] & query), name) for name in candidates]
+        matched = sorted((item for item in scored if item[0] > 0), reverse=True)
+        if not matched:
+            return list(candidates)
+        return [name for _, name in matched[:self.max_tools]]
+
+
+class ToolPruningModel(Runnable):
+    """A chat model wrapper that binds a per-turn subset of its tools on each call."""
+
+    def __init__(self, model, agent: str = "", max_tools: int = 8, tools: Optional[Sequence[Any]] = None,
+                 bind_kwargs: Optional[Dict[str, Any]] = None, max_bindings: int = 64):
+        self.model = model
+        self.agent = agent
+        self.max_tools = max_tools
+        self.bind_kwargs = bind_kwargs or {}
+        self.max_bindings = max_bindings
+        self.schemas: Dict[str, dict] = {}
+        for tool in tools or ():
+            schema = tool if isinstance(tool, dict) and tool.get("type") == "function" else convert_to_openai_tool(tool)
+            self.schemas[schema["function"]["name"]] = schema
+        self.selector = ToolSelector(self.schemas, max_tools)
+        # frozenset of tool names -> model with those tools bound
+        self._bindings: "OrderedDict[frozenset, Runnable]" = OrderedDict()
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "ToolPruningModel":
+        return ToolPruningModel(self.model, self.agent, self.max_tools, tools, kwargs, self.max_bindings)
+
+    def select_tools(self, messages: Sequence[BaseMessage]) -> List[str]:
+        """Names of the tools to show the model for ``messages``."""
+        names = list(self.schemas)
+        handoffs = [n for n in names if n.startswith(HANDOFF_PREFIX)]
+        others = [n for n in names if not n.startswith(HANDOFF_PREFIX)]
+        if len(others) <= self.max_tools:
+            return names
+        turn = current_turn(messages)
+        text = " ".join(m.content for m in turn if isinstance(m.content, str) and m.type in ("human", "ai"))
+        called = {c["name"] for m in turn if isinstance(m, AIMessage) for c in m.tool_calls}
+        selected = set(self.selector.select(text, others)) | (called & set(others))
+        return handoffs + [n for n in others if n in selected]
+
+    def _bound(self, messages: Sequence[BaseMessage]) -> Runnable:
+        names = self.select_tools(messages)
+        SCHEMAS_SENT.inc(len(names), agent=self.agent)
+        SCHEMAS_PRUNED.inc(len(self.schemas) - len(names), agent=self.agent)
+        key = frozenset(names)
+        bound = self._bindings.get(key)
+        if bound is None:
+            bound = self.model.bind_tools([self.schemas[n] for n in names], **self.bind_kwargs) if names else self.model
+            self._bindings[key] = bound
+            while len(self._bindings) > self.max_bindings:
+                self._bindings.popitem(last=False)
+        else:
+            self._bindings.move_to_end(key)
+        return bound
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs):
+        return self._bound(self._messages(input)).invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs):
+        return await self._bound(self._messages(input)).ainvoke(input, config, **kwargs)
+
+    @staticmethod
+    def _messages(input) -> Sequence[BaseMessage]:
+        return input.to_messages() if hasattr(input, "to_messages") else input
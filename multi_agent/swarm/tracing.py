@@ -0,0 +1,294 @@
+"""Sampled per-run traces of swarm runs, exported as OTLP JSON.
+
+``TracingCallbackHandler`` is passed in the run config next to the metrics
+handler. For a sampled share of runs it records a span for the run itself,
+each agent node, each chat model call (with token counts), each tool call
+and each handoff, with wall-clock start and end times. Runs that are not
+sampled cost one dict lookup per callback.
+
+Finished traces go to an in-memory ring buffer, which ``/traces`` can read,
+and to an export queue that ``export`` appends to a JSON Lines file, one
+OTLP ``ExportTraceServiceRequest`` per line, as the OpenTelemetry file
+exporter writes them. When the queue is full, the oldest traces are
+dropped and counted.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langgraph.errors import GraphBubbleUp
+
+from multi_agent.common.metrics import Counter
+from multi_agent.swarm.metrics_callbacks import agent_from_metadata
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_PREFIX = "transfer_to_"
+SCOPE = "multi_agent.swarm.tracing"
+
+TRACES = Counter("swarm_traces_total", "Finished swarm run traces, by what happened to them.", ["outcome"])
+
+# OTLP span status codes
+STATUS_OK, STATUS_ERROR = 1, 2
+SPAN_KIND_INTERNAL = 1
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.span_id = random.getrandbits(64).to_bytes(8, "big").hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time_ns()
+        self.end = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.end = time.time_ns()
+        # Handoffs and interrupts travel up the graph as exceptions; they are not failures.
+        if error is not None and not isinstance(error, GraphBubbleUp):
+            self.error = repr(error)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time_ns()) - self.start) / 1e6
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = random.getrandbits(128).to_bytes(16, "big").hex()
+        self.spans: List[Span] = []
+
+    def open(self, name: str, parent: Optional[Span], **attributes) -> Span:
+        span = Span(name, parent.span_id if parent else None, attributes)
+        self.spans.append(span)
+        return span
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        # int64 values are strings in OTLP JSON.
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp(traces: Iterable[Trace], service_name: str = "multi-agent-swarm") -> Dict[str, Any]:
+    """An OTLP/JSON ``ExportTraceServiceRequest`` holding ``traces``."""
+    spans = []
+    for trace in traces:
+        for span in trace.spans:
+            item = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(span.start),
+                "endTimeUnixNano": str(span.end or span.start),
+                "attributes": [_attribute(k, v) for k, v in span.attributes.items() if v is not None],
+                "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {"code": STATUS_OK},
+            }
+            if span.parent_id:
+                item["parentSpanId"] = span.parent_id
+            spans.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", service_name)]},
+        "scopeSpans": [{"scope": {"name": SCOPE}, "spans": spans}],
+    }]}
+
+
+def format_trace(trace: Trace) -> str:
+    """The spans of ``trace`` as an indented timing tree, for the console."""
+    children: Dict[Optional[str], List[Span]] = {}
+    for span in trace.spans:
+        children.setdefault(span.parent_id, []).append(span)
+    lines = []
+
+    def walk(parent_id: Optional[str], depth: int):
+        for span in children.get(parent_id, ()):
+            details = " ".join(f"{k}={v}" for k, v in span.attributes.items() if v is not None and k != "agent")
+            status = f" ERROR {span.error}" if span.error else ""
+            lines.append(f"{'  ' * depth}{span.name:<{40 - 2 * depth}} {span.duration_ms:9.1f}ms  {details}{status}")
+            walk(span.span_id, depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records spans of sampled swarm runs; one instance can be shared by all runs."""
+
+    run_inline = True
+
+    def __init__(self, sample_rate: float = 0.1, capacity: int = 512, service_name: str = "multi-agent-swarm"):
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.recent: Deque[Trace] = deque(maxlen=capacity)
+        self._unexported: Deque[Trace] = deque(maxlen=capacity)
+        # run ID -> (trace, nearest recorded span, whether that span is this run's own)
+        self._runs: Dict[UUID, Tuple[Trace, Span, bool]] = {}
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def _child(self, run_id: UUID, parent_run_id: Optional[UUID], name: Optional[str] = None, **attributes):
+        """Open a span for ``run_id`` (or pass its parent's through if ``name`` is None) in a sampled trace."""
+        entry = self._runs.get(parent_run_id) if parent_run_id is not None else None
+        if entry is None:
+            return None
+        trace, parent, _ = entry
+        if name is None:
+            self._runs[run_id] = (trace, parent, False)
+            return None
+        span = trace.open(name, parent, **attributes)
+        self._runs[run_id] = (trace, span, True)
+        return span
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        entry = self._runs.pop(run_id, None)
+        if entry is None or not entry[2]:
+            return None
+        entry[1].finish(error)
+        if entry[1].parent_id is None:
+            self._finish_trace(entry[0])
+        return entry[1]
+
+    def _finish_trace(self, trace: Trace):
+        for span in trace.spans:
+            if not span.end:
+                span.finish()
+        if len(self._unexported) == self._unexported.maxlen:
+            TRACES.inc(outcome="dropped")
+        self.recent.append(trace)
+        self._unexported.append(trace)
+        TRACES.inc(outcome="recorded")
+
+    # -- chains: the run and its agent nodes -------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       metadata=None, **kwargs):
+        if parent_run_id is None:
+            if random.random() >= self.sample_rate:
+                return
+            trace = Trace()
+            thread_id = (metadata or {}).get("thread_id")
+            span = trace.open("swarm run", None, **{"swarm.thread_id": thread_id})
+            self._runs[run_id] = (trace, span, True)
+            return
+        parent = self._runs.get(parent_run_id)
+        if parent is None:
+            return
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        # A top-level node of the swarm graph is an agent; its subgraph's own run shares its name.
+        if node and node == kwargs.get("name") and not node.startswith("__") \
+                and "|" not in metadata.get("langgraph_checkpoint_ns", "|") and parent[1].name != f"agent {node}":
+            self._child(run_id, parent_run_id, f"agent {node}", agent=node)
+        else:
+            self._child(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+    # -- chat models -------------------------------------------------------
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                            metadata=None, invocation_params=None, **kwargs):
+        if parent_run_id not in self._runs:
+            return
+        params = invocation_params or {}
+        self._child(run_id, parent_run_id, "llm", agent=agent_from_metadata(metadata),
+                    **{"gen_ai.request.model": params.get("model") or params.get("model_name")})
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        span = self._end(run_id)
+        if span is None:
+            return
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        span.attributes["gen_ai.usage.input_tokens"] = input_tokens
+        span.attributes["gen_ai.usage.output_tokens"] = output_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+    # -- tools and handoffs ------------------------------------------------
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                      metadata=None, **kwargs):
+        if parent_run_id not in self._runs:
+            return
+        name = (serialized or {}).get("name") or kwargs.get("name", "unknown")
+        agent = agent_from_metadata(metadata)
+        if name.startswith(HANDOFF_PREFIX):
+            self._child(run_id, parent_run_id, "handoff", agent=agent,
+                        **{"swarm.from_agent": agent, "swarm.to_agent": name[len(HANDOFF_PREFIX):]})
+        else:
+            self._child(run_id, parent_run_id, f"tool {name}", agent=agent, **{"tool.name": name})
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+    # -- export ------------------------------------------------------------
+
+    def to_otlp(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """The most recent ``limit`` buffered traces (all by default) as OTLP JSON."""
+        traces = list(self.recent)
+        return to_otlp(traces[-limit:] if limit else traces, self.service_name)
+
+    def export(self, path: str) -> int:
+        """Append the traces finished since the last export to ``path``; returns how many."""
+        traces = []
+        while self._unexported:
+            traces.append(self._unexported.popleft())
+        if not traces:
+            return 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        line = json.dumps(to_otlp(traces, self.service_name), separators=(",", ":")) + "\n"
+        # One write per batch, so batches of several workers appending to one file stay whole lines.
+        with open(path, "a") as f:
+            f.write(line)
+        TRACES.inc(len(traces), outcome="exported")
+        return len(traces)
+
+    async def export_periodically(self, path: str, interval: float):
+        """Export to ``path`` every ``interval`` seconds until cancelled, off the event loop."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.export, path)
+            except OSError as e:
+                logger.warning(f"Trace export to {path} failed: {e}")
+
+
+def tracer_from_env() -> Optional[TracingCallbackHandler]:
+    """The tracer configured by SWARM_TRACE_SAMPLE (0 disables) and SWARM_TRACE_BUFFER, or None."""
+    sample_rate = float(os.getenv("SWARM_TRACE_SAMPLE", "0.1"))
+    if sample_rate <= 0:
+        return None
+    return TracingCallbackHandler(sample_rate=sample_rate, capacity=int(os.getenv("SWARM_TRACE_BUFFER", "512")))